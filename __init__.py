@@ -1,35 +1,63 @@
 # __init__.py
-from .elint_generator import generate_elint_detections_from_spline, generate_elint_for_all_emitters
+#
+# Core generation imports only NumPy and pandas (SciPy is loaded on first use).
+# GIS and plotting helpers are imported lazily on first attribute access, so
+# `import elintgen` stays fast in worker processes and CLI tools.
+import importlib
+
+from .elint_generator import (
+    generate_elint_detections_from_spline,
+    generate_elint_for_all_emitters,
+    generate_elint_for_tracks,
+    generate_elint_replicates,
+    iter_elint_replicates
+)
 from .geom_utils import compute_bearing, offset_position
 from .profiles import SENSOR_PROFILES, EMITTER_PROFILES
-from .geojson_utils import (
-    load_geojson,
-    plot_geojson_file,
-    plot_geojson_polygon,
-    extract_region_subtracks,
-    mask_elint_by_geojson
-)
-from .plot_utils import (
-    add_ais_tracks,
-    add_spline,
-    add_elint_detections,
-    init_map
-)
+from .track_store import TrackStore
+from .detection_index import DetectionIndex, write_detections, read_detections
+
+# Lazily imported attributes: name -> submodule (needs the "geo" / "plot" extras)
+_LAZY_ATTRS = {
+    "load_geojson": ".geojson_utils",
+    "plot_geojson_file": ".geojson_utils",
+    "plot_geojson_polygon": ".geojson_utils",
+    "extract_region_subtracks": ".geojson_utils",
+    "mask_elint_by_geojson": ".geojson_utils",
+    "add_ais_tracks": ".plot_utils",
+    "add_spline": ".plot_utils",
+    "add_elint_detections": ".plot_utils",
+    "init_map": ".plot_utils",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     "generate_elint_detections_from_spline",
     "generate_elint_for_all_emitters",
+    "generate_elint_for_tracks",
+    "generate_elint_replicates",
+    "iter_elint_replicates",
+    "TrackStore",
+    "DetectionIndex",
+    "write_detections",
+    "read_detections",
     "compute_bearing",
     "offset_position",
     "SENSOR_PROFILES",
     "EMITTER_PROFILES",
-    "load_geojson",
-    "plot_geojson_file",
-    "plot_geojson_polygon",
-    "mask_elint_by_geojson",
-    "extract_region_subtracks",
-    "add_ais_tracks",
-    "add_spline",
-    "add_elint_detections",
-    "init_map"
 ]
+# The lazy GIS/plotting helpers stay out of __all__ so "from elintgen import *"
+# does not import the optional extras; __dir__ still lists them.
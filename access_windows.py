@@ -0,0 +1,207 @@
+# access_windows.py
+
+"""
+Satellite pass / revisit windows from circular-orbit approximations.
+
+A sensor profile opts in with an ``orbit`` entry, e.g.
+
+    "orbit": {
+        "altitude_km": 550,        # circular orbit altitude
+        "inclination_deg": 53,
+        "swath_km": 1200,          # full ground swath width
+        "n_planes": 1,             # planes, RAAN evenly spread over 360 deg
+        "sats_per_plane": 1,       # satellites per plane, evenly phased
+        "raan_deg": 0, "phase_deg": 0, "epoch": None   # optional orientation/epoch (POSIX s)
+    }
+
+Pass intervals are computed for a span and footprint (per track for fleets, see
+``track_access_windows``), stored as a sorted, merged ``AccessWindows`` index, and
+intersected with sample times in bulk.
+"""
+import numpy as np
+
+from .geom_utils import EARTH_RADIUS_KM, haversine_km
+
+MU_EARTH_KM3_S2 = 398600.4418
+EARTH_ROTATION_RAD_S = 7.2921159e-5
+
+
+class AccessWindows:
+    """
+    Sorted, non-overlapping time intervals [start, end] in POSIX seconds.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        order = np.argsort(starts, kind="stable")
+        self.starts, self.ends = self._merge(starts[order], ends[order])
+
+    @staticmethod
+    def _merge(starts, ends):
+        if len(starts) == 0:
+            return starts, ends
+        running_end = np.maximum.accumulate(ends)
+        new_block = np.concatenate([[True], starts[1:] > running_end[:-1]])
+        block_id = np.cumsum(new_block) - 1
+        merged_ends = np.full(block_id[-1] + 1, -np.inf)
+        np.maximum.at(merged_ends, block_id, ends)
+        return starts[new_block], merged_ends
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"AccessWindows(n={len(self)}, total_sec={self.total_duration:.0f})"
+
+    @property
+    def total_duration(self):
+        return float(np.sum(self.ends - self.starts))
+
+    def clip(self, start, end):
+        """Return the windows intersected with [start, end]."""
+        keep = (self.ends >= start) & (self.starts <= end)
+        return AccessWindows(np.maximum(self.starts[keep], start), np.minimum(self.ends[keep], end))
+
+    def contains(self, times):
+        """Boolean mask of which times fall inside any window (vectorized)."""
+        times = np.asarray(times, dtype=float)
+        idx = np.searchsorted(self.starts, times, side="right") - 1
+        valid = idx >= 0
+        inside = np.zeros(times.shape, dtype=bool)
+        inside[valid] = times[valid] <= self.ends[idx[valid]]
+        return inside
+
+    def uniform_times(self, n, rng):
+        """Draw ``n`` sorted times uniformly over the union of the windows."""
+        durations = self.ends - self.starts
+        cum = np.concatenate([[0.0], np.cumsum(durations)])
+        u = np.sort(rng.uniform(0, cum[-1], n))
+        idx = np.clip(np.searchsorted(cum, u, side="right") - 1, 0, len(durations) - 1)
+        return self.starts[idx] + (u - cum[idx])
+
+
+def footprint_from_points(lats, lons):
+    """
+    Circular footprint (center_lat, center_lon, radius_km) enclosing a set of points.
+    """
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    center_lat = 0.5 * (lats.min() + lats.max())
+    center_lon = 0.5 * (lons.min() + lons.max())
+    wrapped = lons % 360.0
+    if len(lons) and np.ptp(wrapped) < np.ptp(lons):
+        # Points straddle the antimeridian: take the midpoint on the 0..360 side
+        center_lon = (0.5 * (wrapped.min() + wrapped.max()) + 180.0) % 360.0 - 180.0
+    radius = float(np.max(haversine_km(center_lat, center_lon, lats, lons))) if len(lats) else 0.0
+    return center_lat, center_lon, radius
+
+
+def subsatellite_points(orbit, times):
+    """
+    Sub-satellite latitude/longitude for every satellite of a circular-orbit constellation.
+
+    Returns:
+        tuple: (lat, lon) arrays of shape (n_satellites, len(times)), in degrees.
+    """
+    altitude = orbit["altitude_km"]
+    incl = np.radians(orbit.get("inclination_deg", 0.0))
+    n_planes = int(orbit.get("n_planes", 1))
+    per_plane = int(orbit.get("sats_per_plane", 1))
+    epoch = orbit.get("epoch") or 0.0
+
+    a = EARTH_RADIUS_KM + altitude
+    mean_motion = np.sqrt(MU_EARTH_KM3_S2 / a ** 3)
+
+    plane = np.repeat(np.arange(n_planes), per_plane)
+    slot = np.tile(np.arange(per_plane), n_planes)
+    raan = np.radians(orbit.get("raan_deg", 0.0)) + 2 * np.pi * plane / n_planes
+    phase = np.radians(orbit.get("phase_deg", 0.0)) + 2 * np.pi * slot / per_plane
+
+    dt = np.asarray(times, dtype=float)[None, :] - epoch
+    u = phase[:, None] + mean_motion * dt
+    raan = raan[:, None]
+
+    x = np.cos(raan) * np.cos(u) - np.sin(raan) * np.sin(u) * np.cos(incl)
+    y = np.sin(raan) * np.cos(u) + np.cos(raan) * np.sin(u) * np.cos(incl)
+    z = np.sin(u) * np.sin(incl)
+
+    lat = np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))
+    lon = np.degrees(np.arctan2(y, x) - EARTH_ROTATION_RAD_S * dt)
+    lon = (lon + 180.0) % 360.0 - 180.0
+    return lat, lon
+
+
+def compute_access_windows(orbit, t_start, t_end, footprint, step_sec=30.0):
+    """
+    Compute pass intervals of a circular-orbit sensor over a circular footprint.
+
+    A satellite has access while the great-circle distance from its sub-satellite
+    point to the footprint center is within half the swath plus the footprint radius.
+
+    Parameters:
+        orbit (dict): Orbit parameters (see module docstring).
+        t_start, t_end (float): Scenario span in POSIX seconds.
+        footprint (tuple): (center_lat, center_lon, radius_km).
+        step_sec (float): Propagation step; interval edges are accurate to about this.
+
+    Returns:
+        AccessWindows: Merged pass intervals across all satellites.
+    """
+    center_lat, center_lon, radius_km = footprint
+    times = np.arange(t_start, t_end + step_sec, step_sec)
+    lat, lon = subsatellite_points(orbit, times)
+    reach = 0.5 * orbit.get("swath_km", 1000.0) + radius_km
+    visible = haversine_km(center_lat, center_lon, lat, lon) <= reach
+
+    # Rising/falling edges per satellite, padded so passes at the span edges close
+    padded = np.pad(visible, ((0, 0), (1, 1)))
+    edges = np.diff(padded.astype(np.int8), axis=1)
+    _, rise = np.nonzero(edges == 1)
+    _, fall = np.nonzero(edges == -1)
+    half = 0.5 * step_sec
+    starts = np.maximum(times[rise] - half, t_start)
+    ends = np.minimum(times[fall - 1] + half, t_end)
+    return AccessWindows(starts, ends)
+
+
+def track_access_windows(orbit, store, indices=None, step_sec=30.0):
+    """
+    Pass intervals of a circular-orbit sensor over each track's own span and footprint.
+
+    A single footprint around a whole fleet would give every track access whenever
+    the satellite is over any part of the fleet, so each track gets its own windows
+    (as ``generate_elint_detections_from_spline`` computes for a single track).
+
+    Parameters:
+        store (TrackStore): Tracks.
+        indices (array-like): Tracks to compute (default all).
+
+    Returns:
+        list: One AccessWindows per entry of ``indices`` (None for empty tracks).
+    """
+    windows = []
+    for i in (range(len(store)) if indices is None else indices):
+        start, stop = store.bounds(i)
+        if stop == start:
+            windows.append(None)
+            continue
+        windows.append(compute_access_windows(
+            orbit, store.times[start] / 1e9, store.times[stop - 1] / 1e9,
+            footprint_from_points(store.lats[start:stop], store.lons[start:stop]), step_sec
+        ))
+    return windows
+
+
+def compute_sensor_access(sensor_profiles, t_start, t_end, footprint, sensor_types=None, step_sec=30.0):
+    """
+    Compute access windows once for every orbital sensor in a profile registry.
+
+    Returns:
+        dict: sensor_type -> AccessWindows (only sensors with an ``orbit`` entry).
+    """
+    sensor_types = sensor_types or list(sensor_profiles)
+    return {
+        name: compute_access_windows(sensor_profiles[name]["orbit"], t_start, t_end, footprint, step_sec)
+        for name in sensor_types
+        if "orbit" in sensor_profiles[name]
+    }
@@ -0,0 +1,210 @@
+# ais_store.py
+
+"""
+Partitioned Parquet store for raw AIS with predicate pushdown.
+
+``ingest_ais_csv`` converts AIS CSV files (read in chunks) into a hive-partitioned
+Parquet dataset:
+
+    root/
+      _ais_store.json                 tile size and column names
+      day=2024-05-01/tile=40321/part-00003.parquet
+      ...
+
+Partitions are by UTC day and by a coarse lat/lon tile. Inside every file rows
+are sorted by (MMSI, time), so each row group covers a narrow range of vessels and
+times and its min/max statistics are selective.
+
+``read_ais`` prunes whole partitions from the time range and bounding box, and
+pyarrow then skips row groups whose statistics fall outside the filter; only the
+surviving rows are materialized before subtrack extraction.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .track_store import TrackStore
+
+METADATA_FILE = "_ais_store.json"
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def _tile_index(lats, lons, tile_deg):
+    n_x = int(np.ceil(360.0 / tile_deg))
+    n_y = int(np.ceil(180.0 / tile_deg))
+    ty = np.clip(np.floor((np.asarray(lats) + 90.0) / tile_deg).astype(np.int64), 0, n_y - 1)
+    tx = np.clip(np.floor((np.asarray(lons) + 180.0) / tile_deg).astype(np.int64), 0, n_x - 1)
+    return ty * n_x + tx
+
+
+def _tiles_for_bbox(bbox, tile_deg):
+    """All tile indices overlapping (lon_min, lat_min, lon_max, lat_max)."""
+    lon_min, lat_min, lon_max, lat_max = bbox
+    n_x = int(np.ceil(360.0 / tile_deg))
+    y0, y1 = _tile_index([lat_min, lat_max], [lon_min, lon_min], tile_deg) // n_x
+    if lon_min <= lon_max:
+        xs = np.arange(*(_tile_index([lat_min, lat_min], [lon_min, lon_max], tile_deg) % n_x + [0, 1]))
+    else:  # crosses the antimeridian
+        x0 = _tile_index([lat_min], [lon_min], tile_deg)[0] % n_x
+        x1 = _tile_index([lat_min], [lon_max], tile_deg)[0] % n_x
+        xs = np.concatenate([np.arange(x0, n_x), np.arange(0, x1 + 1)])
+    ys = np.arange(y0, y1 + 1)
+    return (ys[:, None] * n_x + xs[None, :]).ravel()
+
+
+def ingest_ais_csv(csv_paths, root, tile_deg=1.0, chunksize=1_000_000, row_group_size=65536,
+                   id_col="mmsi", time_col="Timestamp", lat_col="Latitude", lon_col="Longitude",
+                   **read_csv_kwargs):
+    """
+    Convert AIS CSV file(s) into a day/tile-partitioned Parquet dataset.
+
+    Parameters:
+        csv_paths (str or list): Input CSV file(s).
+        root (str): Output dataset directory (created if needed).
+        tile_deg (float): Spatial tile size in degrees.
+        chunksize (int): CSV rows read per chunk; memory use is bounded by this.
+        row_group_size (int): Maximum Parquet row-group size.
+        id_col, time_col, lat_col, lon_col (str): Column names in the CSV.
+        **read_csv_kwargs: Passed to ``pd.read_csv``.
+
+    Returns:
+        dict: Store metadata (also written to ``root/_ais_store.json``), including
+        the number of rows and files written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if isinstance(csv_paths, (str, os.PathLike)):
+        csv_paths = [csv_paths]
+    os.makedirs(root, exist_ok=True)
+
+    meta_path = os.path.join(root, METADATA_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["tile_deg"] != tile_deg:
+            raise ValueError(f"Store at {root} uses tile_deg={meta['tile_deg']}, not {tile_deg}.")
+    else:
+        meta = {"tile_deg": tile_deg, "id_col": id_col, "time_col": time_col,
+                "lat_col": lat_col, "lon_col": lon_col, "n_rows": 0, "n_files": 0}
+
+    batch = meta["n_files"]
+    for path in csv_paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+            chunk[time_col] = pd.to_datetime(chunk[time_col])
+            chunk = chunk.dropna(subset=[id_col, time_col, lat_col, lon_col])
+            day = chunk[time_col].dt.strftime(DAY_FORMAT).to_numpy()
+            tile = _tile_index(chunk[lat_col].to_numpy(dtype=float), chunk[lon_col].to_numpy(dtype=float), tile_deg)
+
+            # One sort per chunk: partition, then vessel, then time
+            chunk = chunk.assign(_day=day, _tile=tile).sort_values(
+                ["_day", "_tile", id_col, time_col], kind="stable", ignore_index=True)
+            keys = chunk["_day"].to_numpy(dtype=object) + "/" + chunk["_tile"].astype(str).to_numpy(dtype=object)
+            bounds = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1], [True]]))
+            table = pa.Table.from_pandas(chunk.drop(columns=["_day", "_tile"]), preserve_index=False)
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                part_dir = os.path.join(root, f"day={chunk['_day'].iat[a]}", f"tile={chunk['_tile'].iat[a]}")
+                os.makedirs(part_dir, exist_ok=True)
+                pq.write_table(table.slice(a, b - a), os.path.join(part_dir, f"part-{batch:05d}.parquet"),
+                               row_group_size=row_group_size)
+                meta["n_files"] += 1
+            meta["n_rows"] += len(chunk)
+            batch += 1
+
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def _day_range(t_start, t_end):
+    days = pd.date_range(pd.Timestamp(t_start).normalize(), pd.Timestamp(t_end).normalize(), freq="D")
+    return [d.strftime(DAY_FORMAT) for d in days]
+
+
+def read_ais(root, bbox=None, t_start=None, t_end=None, columns=None, as_store=False):
+    """
+    Read AIS rows from a store, pushing time and area filters down.
+
+    Parameters:
+        root (str): Dataset directory written by ``ingest_ais_csv``.
+        bbox (tuple): (lon_min, lat_min, lon_max, lat_max); lon_min > lon_max crosses
+            the antimeridian.
+        t_start, t_end: Inclusive time range (anything ``pd.Timestamp`` accepts).
+        columns (list): Columns to read (the ID/time/lat/lon columns are always read).
+        as_store (bool): Return a TrackStore (keyed by the store's id column) instead
+            of a DataFrame.
+
+    Returns:
+        pd.DataFrame sorted by (id, time), or TrackStore.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    with open(os.path.join(root, METADATA_FILE)) as f:
+        meta = json.load(f)
+    id_col, time_col, lat_col, lon_col = meta["id_col"], meta["time_col"], meta["lat_col"], meta["lon_col"]
+
+    partitioning = ds.partitioning(pa.schema([("day", pa.string()), ("tile", pa.int64())]), flavor="hive")
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning,
+                         exclude_invalid_files=True, ignore_prefixes=["_", "."])
+
+    # Partition pruning on day/tile, then row-group statistics on the exact bounds
+    filt = None
+
+    def _and(expr):
+        return expr if filt is None else filt & expr
+
+    if t_start is not None or t_end is not None:
+        time_type = dataset.schema.field(time_col).type
+        lo = pd.Timestamp(t_start) if t_start is not None else None
+        hi = pd.Timestamp(t_end) if t_end is not None else None
+        if lo is not None and hi is not None:
+            filt = _and(ds.field("day").isin(_day_range(lo, hi)))
+        elif lo is not None:
+            filt = _and(ds.field("day") >= lo.strftime(DAY_FORMAT))
+        else:
+            filt = _and(ds.field("day") <= hi.strftime(DAY_FORMAT))
+        if lo is not None:
+            filt = _and(ds.field(time_col) >= pa.scalar(lo.value, type=pa.timestamp("ns")).cast(time_type))
+        if hi is not None:
+            filt = _and(ds.field(time_col) <= pa.scalar(hi.value, type=pa.timestamp("ns")).cast(time_type))
+
+    if bbox is not None:
+        lon_min, lat_min, lon_max, lat_max = bbox
+        filt = _and(ds.field("tile").isin(_tiles_for_bbox(bbox, meta["tile_deg"]).tolist()))
+        filt = _and((ds.field(lat_col) >= lat_min) & (ds.field(lat_col) <= lat_max))
+        if lon_min <= lon_max:
+            filt = _and((ds.field(lon_col) >= lon_min) & (ds.field(lon_col) <= lon_max))
+        else:
+            filt = _and((ds.field(lon_col) >= lon_min) | (ds.field(lon_col) <= lon_max))
+
+    if columns is not None:
+        columns = list(dict.fromkeys([id_col, time_col, lat_col, lon_col] + list(columns)))
+    else:
+        columns = [c for c in dataset.schema.names if c not in ("day", "tile")]
+
+    table = dataset.to_table(columns=columns, filter=filt)
+    table = table.sort_by([(id_col, "ascending"), (time_col, "ascending")])
+    df = table.to_pandas()
+    if as_store:
+        return TrackStore.from_pandas(df, id_col=id_col, time_col=time_col, lat_col=lat_col, lon_col=lon_col)
+    return df
+
+
+def read_region_tracks(root, region_geojson, t_start=None, t_end=None, margin_deg=0.5, **kwargs):
+    """
+    Read the AIS needed for ``extract_region_subtracks`` over a GeoJSON region.
+
+    The region's bounding box is widened by ``margin_deg`` so splines are fitted
+    with points just outside the region as well.
+
+    Returns:
+        TrackStore: Ready to pass to ``extract_region_subtracks`` (same column names).
+    """
+    from shapely.geometry import shape
+    lon_min, lat_min, lon_max, lat_max = shape(region_geojson["features"][0]["geometry"]).bounds
+    bbox = (max(lon_min - margin_deg, -180.0), max(lat_min - margin_deg, -90.0),
+            min(lon_max + margin_deg, 180.0), min(lat_max + margin_deg, 90.0))
+    return read_ais(root, bbox=bbox, t_start=t_start, t_end=t_end, as_store=True, **kwargs)
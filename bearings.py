@@ -0,0 +1,250 @@
+# bearings.py
+
+"""
+Bearing-only DF measurements and batched multi-site triangulation.
+
+Instead of a synthesized position fix, a DF site reports a line of bearing: the
+compass bearing from the site to the emitter plus Gaussian angular noise of
+``bearing_sigma_deg`` (sensor profile key, ``DEFAULT_BEARING_SIGMA_DEG`` if absent).
+
+``triangulate`` fuses near-simultaneous bearings from several sites into fixes.
+Every bearing is a line constraint n . (x - s) = 0 in a local east/north plane
+(km, same flat-earth scaling as ``offset_position``) around each event's sites.
+The weighted normal equations of all events are accumulated with ``np.bincount``
+and solved in closed form as 2x2 systems in one pass; weights 1 / (sigma * range)^2
+are refined from the previous solution, so the inverse normal matrix is the fix
+covariance in km^2.
+"""
+import numpy as np
+import pandas as pd
+
+from .geom_utils import compute_bearing
+from .sampling import resolve_rng
+
+DEFAULT_BEARING_SIGMA_DEG = 2.0
+KM_PER_DEG_LAT = 111.0
+KM_PER_DEG_LON = 111.320
+
+BEARING_COLUMNS = [
+    'detector_id', 'TrackID', 'detection_time', 'true_lat', 'true_lon', 'sensor_type',
+    'emitter_type', 'frequency_band', 'power_dbm', 'site_lat', 'site_lon',
+    'bearing_deg', 'bearing_sigma_deg', 'true_bearing_deg', 'is_false_alarm'
+]
+
+
+def bearing_sigma(sensor):
+    """1-sigma bearing error (degrees) of a DF sensor profile."""
+    return sensor.get('bearing_sigma_deg', DEFAULT_BEARING_SIGMA_DEG)
+
+
+def bearing_measurements(elint_df, site, sigma_deg, rng=None):
+    """
+    Convert detections into lines of bearing from one DF site.
+
+    Parameters:
+        elint_df (pd.DataFrame): Detections in the generator schema.
+        site (tuple): (lat, lon) of the DF site.
+        sigma_deg (float): 1-sigma bearing noise.
+        rng: See ``sampling.resolve_rng``.
+
+    The true bearing points at the true emitter position; for false alarms (no true
+    position) it points at the false alarm's reported position. Only the bearing
+    noise is drawn from ``rng``; ``detected_lat``/``detected_lon`` are only read for
+    rows without a true position.
+
+    Returns:
+        pd.DataFrame: Rows in ``BEARING_COLUMNS`` order.
+    """
+    rng = resolve_rng(rng)
+    n = len(elint_df)
+    true_lat = elint_df['true_lat'].to_numpy(dtype=float)
+    true_lon = elint_df['true_lon'].to_numpy(dtype=float)
+    target_lat, target_lon = true_lat, true_lon
+    if np.isnan(true_lat).any():
+        target_lat = np.where(np.isnan(true_lat), elint_df['detected_lat'].to_numpy(dtype=float), true_lat)
+        target_lon = np.where(np.isnan(true_lon), elint_df['detected_lon'].to_numpy(dtype=float), true_lon)
+
+    true_bearing = compute_bearing(site[0], site[1], target_lat, target_lon)
+    measured = (true_bearing + rng.normal(0, sigma_deg, n)) % 360
+
+    out = elint_df.reindex(columns=[c for c in BEARING_COLUMNS if c in elint_df.columns]).copy()
+    out['site_lat'] = site[0]
+    out['site_lon'] = site[1]
+    out['bearing_deg'] = measured
+    out['bearing_sigma_deg'] = sigma_deg
+    out['true_bearing_deg'] = true_bearing
+    if 'is_false_alarm' not in out.columns:
+        out['is_false_alarm'] = np.zeros(n, dtype=bool)
+    return out.reindex(columns=BEARING_COLUMNS)
+
+
+def generate_bearings(tracks, sensor_type, sensor_profiles, emitter_profiles, sites=None,
+                      rng=None, **kwargs):
+    """
+    Generate bearing measurements of a fleet from one or more DF sites.
+
+    Parameters:
+        tracks (pd.DataFrame or TrackStore): AIS tracks.
+        sensor_type (str): DF sensor profile; sets sample rate, range and ``bearing_sigma_deg``.
+        sites (list): (lat, lon) per site. Defaults to the profile's ``detector_location``.
+            Each site draws its own detection times.
+        rng: Random source for the bearing noise.
+        **kwargs: Passed to ``generate_elint_for_tracks`` (e.g. ``clutter=True``).
+
+    Returns:
+        pd.DataFrame: Bearings from all sites, sorted by detection time.
+    """
+    from .elint_generator import generate_elint_for_tracks
+
+    if sensor_profiles is None or sensor_type not in sensor_profiles:
+        raise ValueError(f"Sensor profile '{sensor_type}' not found.")
+    sensor = sensor_profiles[sensor_type]
+    if sites is None:
+        if not sensor.get('detector_location'):
+            raise ValueError(f"Sensor '{sensor_type}' has no detector_location; pass sites.")
+        sites = [sensor['detector_location']]
+    rng = resolve_rng(rng)
+    detector_id = kwargs.pop('detector_id', 0)
+
+    frames = []
+    for j, site in enumerate(sites):
+        site_profile = dict(sensor, detector_location=tuple(site))
+        detections = generate_elint_for_tracks(
+            tracks, sensor_type, {**sensor_profiles, sensor_type: site_profile},
+            emitter_profiles, detector_id=f"{detector_id}_{j}", **kwargs
+        )
+        if len(detections):
+            frames.append(bearing_measurements(detections, site, bearing_sigma(sensor), rng))
+    if not frames:
+        return pd.DataFrame(columns=BEARING_COLUMNS)
+    out = pd.concat(frames, ignore_index=True)
+    return out.sort_values('detection_time', kind='stable', ignore_index=True)
+
+
+def _local_xy(lat, lon, lat0, lon0):
+    """East/north offsets in km from (lat0, lon0), inverse of ``offset_position``."""
+    x = ((lon - lon0 + 180.0) % 360.0 - 180.0) * KM_PER_DEG_LON * np.cos(np.radians(lat0))
+    y = (lat - lat0) * KM_PER_DEG_LAT
+    return x, y
+
+
+def triangulate(bearings_df, window_sec=30.0, min_sites=2, group_col='TrackID', n_iter=3,
+                min_range_km=0.1):
+    """
+    Fuse near-simultaneous bearings from several sites into position fixes.
+
+    Bearings are grouped into fix events by ``group_col`` (the emitter or track the
+    bearings belong to; None treats all bearings as one emitter) and fixed windows
+    of ``window_sec``. All events are solved together as batched 2x2 weighted
+    least-squares systems.
+
+    Parameters:
+        bearings_df (pd.DataFrame): Output of ``generate_bearings`` / ``bearing_measurements``.
+        window_sec (float): Width of the time windows that form an event.
+        min_sites (int): Events with fewer distinct sites are dropped.
+        group_col (str or None): Column identifying the emitter; rows where it is
+            missing are ignored.
+        n_iter (int): Range-weight refinement passes after the initial solve.
+        min_range_km (float): Lower bound on the range used in the weights.
+
+    Returns:
+        pd.DataFrame: One row per fix with group_col, detection_time (mean), fix_lat,
+        fix_lon, true_lat/true_lon (mean, NaN if unknown), n_bearings, n_sites,
+        cov_ee_km2, cov_nn_km2, cov_en_km2 and the 1-sigma error_major_km,
+        error_minor_km, error_angle_deg (major axis, counterclockwise from east).
+        Geometrically degenerate events (e.g. parallel bearings) are dropped.
+    """
+    df = bearings_df
+    if group_col is not None:
+        df = df[df[group_col].notna()]
+    if len(df) == 0:
+        return pd.DataFrame()
+
+    t = df['detection_time'].to_numpy(dtype='datetime64[ns]').view(np.int64) / 1e9
+    bucket = np.floor(t / window_sec).astype(np.int64)
+    bucket -= bucket.min()
+    if group_col is not None:
+        group_codes, group_table = pd.factorize(df[group_col].to_numpy(dtype=object))
+    else:
+        group_codes, group_table = np.zeros(len(df), dtype=np.int64), np.array([None], dtype=object)
+    event_key = group_codes.astype(np.int64) * (bucket.max() + 1) + bucket
+    event_keys, event = np.unique(event_key, return_inverse=True)
+    n_events = len(event_keys)
+
+    site_lat = df['site_lat'].to_numpy(dtype=float)
+    site_lon = df['site_lon'].to_numpy(dtype=float)
+    bearing = np.radians(df['bearing_deg'].to_numpy(dtype=float))
+    sigma = np.radians(df['bearing_sigma_deg'].to_numpy(dtype=float))
+
+    # Distinct sites per event
+    _, site_code = np.unique(np.column_stack([site_lat, site_lon]), axis=0, return_inverse=True)
+    site_code = site_code.ravel()
+    pairs = np.unique(event.astype(np.int64) * (site_code.max() + 1) + site_code)
+    n_sites = np.bincount(pairs // (site_code.max() + 1), minlength=n_events)
+    n_bearings = np.bincount(event, minlength=n_events)
+
+    # Local plane around each event's mean site position
+    lat0 = np.bincount(event, weights=site_lat, minlength=n_events) / n_bearings
+    lon0 = np.bincount(event, weights=site_lon, minlength=n_events) / n_bearings
+    sx, sy = _local_xy(site_lat, site_lon, lat0[event], lon0[event])
+
+    # Line normal n = (cos b, -sin b) for direction (sin b, cos b) in (east, north)
+    nx, ny = np.cos(bearing), -np.sin(bearing)
+    ns = nx * sx + ny * sy
+
+    def solve(w):
+        a11 = np.bincount(event, weights=w * nx * nx, minlength=n_events)
+        a12 = np.bincount(event, weights=w * nx * ny, minlength=n_events)
+        a22 = np.bincount(event, weights=w * ny * ny, minlength=n_events)
+        r1 = np.bincount(event, weights=w * ns * nx, minlength=n_events)
+        r2 = np.bincount(event, weights=w * ns * ny, minlength=n_events)
+        det = a11 * a22 - a12 ** 2
+        ok = det > 1e-9 * (a11 + a22) ** 2
+        det = np.where(ok, det, np.nan)
+        x = (a22 * r1 - a12 * r2) / det
+        y = (a11 * r2 - a12 * r1) / det
+        return x, y, a22 / det, a11 / det, -a12 / det
+
+    x, y, *_ = solve(1.0 / sigma ** 2)
+    for _ in range(max(n_iter, 1)):
+        rng_km = np.hypot(x[event] - sx, y[event] - sy)
+        rng_km = np.maximum(np.nan_to_num(rng_km, nan=min_range_km), min_range_km)
+        x, y, cov_ee, cov_nn, cov_en = solve(1.0 / (sigma * rng_km) ** 2)
+
+    # Error ellipse from the 2x2 covariance
+    half_trace = 0.5 * (cov_ee + cov_nn)
+    root = np.sqrt((0.5 * (cov_ee - cov_nn)) ** 2 + cov_en ** 2)
+    major = np.sqrt(half_trace + root)
+    minor = np.sqrt(np.maximum(half_trace - root, 0.0))
+    angle = np.degrees(0.5 * np.arctan2(2 * cov_en, cov_ee - cov_nn))
+
+    fix_lat = lat0 + y / KM_PER_DEG_LAT
+    fix_lon = (lon0 + x / (KM_PER_DEG_LON * np.cos(np.radians(lat0))) + 180.0) % 360.0 - 180.0
+
+    true_lat = df['true_lat'].to_numpy(dtype=float)
+    true_lon = df['true_lon'].to_numpy(dtype=float)
+    has_truth = ~np.isnan(true_lat)
+    n_truth = np.bincount(event, weights=has_truth, minlength=n_events)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_true_lat = np.bincount(event, weights=np.where(has_truth, true_lat, 0.0), minlength=n_events) / n_truth
+        mean_true_lon = np.bincount(event, weights=np.where(has_truth, true_lon, 0.0), minlength=n_events) / n_truth
+    mean_t = np.bincount(event, weights=t - t.min(), minlength=n_events) / n_bearings + t.min()
+
+    fixes = pd.DataFrame({
+        group_col or 'group': group_table[event_keys // (bucket.max() + 1)],
+        'detection_time': pd.to_datetime(mean_t, unit='s'),
+        'fix_lat': fix_lat,
+        'fix_lon': fix_lon,
+        'true_lat': mean_true_lat,
+        'true_lon': mean_true_lon,
+        'n_bearings': n_bearings,
+        'n_sites': n_sites,
+        'cov_ee_km2': cov_ee,
+        'cov_nn_km2': cov_nn,
+        'cov_en_km2': cov_en,
+        'error_major_km': major,
+        'error_minor_km': minor,
+        'error_angle_deg': angle,
+    })
+    keep = (n_sites >= min_sites) & np.isfinite(fix_lat)
+    return fixes[keep].reset_index(drop=True)
@@ -0,0 +1,62 @@
+# bench_import.py
+
+"""
+Import-time benchmark for the elintgen package.
+
+Each case runs in a fresh interpreter (best of ``--repeat`` runs) and reports
+wall time and which heavy optional dependencies ended up loaded:
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 10
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ("scipy", "shapely", "geopandas", "plotly", "pyarrow", "numba")
+
+CASES = {
+    "numpy + pandas (baseline)": "import numpy, pandas",
+    "import elintgen": "import elintgen",
+    "generate detections (core)": (
+        "import elintgen\n"
+        "from elintgen import generate_elint_for_tracks"
+    ),
+    "elintgen.extract_region_subtracks (geo)": "import elintgen; elintgen.extract_region_subtracks",
+    "elintgen.init_map (plot)": "import elintgen; elintgen.init_map",
+}
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"sec": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_case(code, repeat):
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["sec"] < best["sec"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':45s} {'best [s]':>9s}  heavy modules loaded")
+    for name, code in CASES.items():
+        result = run_case(code, args.repeat)
+        print(f"{name:45s} {result['sec']:9.3f}  {', '.join(result['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
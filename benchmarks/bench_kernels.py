@@ -0,0 +1,127 @@
+# bench_kernels.py
+
+"""
+Benchmark of the per-sample generator kernels: a plain Python per-sample loop
+(the original generator structure) against the NumPy and Numba backends.
+
+All backends get the same pre-drawn random numbers, and the outputs are checked
+against the NumPy kernels before timing. A second table times thinning against a
+time-varying ``emission_prob`` callable: one call per sample (the original
+generator) against the per-minute bucketed evaluation in sampling.py.
+
+    python benchmarks/bench_kernels.py
+    python benchmarks/bench_kernels.py --sizes 10000 1000000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from elintgen.kernels import get_kernels, numba_available
+from elintgen.profiles import day_night_prob
+from elintgen.sampling import emission_probability
+
+DETECTOR = (23.565838, 119.609703)
+MAJOR_KM, MINOR_KM = 2.0, 0.3
+
+
+def python_loop(lat, lon, theta, u, p):
+    """Per-sample reference: thin, bearing-aligned ellipse, offset."""
+    out_lat, out_lon = [], []
+    phi1 = math.radians(DETECTOR[0])
+    for i in range(len(lat)):
+        if u[i] > p:
+            continue
+        phi2 = math.radians(lat[i])
+        dl = math.radians(lon[i] - DETECTOR[1])
+        x = math.sin(dl) * math.cos(phi2)
+        y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dl)
+        a = math.radians((math.degrees(math.atan2(x, y)) + 360) % 360)
+        dx = MAJOR_KM * math.cos(theta[i])
+        dy = MINOR_KM * math.sin(theta[i])
+        dx_rot = dx * math.cos(a) - dy * math.sin(a)
+        dy_rot = dx * math.sin(a) + dy * math.cos(a)
+        out_lat.append(lat[i] + dy_rot / 111.0)
+        out_lon.append(lon[i] + dx_rot / (111.320 * math.cos(math.radians(lat[i]))))
+    return np.array(out_lat), np.array(out_lon)
+
+
+def kernel_pipeline(kernels, lat, lon, theta, u, p):
+    keep = u <= p
+    lat, lon, theta = lat[keep], lon[keep], theta[keep]
+    angle = kernels.bearing_deg(DETECTOR[0], DETECTOR[1], lat, lon)
+    return kernels.inject_error(lat, lon, theta, angle, MAJOR_KM, MINOR_KM)
+
+
+def best_of(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-max", type=int, default=200_000,
+                        help="Skip the Python loop above this many samples")
+    args = parser.parse_args()
+
+    backends = {"numpy": get_kernels("numpy")}
+    if numba_available():
+        backends["numba"] = get_kernels("numba")
+        kernel_pipeline(backends["numba"], *(np.ones(2) for _ in range(4)), 0.5)  # compile
+    else:
+        print("numba not installed: timing the Python loop and NumPy only")
+
+    print(f"{'samples':>10s} {'python loop':>12s} " + " ".join(f"{b:>10s}" for b in backends))
+    for n in args.sizes:
+        rng = np.random.default_rng(0)
+        lat = rng.uniform(22, 25, n)
+        lon = rng.uniform(118, 121, n)
+        theta = rng.uniform(0, 2 * np.pi, n)
+        u = rng.random(n)
+        p = 0.7
+
+        ref = kernel_pipeline(backends["numpy"], lat, lon, theta, u, p)
+        for name, kernels in backends.items():
+            out = kernel_pipeline(kernels, lat, lon, theta, u, p)
+            assert np.allclose(out[0], ref[0], rtol=0, atol=1e-9) and np.allclose(out[1], ref[1], rtol=0, atol=1e-9), name
+
+        if n <= args.loop_max:
+            loop = best_of(lambda: python_loop(lat, lon, theta, u, p), 1)
+            loop_str = f"{loop:12.4f}"
+        else:
+            loop_str = f"{'-':>12s}"
+        times = [best_of(lambda k=k: kernel_pipeline(k, lat, lon, theta, u, p), args.repeat)
+                 for k in backends.values()]
+        print(f"{n:10d} {loop_str} " + " ".join(f"{t:10.4f}" for t in times))
+
+    emitter = {"emission_prob": lambda t: day_night_prob(t, 0.9, 0.2)}
+    print(f"\n{'samples':>10s} {'per-sample':>12s} {'bucketed':>10s}   (callable emission_prob, 60 s buckets)")
+    for n in args.sizes:
+        rng = np.random.default_rng(0)
+        times = np.sort(rng.uniform(1.7e9, 1.7e9 + 86_400, n))
+        u = rng.random(n)
+
+        def per_sample():
+            p = np.fromiter((emitter["emission_prob"](t) for t in pd.to_datetime(times, unit="s")),
+                            dtype=float, count=n)
+            return times[u <= p]
+
+        if n <= args.loop_max:
+            assert np.array_equal(per_sample(), times[u <= emission_probability(emitter, times)])
+            loop_str = f"{best_of(per_sample, 1):12.4f}"
+        else:
+            loop_str = f"{'-':>12s}"
+        bucketed = best_of(lambda: times[u <= emission_probability(emitter, times)], args.repeat)
+        print(f"{n:10d} {loop_str} {bucketed:10.4f}")
+
+
+if __name__ == "__main__":
+    main()
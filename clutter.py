@@ -0,0 +1,292 @@
+# clutter.py
+
+"""
+False-alarm (clutter) generation.
+
+False alarms are a spatio-temporal Poisson process per sensor: the number of
+false alarms over [t_start, t_end] is Poisson with mean ``rate * duration``, times
+are uniform over the span and positions are drawn over one of
+
+    - a GeoJSON region or shapely geometry (vectorized rejection inside its bbox)
+    - a lon/lat bounding box
+    - the sensor's own coverage disk (``detector_location`` + ``max_range_km`` or
+      ``coverage_radius_km``)
+
+optionally weighted by a ``DensityMap`` (inverse-CDF over grid cells). All draws are
+done in bulk batches, so millions of clutter points need no per-point Python.
+
+Sensor profiles may set ``false_alarm_rate_per_min``; otherwise the rate defaults
+to ``DEFAULT_FALSE_ALARM_FRACTION`` of the sensor's ``sample_rate_per_min``.
+Clutter rows use the regular detection schema with ``is_false_alarm = True``,
+no TrackID and NaN true positions.
+"""
+import numpy as np
+import pandas as pd
+
+from .compiled_profiles import CompiledProfiles
+from .geom_utils import haversine_km, offset_position
+from .sampling import resolve_rng
+
+DEFAULT_FALSE_ALARM_FRACTION = 0.1
+
+
+class DensityMap:
+    """
+    Relative false-alarm density on a regular lat/lon grid.
+
+    Parameters:
+        values (np.ndarray): Non-negative weights, shape (n_lat, n_lon); row 0 is the
+            southern edge.
+        bbox (tuple): (lon_min, lat_min, lon_max, lat_max) covered by the grid.
+
+    Cell weights are multiplied by the cell's area (cos latitude), so a constant map
+    gives uniform clutter per km^2.
+    """
+
+    def __init__(self, values, bbox):
+        self.values = np.asarray(values, dtype=float)
+        if self.values.ndim != 2 or np.any(self.values < 0):
+            raise ValueError("Density values must be a non-negative 2D array (n_lat, n_lon).")
+        self.bbox = tuple(float(v) for v in bbox)
+        n_lat, n_lon = self.values.shape
+        lon_min, lat_min, lon_max, lat_max = self.bbox
+        self.lat_edges = np.linspace(lat_min, lat_max, n_lat + 1)
+        self.lon_edges = np.linspace(lon_min, lon_max, n_lon + 1)
+        area = np.diff(np.sin(np.radians(self.lat_edges)))[:, None]
+        weights = (self.values * area).ravel()
+        if weights.sum() <= 0:
+            raise ValueError("Density map has no positive weight.")
+        self._cdf = np.cumsum(weights) / weights.sum()
+
+    @classmethod
+    def from_points(cls, lats, lons, bbox, shape=(100, 100), floor=0.0):
+        """
+        Density proportional to a 2D histogram of points (e.g. AIS positions, so
+        clutter follows traffic), plus an optional uniform ``floor`` per cell.
+        """
+        lon_min, lat_min, lon_max, lat_max = bbox
+        hist, _, _ = np.histogram2d(lats, lons, bins=shape,
+                                    range=[[lat_min, lat_max], [lon_min, lon_max]])
+        return cls(hist + floor, bbox)
+
+    def sample(self, n, rng):
+        """Draw ``n`` (lat, lon) positions distributed by the map."""
+        n_lon = self.values.shape[1]
+        cell = np.minimum(np.searchsorted(self._cdf, rng.random(n), side="right"), len(self._cdf) - 1)
+        iy, ix = np.divmod(cell, n_lon)
+        s0 = np.sin(np.radians(self.lat_edges[iy]))
+        s1 = np.sin(np.radians(self.lat_edges[iy + 1]))
+        lat = np.degrees(np.arcsin(rng.uniform(0, 1, n) * (s1 - s0) + s0))
+        lon = self.lon_edges[ix] + rng.uniform(0, 1, n) * (self.lon_edges[ix + 1] - self.lon_edges[ix])
+        return lat, lon
+
+
+def _sample_bbox(n, bbox, rng):
+    """Area-uniform positions in a lon/lat box."""
+    lon_min, lat_min, lon_max, lat_max = bbox
+    s0, s1 = np.sin(np.radians(lat_min)), np.sin(np.radians(lat_max))
+    lat = np.degrees(np.arcsin(rng.uniform(s0, s1, n)))
+    lon = rng.uniform(lon_min, lon_max, n)
+    return lat, lon
+
+
+def _sample_disk(n, center, radius_km, rng):
+    """Area-uniform positions within ``radius_km`` of ``center`` (lat, lon)."""
+    r = radius_km * np.sqrt(rng.random(n))
+    theta = rng.uniform(0, 2 * np.pi, n)
+    return offset_position(center[0], center[1], r * np.sin(theta), r * np.cos(theta))
+
+
+def _as_region(region):
+    if region is None or hasattr(region, "bounds"):
+        return region
+    from .detection_index import _as_geometry
+    return _as_geometry(region)
+
+
+def sample_positions(n, rng, region=None, bbox=None, density=None, center=None, radius_km=None,
+                     batch_size=1_000_000):
+    """
+    Draw ``n`` clutter positions over a region, box, density map and/or coverage disk.
+
+    Candidates are drawn from the density map (if given), else the disk, else the box
+    (the region's bounds if no box is given), and rejected in bulk when they fall
+    outside the region or disk. Batches are sized from the observed acceptance rate.
+
+    Returns:
+        tuple: (lat, lon) arrays of length ``n``.
+    """
+    region = _as_region(region)
+    if density is None and center is None and bbox is None:
+        if region is None:
+            raise ValueError("Clutter needs a region, bbox, density map or coverage disk.")
+        bbox = region.bounds
+
+    if density is not None:
+        draw = lambda m: density.sample(m, rng)
+    elif center is not None:
+        draw = lambda m: _sample_disk(m, center, radius_km, rng)
+    else:
+        draw = lambda m: _sample_bbox(m, bbox, rng)
+
+    def accept(lat, lon):
+        keep = np.ones(len(lat), dtype=bool)
+        if region is not None:
+            import shapely
+            keep &= shapely.contains_xy(region, lon, lat)
+        if center is not None and density is not None:
+            keep &= haversine_km(center[0], center[1], lat, lon) <= radius_km
+        if bbox is not None and density is not None:
+            keep &= (lon >= bbox[0]) & (lon <= bbox[2]) & (lat >= bbox[1]) & (lat <= bbox[3])
+        return keep
+
+    filtered = region is not None or density is not None
+    lats, lons = [], []
+    have, acceptance, attempts = 0, 1.0, 0
+    while have < n:
+        attempts += 1
+        if attempts > 1000:
+            raise ValueError("Clutter region does not overlap the sampling area.")
+        m = int(min(batch_size, max(64, 1.2 * (n - have) / acceptance)))
+        lat, lon = draw(m)
+        if filtered:
+            keep = accept(lat, lon)
+            lat, lon = lat[keep], lon[keep]
+        acceptance = max(len(lat) / m, 1e-3)
+        lats.append(lat)
+        lons.append(lon)
+        have += len(lat)
+    if not lats:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(lats)[:n], np.concatenate(lons)[:n]
+
+
+def coverage_disk(sensor):
+    """(center, radius_km) of a fixed sensor's coverage, or (None, None)."""
+    detector_loc = sensor.get('detector_location')
+    radius = sensor.get('max_range_km', sensor.get('coverage_radius_km'))
+    if detector_loc and radius:
+        return detector_loc, radius
+    return None, None
+
+
+def false_alarm_rate(sensor):
+    """Expected false alarms per minute for a sensor profile."""
+    return sensor.get('false_alarm_rate_per_min',
+                      DEFAULT_FALSE_ALARM_FRACTION * sensor['sample_rate_per_min'])
+
+
+def generate_clutter(sensor_type, sensor_profiles, t_start, t_end, emitter_profiles=None,
+                     emitter_types=None, region=None, bbox=None, density=None, rate_per_min=None,
+                     error_scale=1.0, detector_id=0, rng=None, detection_index=None):
+    """
+    Generate Poisson false alarms for one sensor over a time span.
+
+    Parameters:
+        sensor_type (str): Key into ``sensor_profiles``.
+        sensor_profiles (dict): Sensor profile registry.
+        t_start, t_end: Span (Timestamp, string or POSIX seconds).
+        emitter_profiles (dict): Emitter registry used to draw the (spurious) emitter
+            type, band and power of each false alarm.
+        emitter_types (list): Emitter types to draw from; defaults to all in the registry.
+        region: GeoJSON dict or shapely geometry limiting where clutter appears.
+        bbox (tuple): (lon_min, lat_min, lon_max, lat_max).
+        density (DensityMap): Optional non-uniform spatial density.
+        rate_per_min (float): Overrides the profile's false-alarm rate.
+        error_scale (float): Scales the reported error ellipse, as for true detections.
+        rng: See ``sampling.resolve_rng``.
+        detection_index (DetectionIndex): If given, the clutter rows are appended to it.
+
+    If no region, box or density is given, the sensor's coverage disk is used.
+
+    Returns:
+        pd.DataFrame: False-alarm rows in the detection schema, sorted by time.
+    """
+    from .detection_index import _to_ns
+    from .elint_generator import _error_angle_deg
+    from .error_model import covariance_terms, error_cholesky
+
+    if sensor_profiles is None or sensor_type not in sensor_profiles:
+        raise ValueError(f"Sensor profile '{sensor_type}' not found.")
+    sensor = sensor_profiles[sensor_type]
+    rng = resolve_rng(rng)
+
+    t0, t1 = _to_ns(t_start) / 1e9, _to_ns(t_end) / 1e9
+    rate = false_alarm_rate(sensor) if rate_per_min is None else rate_per_min
+    n = int(rng.poisson(rate / 60.0 * max(t1 - t0, 0.0)))
+    times = np.sort(rng.uniform(t0, t1, n))
+
+    detector_loc = sensor.get('detector_location')
+    center, radius = coverage_disk(sensor)
+    if center is None and region is None and bbox is None and density is None:
+        raise ValueError(
+            f"Sensor '{sensor_type}' has no fixed coverage disk; pass region, bbox or density."
+        )
+    if center is not None and (region is not None or bbox is not None) and density is None:
+        # Explicit area given: still limited to the sensor's reach
+        region = _intersect_disk(region, bbox, center, radius)
+        bbox = None
+        center = None
+    lat, lon = sample_positions(n, rng, region=region, bbox=bbox, density=density,
+                                center=center, radius_km=radius)
+
+    # Spurious emitter attributes, drawn from padded per-emitter tables
+    band, power, emitter_type = _draw_emitters(n, emitter_profiles, emitter_types, rng)
+
+    pos_error_major, pos_error_minor = sensor['pos_error_km']
+    pos_error_major *= float(error_scale)
+    pos_error_minor *= float(error_scale)
+    angle_deg = _error_angle_deg(sensor['error_bias'], detector_loc, lat, lon, rng)
+    cov_ee, cov_nn, cov_en = covariance_terms(error_cholesky(sensor, error_scale), angle_deg)
+
+    clutter_df = pd.DataFrame({
+        'detector_id': f"{sensor_type}_{detector_id}",
+        'TrackID': np.full(n, None, dtype=object),
+        'detection_time': pd.to_datetime(times, unit='s'),
+        'true_lat': np.full(n, np.nan),
+        'true_lon': np.full(n, np.nan),
+        'detected_lat': lat,
+        'detected_lon': lon,
+        'sensor_type': sensor_type,
+        'emitter_type': emitter_type,
+        'frequency_band': band,
+        'power_dbm': power,
+        'error_major_km': pos_error_major,
+        'error_minor_km': pos_error_minor,
+        'error_angle_deg': angle_deg,
+        'cov_ee_km2': cov_ee,
+        'cov_nn_km2': cov_nn,
+        'cov_en_km2': cov_en,
+        'is_false_alarm': np.ones(n, dtype=bool)
+    })
+
+    if detection_index is not None:
+        detection_index.add(clutter_df)
+    return clutter_df
+
+
+def _intersect_disk(region, bbox, center, radius_km):
+    """Shapely polygon of (region and/or bbox) clipped to a coverage disk."""
+    from shapely import affinity
+    from shapely.geometry import Point, box
+    # Same flat-earth scaling as offset_position
+    lat_r = radius_km / 111.0
+    lon_r = radius_km / (111.320 * np.cos(np.radians(center[0])))
+    disk = affinity.scale(Point(center[1], center[0]).buffer(1.0, 64), lon_r, lat_r)
+    area = disk
+    if region is not None:
+        area = area.intersection(_as_region(region))
+    if bbox is not None:
+        area = area.intersection(box(*bbox))
+    return area
+
+
+def _draw_emitters(n, emitter_profiles, emitter_types, rng):
+    """Vectorized (band, power, emitter_type) draws for ``n`` false alarms."""
+    if not emitter_profiles:
+        return np.full(n, None, dtype=object), np.full(n, np.nan), np.full(n, None, dtype=object)
+    names = list(emitter_types or emitter_profiles)
+    tables = CompiledProfiles({}, {e: emitter_profiles[e] for e in names})
+    which = rng.choice(len(names), n)
+    band = tables.band_names[tables.draw_bands(which, rng)]
+    return band, tables.draw_power(which, rng), tables.emitter_names[which]
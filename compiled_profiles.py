@@ -0,0 +1,236 @@
+# compiled_profiles.py
+
+"""
+Validation and compilation of the sensor / emitter profile registries.
+
+``compile_profiles`` turns the nested profile dicts into struct-of-arrays tables:
+sensors, emitters and frequency bands get integer codes, and every numeric
+parameter becomes a flat array indexed by code. Emitter bands are stored as a
+padded (n_emitters, max_bands) code matrix, so parameters for millions of
+(sample, sensor, emitter) rows are gathered by fancy indexing instead of
+per-row dict lookups.
+
+Time-varying ``emission_prob`` callables cannot be tabulated; they are evaluated
+once per (emitter, time bucket) by ``CompiledProfiles.emission_probability``.
+"""
+from numbers import Real
+
+import numpy as np
+
+from .error_model import DEFAULT_ERROR_MODEL, ERROR_MODELS, error_cholesky
+from .sampling import bucketed_probability
+
+ERROR_BIASES = ("none", "random", "random_small", "bearing_dominant")
+ARRIVAL_PROCESSES = ("poisson", "periodic", "jittered_periodic", "grid")
+
+
+def _is_number(value):
+    return isinstance(value, Real) and not isinstance(value, bool) and np.isfinite(value)
+
+
+def _is_pair(value):
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(_is_number(v) for v in value)
+
+
+def sensor_profile_errors(name, profile):
+    """Return a list of problems with one sensor profile (empty if valid)."""
+    errors = []
+    if not isinstance(profile, dict):
+        return [f"sensor '{name}': profile must be a dict"]
+    rate = profile.get('sample_rate_per_min')
+    if not _is_number(rate) or rate <= 0:
+        errors.append(f"sensor '{name}': sample_rate_per_min must be a positive number")
+    err = profile.get('pos_error_km')
+    if not _is_pair(err) or min(err) < 0:
+        errors.append(f"sensor '{name}': pos_error_km must be [major, minor] with non-negative values")
+    elif err[0] < err[1]:
+        errors.append(f"sensor '{name}': pos_error_km major axis is smaller than minor axis")
+    bias = profile.get('error_bias', 'none')
+    if bias not in ERROR_BIASES:
+        errors.append(f"sensor '{name}': unknown error_bias '{bias}'")
+    model = profile.get('error_model', DEFAULT_ERROR_MODEL)
+    if model not in ERROR_MODELS:
+        errors.append(f"sensor '{name}': unknown error_model '{model}'")
+    process = profile.get('arrival_process', 'poisson')
+    if process not in ARRIVAL_PROCESSES:
+        errors.append(f"sensor '{name}': unknown arrival_process '{process}'")
+    loc = profile.get('detector_location')
+    if loc is not None and (not _is_pair(loc) or abs(loc[0]) > 90 or abs(loc[1]) > 180):
+        errors.append(f"sensor '{name}': detector_location must be (lat, lon) in degrees")
+    if bias == 'bearing_dominant' and loc is None:
+        errors.append(f"sensor '{name}': bearing_dominant error_bias needs a detector_location")
+    for key in ('max_range_km', 'coverage_radius_km', 'bearing_sigma_deg',
+                'pass_sample_rate_per_min', 'false_alarm_rate_per_min', 'revisit_jitter_sec'):
+        if key in profile and (not _is_number(profile[key]) or profile[key] < 0):
+            errors.append(f"sensor '{name}': {key} must be a non-negative number")
+    orbit = profile.get('orbit')
+    if orbit is not None and (not isinstance(orbit, dict) or not _is_number(orbit.get('altitude_km'))):
+        errors.append(f"sensor '{name}': orbit must be a dict with altitude_km")
+    return errors
+
+
+def emitter_profile_errors(name, profile):
+    """Return a list of problems with one emitter profile (empty if valid)."""
+    errors = []
+    if not isinstance(profile, dict):
+        return [f"emitter '{name}': profile must be a dict"]
+    prob = profile.get('emission_prob')
+    if not callable(prob) and (not _is_number(prob) or not 0 <= prob <= 1):
+        errors.append(f"emitter '{name}': emission_prob must be in [0, 1] or a callable of a Timestamp")
+    power = profile.get('power_range_dbm')
+    if not _is_pair(power) or power[0] > power[1]:
+        errors.append(f"emitter '{name}': power_range_dbm must be [low, high]")
+    bands = profile.get('bands')
+    if not isinstance(bands, (list, tuple)) or not bands or not all(isinstance(b, str) for b in bands):
+        errors.append(f"emitter '{name}': bands must be a non-empty list of band names")
+    cycle = profile.get('activity_cycle_min')
+    if cycle is not None and (not _is_number(cycle) or cycle <= 0):
+        errors.append(f"emitter '{name}': activity_cycle_min must be a positive number")
+    return errors
+
+
+def validate_profiles(sensor_profiles=None, emitter_profiles=None):
+    """
+    Validate sensor and/or emitter registries.
+
+    Raises:
+        ValueError: Listing every problem found.
+    """
+    errors = []
+    for name, profile in (sensor_profiles or {}).items():
+        errors.extend(sensor_profile_errors(name, profile))
+    for name, profile in (emitter_profiles or {}).items():
+        errors.extend(emitter_profile_errors(name, profile))
+    if errors:
+        raise ValueError("Invalid profiles:\n  " + "\n  ".join(errors))
+
+
+class CompiledProfiles:
+    """
+    Struct-of-arrays view of a sensor and an emitter registry.
+
+    Sensor arrays (indexed by sensor code):
+        sample_rate_per_min, pos_error_major_km, pos_error_minor_km, error_bias
+        (code into ERROR_BIASES), error_model (code into ERROR_MODELS),
+        error_cholesky ((n, 2, 2) Cholesky factors of the 1-sigma error covariance
+        in the ellipse frame; see error_model.py), arrival_process (code into ARRIVAL_PROCESSES),
+        detector_lat, detector_lon, max_range_km (NaN if absent), bearing_sigma_deg,
+        has_orbit.
+
+    Emitter arrays (indexed by emitter code):
+        emission_prob (NaN where time-varying), time_varying, power_lo_dbm,
+        power_hi_dbm, n_bands, bands (padded band codes, -1 past n_bands),
+        activity_cycle_sec.
+
+    Name tables: sensor_names, emitter_names, band_names (object arrays); the
+    matching ``*_codes`` dicts map names to codes.
+    """
+
+    def __init__(self, sensor_profiles, emitter_profiles):
+        from .bearings import bearing_sigma
+        from .emitter_activity import activity_cycle_sec
+
+        self.sensor_profiles = sensor_profiles
+        self.emitter_profiles = emitter_profiles
+
+        sensors = list(sensor_profiles.values())
+        self.sensor_names = np.array(list(sensor_profiles), dtype=object)
+        self.sensor_codes = {name: i for i, name in enumerate(self.sensor_names)}
+        self.sample_rate_per_min = np.array([s['sample_rate_per_min'] for s in sensors], dtype=float)
+        self.pos_error_major_km = np.array([s['pos_error_km'][0] for s in sensors], dtype=float)
+        self.pos_error_minor_km = np.array([s['pos_error_km'][1] for s in sensors], dtype=float)
+        self.error_bias = np.array([ERROR_BIASES.index(s.get('error_bias', 'none')) for s in sensors],
+                                   dtype=np.int8)
+        self.error_model = np.array([ERROR_MODELS.index(s.get('error_model', DEFAULT_ERROR_MODEL)) for s in sensors],
+                                    dtype=np.int8)
+        self.error_cholesky = np.array([error_cholesky(s) for s in sensors], dtype=float).reshape(-1, 2, 2)
+        self.arrival_process = np.array([ARRIVAL_PROCESSES.index(s.get('arrival_process', 'poisson'))
+                                         for s in sensors], dtype=np.int8)
+        loc = [s.get('detector_location') or (np.nan, np.nan) for s in sensors]
+        self.detector_lat = np.array([p[0] for p in loc], dtype=float)
+        self.detector_lon = np.array([p[1] for p in loc], dtype=float)
+        self.max_range_km = np.array([s.get('max_range_km', s.get('coverage_radius_km', np.nan))
+                                      for s in sensors], dtype=float)
+        self.bearing_sigma_deg = np.array([bearing_sigma(s) for s in sensors], dtype=float)
+        self.has_orbit = np.array(['orbit' in s for s in sensors], dtype=bool)
+
+        emitters = list(emitter_profiles.values())
+        self.emitter_names = np.array(list(emitter_profiles), dtype=object)
+        self.emitter_codes = {name: i for i, name in enumerate(self.emitter_names)}
+        self.time_varying = np.array([callable(e['emission_prob']) for e in emitters], dtype=bool)
+        self.emission_prob = np.array([np.nan if callable(e['emission_prob']) else e['emission_prob']
+                                       for e in emitters], dtype=float)
+        self.power_lo_dbm = np.array([e['power_range_dbm'][0] for e in emitters], dtype=float)
+        self.power_hi_dbm = np.array([e['power_range_dbm'][1] for e in emitters], dtype=float)
+        self.activity_cycle_sec = np.array([activity_cycle_sec(e) for e in emitters], dtype=float)
+
+        self.band_names = np.array(sorted({b for e in emitters for b in e['bands']}), dtype=object)
+        self.band_codes = {name: i for i, name in enumerate(self.band_names)}
+        self.n_bands = np.array([len(e['bands']) for e in emitters], dtype=np.int64)
+        self.bands = np.full((len(emitters), int(self.n_bands.max(initial=1))), -1, dtype=np.int64)
+        for j, e in enumerate(emitters):
+            self.bands[j, :len(e['bands'])] = [self.band_codes[b] for b in e['bands']]
+
+    def __repr__(self):
+        return (f"CompiledProfiles(n_sensors={len(self.sensor_names)}, "
+                f"n_emitters={len(self.emitter_names)}, n_bands={len(self.band_names)})")
+
+    @staticmethod
+    def _encode(names, codes, kind):
+        values = np.asarray(names, dtype=object)
+        uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+        missing = [u for u in uniques if u not in codes]
+        if missing:
+            raise ValueError(f"{kind} profile '{missing[0]}' not found.")
+        return np.array([codes[u] for u in uniques], dtype=np.int64)[inverse].reshape(values.shape)
+
+    def sensor_code(self, names):
+        """Vectorized sensor name -> code."""
+        return self._encode(names, self.sensor_codes, "Sensor")
+
+    def emitter_code(self, names):
+        """Vectorized emitter name -> code."""
+        return self._encode(names, self.emitter_codes, "Emitter")
+
+    def draw_bands(self, emitter_codes, rng):
+        """One band code per row, uniform over each row's emitter bands."""
+        emitter_codes = np.asarray(emitter_codes, dtype=np.int64)
+        pick = np.floor(rng.random(len(emitter_codes)) * self.n_bands[emitter_codes]).astype(np.int64)
+        return self.bands[emitter_codes, pick]
+
+    def draw_power(self, emitter_codes, rng):
+        """One power (dBm) per row, uniform over each row's emitter power range."""
+        emitter_codes = np.asarray(emitter_codes, dtype=np.int64)
+        lo, hi = self.power_lo_dbm[emitter_codes], self.power_hi_dbm[emitter_codes]
+        return lo + rng.random(len(emitter_codes)) * (hi - lo)
+
+    def emission_probability(self, emitter_codes, times, resolution_sec=60.0):
+        """
+        Emission probability for each (emitter code, POSIX time) row.
+
+        Constant probabilities are gathered; time-varying ones are evaluated once
+        per distinct (emitter, ``resolution_sec`` bucket).
+        """
+        emitter_codes = np.asarray(emitter_codes, dtype=np.int64)
+        times = np.asarray(times, dtype=float)
+        p = self.emission_prob[emitter_codes]
+        varying = self.time_varying[emitter_codes]
+        for e in np.unique(emitter_codes[varying]):
+            rows = np.flatnonzero(emitter_codes == e)
+            p[rows] = bucketed_probability(self.emitter_profiles[self.emitter_names[e]]['emission_prob'],
+                                           times[rows], resolution_sec)
+        return p
+
+
+def compile_profiles(sensor_profiles=None, emitter_profiles=None, validate=True):
+    """
+    Validate (optionally) and compile registries into a CompiledProfiles.
+
+    Defaults to ``SENSOR_PROFILES`` / ``EMITTER_PROFILES``.
+    """
+    from .profiles import get_emitter_profiles, get_sensor_profiles
+    sensor_profiles = get_sensor_profiles() if sensor_profiles is None else sensor_profiles
+    emitter_profiles = get_emitter_profiles() if emitter_profiles is None else emitter_profiles
+    if validate:
+        validate_profiles(sensor_profiles, emitter_profiles)
+    return CompiledProfiles(sensor_profiles, emitter_profiles)
@@ -1,4 +1,5 @@
 from .complexity_base import ComplexityModule
+from .derived_tracks import DerivedTracks
 from .parallel_tracks import ParallelTracks
 from .merge_split_tracks import MergeSplitTracks
 from .shadow_track import ShadowTrack
@@ -12,6 +13,7 @@ from .scale_error_ellipses import ScaleErrorEllipses
 
 __all__ = [
     "ComplexityModule",
+    "DerivedTracks",
     "ParallelTracks",
     "MergeSplitTracks",
     "ShadowTrack",
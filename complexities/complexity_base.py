@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from elintgen.track_store import TrackStore, track_offsets
 
 class ComplexityModule(ABC):
     """
@@ -8,23 +11,142 @@ class ComplexityModule(ABC):
     def __init__(self, params: dict):
         self.params = params
 
+    def as_frame(self, tracks_df):
+        """Return the input as a DataFrame, converting from a TrackStore if needed."""
+        if isinstance(tracks_df, TrackStore):
+            return tracks_df.to_pandas()
+        return tracks_df
+
     def select_target_tracks(self, tracks_df):
         """
         Optionally filter which tracks to apply this module to.
         Override in subclasses or specify 'track_ids' in params.
+        Accepts a DataFrame or a TrackStore; always returns a DataFrame.
         """
         track_ids = self.params.get("track_ids", None)
+        if isinstance(tracks_df, TrackStore):
+            store = tracks_df.select(track_ids) if track_ids is not None else tracks_df
+            return store.to_pandas()
         if track_ids is not None:
             return tracks_df[tracks_df["TrackID"].isin(track_ids)].copy()
         return tracks_df.copy()
 
+    def iter_tracks(self, tracks_df):
+        """
+        Yield (track_id, group) pairs in sorted TrackID order.
+
+        Equivalent to ``tracks_df.groupby("TrackID")`` but sorts the frame once and
+        slices each group by CSR offsets, so groups are positional slices rather than copies.
+        """
+        order, track_ids, offsets = track_offsets(tracks_df["TrackID"].to_numpy())
+        ordered = tracks_df.take(order)
+        for i, tid in enumerate(track_ids):
+            yield tid, ordered.iloc[offsets[i]:offsets[i + 1]]
+
+    def target_rows(self, tracks_df, target_ids=None):
+        """
+        Rows of the targeted tracks in one take, grouped by TrackID in sorted order
+        (the order ``iter_tracks`` yields them), each track keeping its row order.
+
+        ``target_ids`` are matched as strings with one set lookup per distinct TrackID;
+        None selects every track.
+
+        Returns:
+            tuple: (frame, codes, unique_ids) where ``frame`` is a fresh DataFrame,
+                   ``codes[k]`` indexes the TrackID of row k in ``unique_ids``.
+        """
+        tracks_df = self.as_frame(tracks_df)
+        order, unique_ids, offsets = track_offsets(tracks_df["TrackID"].to_numpy())
+        codes = np.repeat(np.arange(len(unique_ids)), np.diff(offsets))
+        if target_ids is not None:
+            targets = {str(t) for t in target_ids}
+            wanted = np.fromiter((str(t) in targets for t in unique_ids), dtype=bool, count=len(unique_ids))
+            keep = wanted[codes]
+            order, codes = order[keep], codes[keep]
+        return tracks_df.take(order).reset_index(drop=True), codes, unique_ids
+
+    @staticmethod
+    def tag_synthetic(frame, codes, unique_ids, suffix, synthetic_type):
+        """Relabel rows as synthetic clones: ``<parent>_<suffix>`` IDs plus lineage columns."""
+        new_ids = np.array([f"{tid}_{suffix}" for tid in unique_ids], dtype=object)
+        frame["TrackID"] = new_ids[codes]
+        frame["ParentTrackID"] = unique_ids[codes]
+        frame["IsSynthetic"] = True
+        frame["SyntheticType"] = synthetic_type
+        return frame
+
+    def stack_time_variants(self, frame, codes, unique_ids, column, new_times, suffix, synthetic_type,
+                            extra_columns=None):
+        """
+        Build synthetic clones of ``frame`` for one or more time settings in one pass.
+
+        Parameters:
+            frame, codes, unique_ids: As returned by ``target_rows``.
+            column (str): Timestamp column that was transformed.
+            new_times (np.ndarray): Int64 ns, shape (n_settings, len(frame)).
+            suffix, synthetic_type (str): Clone labels (see ``tag_synthetic``).
+            extra_columns (dict): Column -> array of shape (n_settings, len(frame)) or
+                a scalar, added before the lineage columns.
+
+        Returns:
+            pd.DataFrame: Clones grouped by (setting, TrackID) and sorted by the new
+            time within each track. With several settings, clone IDs are
+            ``<parent>_<suffix>_<k>`` and a ``SweepIndex`` column holds ``k``.
+        """
+        new_times = np.atleast_2d(np.asarray(new_times, dtype=np.int64))
+        n_settings, n = new_times.shape
+        setting = np.repeat(np.arange(n_settings), n)
+        row = np.tile(np.arange(n), n_settings)
+        flat = new_times.ravel()
+
+        # Single sort of all variants: setting, then track, then new time
+        order = np.lexsort((flat, codes[row], setting))
+        out = frame.take(row[order]).reset_index(drop=True)
+        times = flat[order].view("datetime64[ns]")
+        dtype = frame[column].dtype
+        if isinstance(dtype, np.dtype) and dtype.kind == "M" and dtype != times.dtype:
+            # Keep a coarser input unit when the new times fit it exactly
+            unit_ns = np.timedelta64(1, np.datetime_data(dtype)[0]) // np.timedelta64(1, "ns")
+            if np.all(np.isnat(times) | (flat[order] % unit_ns == 0)):
+                times = times.astype(dtype)
+        out[column] = pd.to_datetime(times)
+        for name, values in (extra_columns or {}).items():
+            out[name] = np.asarray(values).ravel()[order] if np.ndim(values) else values
+
+        if n_settings == 1:
+            return self.tag_synthetic(out, codes[row[order]], unique_ids, suffix, synthetic_type)
+        keys = setting[order] * len(unique_ids) + codes[row[order]]
+        names = np.array([f"{tid}_{suffix}_{k}" for k in range(n_settings) for tid in unique_ids], dtype=object)
+        out["TrackID"] = names[keys]
+        out["ParentTrackID"] = unique_ids[codes[row[order]]]
+        out["IsSynthetic"] = True
+        out["SyntheticType"] = synthetic_type
+        out["SweepIndex"] = setting[order]
+        return out
+
+    def derive(self, tracks_df):
+        """
+        Describe this module's clones lazily, as a ``DerivedTracks`` (parent reference
+        plus per-clone transforms). Implemented by the clone-producing modules.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not produce derived tracks.")
+
+    def lazy_result(self, derived):
+        """
+        Result of a clone-producing ``apply``: the ``DerivedTracks`` itself when
+        ``params["lazy"]`` is set, otherwise its materialized DataFrame; None if empty.
+        """
+        if len(derived) == 0:
+            return None
+        return derived if self.params.get("lazy", False) else derived.to_pandas()
+
     @abstractmethod
     def apply(self, tracks_df, sensors=None, emitters=None):
         """
         Apply the complexity transformation.
 
         Parameters:
-            tracks_df (pd.DataFrame): The full AIS ground truth dataset.
+            tracks_df (pd.DataFrame or TrackStore): The full AIS ground truth dataset.
             sensors (dict): Optional sensor config.
             emitters (dict): Optional emitter config.
 
@@ -32,4 +154,3 @@ class ComplexityModule(ABC):
             pd.DataFrame: Combined DataFrame (original + new or modified rows).
         """
         pass
-
@@ -0,0 +1,264 @@
+# derived_tracks.py
+
+"""
+Lazy derived tracks: a parent reference plus a transform, materialized on demand.
+
+Complexity modules that clone tracks (``ShadowTrack``, ``ParallelTracks``,
+``MergeSplitTracks``, ``ScaleErrorEllipses``) can return a ``DerivedTracks`` instead
+of a full copy (``"lazy": True`` in their params). It keeps the parent frame by
+reference, one stable (track[, time]) row ordering of it, and one record per derived
+track:
+
+    parent, start, stop   parent track and the slice of its (ordered) rows to use
+    time_offset_ns        shift of the time column (ShadowTrack)
+    lateral_km, side      perpendicular offset from the local course; side is -1 (port),
+                          +1 (starboard) or 0 (random per point, drawn from side_seed)
+    rotate_deg, pivot,    rotation about a pivot of the rows from ``rotate_from`` on
+    rotate_from           (MergeSplitTracks)
+    error_scale           multiplier for the error ellipse columns (ScaleErrorEllipses)
+    new_id, synthetic_type, sweep, labeled
+                          output labels; unlabeled records re-emit the parent as is
+
+Memory grows with the number of derived tracks, not points. Rows are only built by
+``iter_chunks`` (a bounded number of derived tracks at a time), which backs
+``to_pandas``, ``to_parquet``/``to_csv`` and ``generate`` (chunks fed to
+``generate_elint_for_tracks``).
+"""
+import numpy as np
+import pandas as pd
+from elintgen.geom_utils import compute_bearing, offset_position
+from elintgen.track_store import TrackStore, to_datetime_ns, track_offsets
+
+NAT = np.iinfo(np.int64).min
+
+RECORD_DEFAULTS = {
+    "parent": 0, "start": 0, "stop": 0, "new_id": None, "synthetic_type": None,
+    "time_offset_ns": 0, "lateral_km": 0.0, "side": 0, "side_seed": 0,
+    "rotate_deg": 0.0, "rotate_from": -1, "pivot_lat": np.nan, "pivot_lon": np.nan,
+    "error_scale": 1.0, "sweep": -1, "labeled": True,
+}
+ERROR_COLUMNS = ("error_major_km", "error_minor_km")
+COVARIANCE_COLUMNS = ("cov_ee_km2", "cov_nn_km2", "cov_en_km2")
+
+
+def shift_times(values, offsets_ns):
+    """
+    Add int64 ns offsets to a timestamp column, keeping NaT and, when the results
+    fit it exactly, the column's datetime unit.
+    """
+    times = to_datetime_ns(values)
+    shifted = np.where(times == NAT, NAT, times + offsets_ns)
+    out = shifted.view("datetime64[ns]")
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind == "M" and dtype != out.dtype:
+        unit_ns = np.timedelta64(1, np.datetime_data(dtype)[0]) // np.timedelta64(1, "ns")
+        if np.all((shifted == NAT) | (shifted % unit_ns == 0)):
+            out = out.astype(dtype)
+    return pd.to_datetime(out)
+
+
+class DerivedTracks:
+    """
+    Derived tracks over one parent DataFrame (see the module docstring).
+
+    Parameters:
+        parent (pd.DataFrame or TrackStore): Source rows, kept by reference.
+        time_col (str): Timestamp column, used to order each track's rows and by
+            time offsets. None keeps each track's original row order.
+    """
+
+    def __init__(self, parent, time_col="Timestamp"):
+        if isinstance(parent, TrackStore):
+            parent = parent.to_pandas()
+        self.parent = parent
+        self.time_col = time_col if time_col in parent.columns else None
+        order, self.unique_ids, self.offsets = track_offsets(parent["TrackID"].to_numpy())
+        if self.time_col is not None:
+            # Time order within each track, NaT last (as ``sort_values``)
+            codes = np.repeat(np.arange(len(self.unique_ids)), np.diff(self.offsets))
+            times = to_datetime_ns(parent[self.time_col].to_numpy()[order])
+            order = order[np.lexsort((times, times == NAT, codes))]
+        self.order = order
+        self._pending = {name: [] for name in RECORD_DEFAULTS}
+        self._records = None
+
+    def __len__(self):
+        return len(self.records["parent"])
+
+    def __repr__(self):
+        return f"DerivedTracks(n_derived={len(self)}, n_rows={self.n_rows}, n_parent_rows={len(self.parent)})"
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def track_codes(self, target_ids=None):
+        """Parent track indices matching ``target_ids`` (as strings); None selects all."""
+        if target_ids is None:
+            return np.arange(len(self.unique_ids))
+        targets = {str(t) for t in target_ids}
+        return np.flatnonzero([str(t) in targets for t in self.unique_ids])
+
+    def track_length(self, i):
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+    def ordered(self, column):
+        """Values of ``column`` in derived row order (track ``i`` is ``offsets[i]:offsets[i + 1]``)."""
+        return self.parent[column].to_numpy()[self.order]
+
+    def add(self, parent, new_id, synthetic_type, start=0, stop=None, **transform):
+        """Append one derived track of parent track ``parent`` (rows ``start:stop``)."""
+        unknown = set(transform) - set(RECORD_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown transform fields: {sorted(unknown)}")
+        record = dict(RECORD_DEFAULTS, parent=parent, new_id=new_id, synthetic_type=synthetic_type, start=start,
+                      stop=self.track_length(parent) if stop is None else stop, **transform)
+        for name, value in record.items():
+            self._pending[name].append(value)
+        self._records = None
+        return self
+
+    @property
+    def records(self):
+        """Derived-track records as a dict of arrays."""
+        if self._records is None:
+            self._records = {name: np.array(values, dtype=object if RECORD_DEFAULTS[name] is None
+                                            else type(RECORD_DEFAULTS[name]))
+                             for name, values in self._pending.items()}
+        return self._records
+
+    @property
+    def n_rows(self):
+        """Rows the derived tracks would materialize to."""
+        rec = self.records
+        return int((rec["stop"] - rec["start"]).sum()) if len(rec["parent"]) else 0
+
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+    def materialize(self, a=0, b=None):
+        """Rows of derived tracks ``a:b`` as a DataFrame."""
+        rec = {name: values[a:b] for name, values in self.records.items()}
+        lengths = (rec["stop"] - rec["start"]).astype(np.int64)
+        first = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        rec_of_row = np.repeat(np.arange(len(lengths)), lengths)
+        local = np.arange(lengths.sum()) - first[rec_of_row]
+        pos = (self.offsets[rec["parent"]] + rec["start"])[rec_of_row] + local
+        frame = self.parent.take(self.order[pos]).reset_index(drop=True)
+
+        def per_row(name):
+            return rec[name][rec_of_row]
+
+        if self.time_col is not None and np.any(rec["time_offset_ns"] != 0):
+            frame[self.time_col] = shift_times(frame[self.time_col], per_row("time_offset_ns"))
+
+        lat = frame["Latitude"].to_numpy(dtype=float) if "Latitude" in frame.columns else None
+        lon = frame["Longitude"].to_numpy(dtype=float) if "Longitude" in frame.columns else None
+
+        lateral = per_row("lateral_km") != 0
+        if lat is not None and lateral.any():
+            # Course from each point to the next (the last point repeats the previous course)
+            row = np.arange(len(frame))
+            last = local == lengths[rec_of_row] - 1
+            src = np.where(last & (local > 0), row - 1, row)
+            dst = np.where(last, row, row + 1)
+            course = compute_bearing(lat[src], lon[src], lat[dst], lon[dst])
+            side = per_row("side").astype(float)
+            for r in np.flatnonzero((rec["side"] == 0) & (rec["lateral_km"] != 0)):
+                draws = np.random.default_rng(int(rec["side_seed"][r])).random(int(lengths[r]))
+                side[first[r]:first[r] + lengths[r]] = np.where(draws < 0.5, 1.0, -1.0)
+            angle = np.radians((course + side * 90) % 360)
+            dist = per_row("lateral_km")
+            new_lat, new_lon = offset_position(lat, lon, dx_km=dist * np.cos(angle), dy_km=dist * np.sin(angle))
+            lat, lon = np.where(lateral, new_lat, lat), np.where(lateral, new_lon, lon)
+
+        rotate_from = per_row("rotate_from")
+        rotated = (rotate_from >= 0) & (local >= rotate_from)
+        if lat is not None and rotated.any():
+            lat0, lon0 = per_row("pivot_lat"), per_row("pivot_lon")
+            dx_km = (lon - lon0) * 111.320 * np.cos(np.radians(lat0))
+            dy_km = (lat - lat0) * 111.0
+            theta = np.radians(per_row("rotate_deg"))
+            dx_rot = dx_km * np.cos(theta) - dy_km * np.sin(theta)
+            dy_rot = dx_km * np.sin(theta) + dy_km * np.cos(theta)
+            lat = np.where(rotated, lat0 + dy_rot / 111.0, lat)
+            lon = np.where(rotated, lon0 + dx_rot / (111.320 * np.cos(np.radians(lat0))), lon)
+
+        if lat is not None and (lateral.any() or rotated.any()):
+            frame["Latitude"] = lat
+            frame["Longitude"] = lon
+
+        if np.any(rec["error_scale"] != 1.0):
+            scale = per_row("error_scale")
+            for column in ERROR_COLUMNS:
+                if column in frame.columns:
+                    frame[column] = frame[column].to_numpy(dtype=float) * scale
+            for column in COVARIANCE_COLUMNS:
+                if column in frame.columns:
+                    frame[column] = frame[column].to_numpy(dtype=float) * scale ** 2
+
+        # Lineage columns depend on all records, not just this chunk's, so every chunk
+        # of one view has the same columns (NaN on unlabeled rows)
+        if self.records["labeled"].any():
+            labeled = per_row("labeled").astype(bool)
+            parent_ids = self.unique_ids[per_row("parent")]
+            synthetic = np.full(len(frame), np.nan, dtype=object)
+            synthetic[labeled] = True
+            frame["TrackID"] = np.where(labeled, per_row("new_id"), frame["TrackID"].to_numpy(dtype=object))
+            frame["ParentTrackID"] = np.where(labeled, parent_ids.astype(object), np.nan)
+            frame["IsSynthetic"] = True if labeled.all() and len(frame) else synthetic
+            frame["SyntheticType"] = np.where(labeled, per_row("synthetic_type"), np.nan)
+            if np.any(self.records["sweep"] >= 0):
+                frame["SweepIndex"] = per_row("sweep") if labeled.all() else np.where(labeled, per_row("sweep"), np.nan)
+        return frame
+
+    def iter_chunks(self, chunk_size=1000):
+        """Yield materialized DataFrames of up to ``chunk_size`` derived tracks each."""
+        for a in range(0, len(self), chunk_size):
+            yield self.materialize(a, a + chunk_size)
+
+    def to_pandas(self):
+        """Materialize every derived track into one DataFrame."""
+        return self.materialize()
+
+    def to_parquet(self, path, chunk_size=1000):
+        """Write all derived tracks to one Parquet file, one chunk at a time (needs pyarrow)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if len(self) == 0:
+            return
+        # A chunk may hold only unlabeled rows (all-null lineage columns), so the file
+        # schema also takes the types from the first labeled derived track
+        schema = pa.Schema.from_pandas(self.materialize(0, 1), preserve_index=False)
+        labeled = np.flatnonzero(self.records["labeled"])
+        if len(labeled):
+            schema = pa.unify_schemas([schema, pa.Schema.from_pandas(self.materialize(labeled[0], labeled[0] + 1),
+                                                                     preserve_index=False)],
+                                      promote_options="permissive")
+        writer = None
+        try:
+            for chunk in self.iter_chunks(chunk_size):
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def to_csv(self, path, chunk_size=1000, **kwargs):
+        """Write all derived tracks to one CSV file, one chunk at a time."""
+        for k, chunk in enumerate(self.iter_chunks(chunk_size)):
+            chunk.to_csv(path, mode="w" if k == 0 else "a", header=k == 0, index=False, **kwargs)
+
+    def generate(self, sensor_type, sensor_profiles, emitter_profiles, chunk_size=1000, **kwargs):
+        """
+        Run ``generate_elint_for_tracks`` over the derived tracks chunk by chunk.
+
+        Returns:
+            pd.DataFrame: Detections for all derived tracks.
+        """
+        from elintgen.elint_generator import generate_elint_for_tracks
+        frames = [generate_elint_for_tracks(chunk, sensor_type, sensor_profiles, emitter_profiles, **kwargs)
+                  for chunk in self.iter_chunks(chunk_size)]
+        frames = [df for df in frames if not df.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -1,9 +1,7 @@
 # merge_split_tracks.py
 
-import numpy as np
-import pandas as pd
-from elintgen.geom_utils import offset_position
 from .complexity_base import ComplexityModule
+from .derived_tracks import DerivedTracks
 
 class MergeSplitTracks(ComplexityModule):
     def __init__(self, params):
@@ -11,64 +9,32 @@ class MergeSplitTracks(ComplexityModule):
         self.mode = self.params.get("mode", "split")  # "split" or "merge"
         self.offset_bearing = self.params.get("offset_bearing", 15)  # degrees
 
-    def apply(self, tracks_df, sensors=None, emitters=None):
-        tracks_df = tracks_df.copy()
-        subset = self.select_target_tracks(tracks_df)
-        clones = []
+    def derive(self, tracks_df):
+        if self.mode not in ("split", "merge"):
+            raise ValueError(f"Unsupported mode: {self.mode}")
+        derived = DerivedTracks(self.as_frame(tracks_df))
+        lats, lons = derived.ordered("Latitude"), derived.ordered("Longitude")
 
-        for tid, track in subset.groupby("TrackID"):
-            track = track.sort_values("Timestamp").copy()
-            n = len(track)
+        for i in derived.track_codes(self.params.get("track_ids", None)):
+            n = derived.track_length(i)
             if n < 4:
                 continue
 
             midpoint_idx = n // 2
-            midpoint = track.iloc[midpoint_idx]
-            lat0, lon0 = midpoint["Latitude"], midpoint["Longitude"]
-
+            lat0 = lats[derived.offsets[i] + midpoint_idx]
+            lon0 = lons[derived.offsets[i] + midpoint_idx]
+            tid = derived.unique_ids[i]
+
+            # Original track, then the clone rotated around the midpoint:
+            # split rotates the second half, merge keeps only the (rotated) first half
+            derived.add(i, tid, None, labeled=False)
+            rotation = dict(rotate_deg=self.offset_bearing, pivot_lat=lat0, pivot_lon=lon0)
             if self.mode == "split":
-                new_track = track.copy()
-                diverging_part = new_track.iloc[midpoint_idx:].copy()
-
-            elif self.mode == "merge":
-                diverging_part = track.iloc[:midpoint_idx].copy()
-                new_track = diverging_part.copy()
-
+                derived.add(i, f"{tid}_split", "split", rotate_from=midpoint_idx, **rotation)
             else:
-                raise ValueError(f"Unsupported mode: {self.mode}")
-
-            # Apply bearing-based rotation around midpoint
-            rotated_latlon = []
-            for _, row in diverging_part.iterrows():
-                dx_km = (row["Longitude"] - lon0) * 111.320 * np.cos(np.radians(lat0))
-                dy_km = (row["Latitude"] - lat0) * 111.0
-
-                theta = np.radians(self.offset_bearing)
-                dx_rot = dx_km * np.cos(theta) - dy_km * np.sin(theta)
-                dy_rot = dx_km * np.sin(theta) + dy_km * np.cos(theta)
-
-                lat_rot = lat0 + dy_rot / 111.0
-                lon_rot = lon0 + dx_rot / (111.320 * np.cos(np.radians(lat0)))
-                rotated_latlon.append((lat_rot, lon_rot))
+                derived.add(i, f"{tid}_merge", "merge", 0, midpoint_idx, rotate_from=0, **rotation)
 
-            rotated_lat, rotated_lon = zip(*rotated_latlon)
-
-            if self.mode == "split":
-                new_track.iloc[midpoint_idx:, new_track.columns.get_loc("Latitude")] = rotated_lat
-                new_track.iloc[midpoint_idx:, new_track.columns.get_loc("Longitude")] = rotated_lon
-            elif self.mode == "merge":
-                new_track["Latitude"] = rotated_lat
-                new_track["Longitude"] = rotated_lon
-
-            new_track["TrackID"] = f"{tid}_{self.mode}"
-            new_track["SyntheticType"] = self.mode
-            new_track["IsSynthetic"] = True
-            new_track["ParentTrackID"] = tid
-
-            clones.append(track)
-            clones.append(new_track)
-
-        if clones:
-            return pd.concat(clones, ignore_index=True)
-        return None
+        return derived
 
+    def apply(self, tracks_df, sensors=None, emitters=None):
+        return self.lazy_result(self.derive(tracks_df))
@@ -1,5 +1,5 @@
 import pandas as pd
-import numpy as np
+from elintgen.sampling import resolve_rng
 from .complexity_base import ComplexityModule
 
 class MissingIDs(ComplexityModule):
@@ -8,28 +8,23 @@ class MissingIDs(ComplexityModule):
         self.fields = self.params.get("fields", [])
         self.keep_probability = self.params.get("keep_probability", 1.0)
         self.target_ids = self.params.get("track_ids", None)  # required to do anything
+        self.seed = self.params.get("seed", None)
 
     def apply(self, tracks_df, sensors=None, emitters=None):
+        tracks_df = self.as_frame(tracks_df)
         if not self.fields or not self.target_ids:
             return pd.DataFrame(columns=tracks_df.columns)  # no-op if not configured
 
-        tracks_df = tracks_df.copy()
-        modified_tracks = []
-
-        for tid, group in tracks_df.groupby("TrackID"):
-            if str(tid) not in self.target_ids:
-                continue
-
-            group = group.copy()
-            for field in self.fields:
-                if field in group.columns:
-                    mask = np.random.rand(len(group)) > self.keep_probability
-                    group.loc[mask, field] = None
-
-            modified_tracks.append(group)
-
-        if modified_tracks:
-            return pd.concat(modified_tracks, ignore_index=True)
-        else:
+        frame, _, _ = self.target_rows(tracks_df, self.target_ids)
+        if frame.empty:
             return pd.DataFrame(columns=tracks_df.columns)
 
+        # One null mask per field over all targeted rows
+        rng = resolve_rng(self.seed)
+        for field in self.fields:
+            if field in frame.columns:
+                mask = rng.random(len(frame)) > self.keep_probability
+                if mask.any():
+                    frame.loc[mask, field] = None
+
+        return frame
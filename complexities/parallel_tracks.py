@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
-from elintgen.geom_utils import offset_position, compute_bearing
 from .complexity_base import ComplexityModule
+from .derived_tracks import DerivedTracks
 
 class ParallelTracks(ComplexityModule):
     def __init__(self, params):
@@ -11,65 +11,32 @@ class ParallelTracks(ComplexityModule):
         self.time_range = self.params.get("time_range", None)  # e.g., {"start": "00:05", "end": "00:45"}
         self.target_ids = self.params.get("track_ids", None)
 
-    def apply(self, tracks_df, sensors=None, emitters=None):
-        tracks_df = tracks_df.copy()
-        subset = self.select_target_tracks(tracks_df)
-        clones = []
-
-        for tid, track in subset.groupby("TrackID"):
-            if self.target_ids and str(tid) not in self.target_ids:
-                continue
+    def derive(self, tracks_df):
+        derived = DerivedTracks(self.as_frame(tracks_df))
+        side = {"starboard": 1, "random": 0}.get(self.direction, -1)  # default: port
+        times = derived.ordered("Timestamp") if self.time_range else None
 
-            track = track.sort_values("Timestamp").copy()
+        for i in derived.track_codes(self.target_ids):
+            start, stop = 0, derived.track_length(i)
 
-            # Restrict to time range (relative to track start)
+            # Restrict to time range (relative to track start); rows are time-sorted
             if self.time_range:
-                t0 = track["Timestamp"].min()
+                track_times = pd.DatetimeIndex(times[derived.offsets[i]:derived.offsets[i + 1]])
+                t0 = track_times.min()
                 t_start = t0 + pd.to_timedelta(self.time_range.get("start", "0min"))
                 t_end = t0 + pd.to_timedelta(self.time_range.get("end", "9999min"))
-                track = track[(track["Timestamp"] >= t_start) & (track["Timestamp"] <= t_end)]
+                inside = np.flatnonzero((track_times >= t_start) & (track_times <= t_end))
+                start, stop = (inside[0], inside[-1] + 1) if len(inside) else (0, 0)
 
-            if len(track) < 2:
+            if stop - start < 2:
                 continue  # Not enough points to compute bearing
 
-            # Compute bearing between successive points
-            lat1 = track["Latitude"].values[:-1]
-            lon1 = track["Longitude"].values[:-1]
-            lat2 = track["Latitude"].values[1:]
-            lon2 = track["Longitude"].values[1:]
-            bearings = [
-                compute_bearing(lat1[i], lon1[i], lat2[i], lon2[i])
-                for i in range(len(lat1))
-            ]
-            bearings.append(bearings[-1])  # repeat last to match length
-
-            # Adjust bearings based on side
-            if self.direction == "random":
-                angles = [(b + (90 if np.random.rand() < 0.5 else -90)) % 360 for b in bearings]
-            elif self.direction == "starboard":
-                angles = [(b + 90) % 360 for b in bearings]
-            else:  # default: port
-                angles = [(b - 90) % 360 for b in bearings]
-
-            offsets = [
-                offset_position(lat, lon,
-                                dx_km=self.distance_km * np.cos(np.radians(a)),
-                                dy_km=self.distance_km * np.sin(np.radians(a)))
-                for lat, lon, a in zip(track["Latitude"], track["Longitude"], angles)
-            ]
+            # Offset perpendicular to the local course; random sides are drawn per point
+            tid = derived.unique_ids[i]
+            derived.add(i, f"{tid}_parallel", "parallel", start, stop, lateral_km=self.distance_km, side=side,
+                        side_seed=np.random.randint(2**31) if side == 0 else 0)
 
-            lat_out, lon_out = zip(*offsets)
-            new_track = track.copy()
-            new_track["Latitude"] = lat_out
-            new_track["Longitude"] = lon_out
-            new_track["TrackID"] = f"{tid}_parallel"
-            new_track["ParentTrackID"] = tid
-            new_track["IsSynthetic"] = True
-            new_track["SyntheticType"] = "parallel"
-
-            clones.append(new_track)
-
-        if clones:
-            return pd.concat(clones, ignore_index=True)
-        return None
+        return derived
 
+    def apply(self, tracks_df, sensors=None, emitters=None):
+        return self.lazy_result(self.derive(tracks_df))
@@ -1,6 +1,5 @@
 import pandas as pd
 import json
-from shapely.geometry import shape, Point
 from .complexity_base import ComplexityModule
 
 class ReportingGaps(ComplexityModule):
@@ -10,6 +9,7 @@ class ReportingGaps(ComplexityModule):
 
         gap_path = self.params.get("gap_region", None)
         if gap_path:
+            from shapely.geometry import shape
             with open(gap_path, "r") as f:
                 geojson = json.load(f)
                 self.gap_region = shape(geojson["features"][0]["geometry"])
@@ -18,13 +18,15 @@ class ReportingGaps(ComplexityModule):
 
 
     def apply(self, tracks_df, sensors=None, emitters=None):
+        tracks_df = self.as_frame(tracks_df)
         if self.gap_region is None:
             return pd.DataFrame(columns=tracks_df.columns)
+        from shapely.geometry import Point
 
         subset = self.select_target_tracks(tracks_df)
         modified_tracks = []
 
-        for tid, group in subset.groupby("TrackID"):
+        for tid, group in self.iter_tracks(subset):
             if str(tid) not in self.target_ids:
                 continue
 
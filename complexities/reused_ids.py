@@ -1,42 +1,39 @@
 import pandas as pd
 import numpy as np
-import random
 import string
+from elintgen.sampling import resolve_rng
 from .complexity_base import ComplexityModule
 
+ID_ALPHABET = np.array([ord(c) for c in string.ascii_uppercase + string.digits], dtype=np.uint32)
+
+
+def random_strings(n, length=6, rng=None):
+    """``n`` random uppercase/digit strings of ``length`` characters, drawn in one call."""
+    rng = resolve_rng(rng)
+    chars = ID_ALPHABET[np.floor(rng.random((n, length)) * len(ID_ALPHABET)).astype(np.int64)]
+    return np.ascontiguousarray(chars).view(f"<U{length}").ravel().astype(object)
+
+
 class ReusedIDs(ComplexityModule):
     def __init__(self, params):
         super().__init__(params)
         self.fields_to_replace = self.params.get("fields_to_replace", [])
         self.target_ids = self.params.get("track_ids", None)
-
-    def generate_random_string(self, length=6):
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+        self.seed = self.params.get("seed", None)
 
     def apply(self, tracks_df, sensors=None, emitters=None):
+        tracks_df = self.as_frame(tracks_df)
         if not self.target_ids:
             return pd.DataFrame(columns=tracks_df.columns)
 
-        tracks_df = tracks_df.copy()
-        subset = self.select_target_tracks(tracks_df)
-        reused_tracks = []
-
-        for tid, group in subset.groupby("TrackID"):
-            group = group.copy()
-
-            # Replace values in selected fields with synthetic ones
-            for field in self.fields_to_replace:
-                if field in group.columns:
-                    group[field] = self.generate_random_string()
-
-            group["TrackID"] = f"{tid}_reused"
-            group["ParentTrackID"] = tid
-            group["IsSynthetic"] = True
-            group["SyntheticType"] = "reused"
-
-            reused_tracks.append(group)
+        frame, codes, unique_ids = self.target_rows(tracks_df, self.target_ids)
+        if frame.empty:
+            return pd.DataFrame(columns=tracks_df.columns)
 
-        if reused_tracks:
-            return pd.concat(reused_tracks, ignore_index=True)
-        return pd.DataFrame(columns=tracks_df.columns)
+        # One synthetic value per (track, field), broadcast to the track's rows
+        rng = resolve_rng(self.seed)
+        for field in self.fields_to_replace:
+            if field in frame.columns:
+                frame[field] = random_strings(len(unique_ids), rng=rng)[codes]
 
+        return self.tag_synthetic(frame, codes, unique_ids, "reused", "reused")
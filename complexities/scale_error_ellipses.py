@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .complexity_base import ComplexityModule
+from .derived_tracks import DerivedTracks
 
 class ScaleErrorEllipses(ComplexityModule):
     def __init__(self, params):
@@ -8,18 +9,13 @@ class ScaleErrorEllipses(ComplexityModule):
         self.scale = self.params.get("error_scale", 1.0)
         self.target_ids = self.params.get("track_ids", None)
 
-    def apply(self, elint_df, **kwargs):
-        subset = self.select_target_tracks(elint_df)
-        scaled = []
-
-        for tid, group in subset.groupby("TrackID"):
-            group = group.copy()
-            group["error_major_km"] *= self.scale
-            group["error_minor_km"] *= self.scale
-            group["SyntheticType"] = "error_scaled"
-            group["IsSynthetic"] = True
-            group["ParentTrackID"] = tid
-            group["TrackID"] = f"{tid}_error{self.scale}"
-            scaled.append(group)
+    def derive(self, elint_df):
+        # Detections keep their row order within each track
+        derived = DerivedTracks(self.as_frame(elint_df), time_col=None)
+        for i in derived.track_codes(self.target_ids):
+            tid = derived.unique_ids[i]
+            derived.add(i, f"{tid}_error{self.scale}", "error_scaled", error_scale=self.scale)
+        return derived
 
-        return pd.concat(scaled, ignore_index=True) if scaled else None
+    def apply(self, elint_df, **kwargs):
+        return self.lazy_result(self.derive(elint_df))
@@ -1,39 +1,43 @@
 import pandas as pd
 import numpy as np
+from elintgen.sampling import resolve_rng
+from elintgen.track_store import to_datetime_ns
 from .complexity_base import ComplexityModule
 
+NAT = np.iinfo(np.int64).min
+
+
 class SensorLag(ComplexityModule):
+    """
+    Delay detection times by Gaussian lags.
+
+    ``mean_lag_seconds`` and ``jitter_seconds`` may be lists to sweep several
+    settings in one call (scalars broadcast); each setting becomes its own set of
+    ``<TrackID>_lagged_<k>`` clones, computed from one selection of the input.
+    """
+
     def __init__(self, params):
         super().__init__(params)
         self.mean_lag = self.params.get("mean_lag_seconds", 60)
         self.jitter = self.params.get("jitter_seconds", 0)
         self.target_ids = self.params.get("track_ids", None)
+        self.seed = self.params.get("seed", None)
 
     def apply(self, tracks_df, sensors=None, emitters=None):
-        subset = self.select_target_tracks(tracks_df)
-
-        modified_tracks = []
-
-        for tid, group in subset.groupby("TrackID"):
-            if str(tid) not in self.target_ids:
-                continue
-
-            group = group.copy()
-
-            delays = np.random.normal(loc=self.mean_lag, scale=self.jitter, size=len(group))
-            group["lag_seconds"] = delays
-            group["detection_time"] = group["detection_time"] + pd.to_timedelta(delays, unit="s")
-            group["WasLagged"] = True
-
-            group["TrackID"] = f"{tid}_lagged"
-            group["ParentTrackID"] = tid
-            group["IsSynthetic"] = True
-            group["SyntheticType"] = "lagged"
-
-            modified_tracks.append(group)
-
-        if modified_tracks:
-            return pd.concat(modified_tracks, ignore_index=True)
-        else:
-            return pd.DataFrame(columns=tracks_df.columns)
-
+        frame, codes, unique_ids = self.target_rows(tracks_df, self.target_ids)
+        if frame.empty:
+            return pd.DataFrame(columns=frame.columns)
+
+        mean_lag, jitter = np.broadcast_arrays(np.atleast_1d(self.mean_lag).astype(float),
+                                               np.atleast_1d(self.jitter).astype(float))
+        rng = resolve_rng(self.seed)
+        delays = rng.normal(loc=mean_lag[:, None], scale=jitter[:, None], size=(len(mean_lag), len(frame)))
+
+        times = to_datetime_ns(frame["detection_time"])
+        lagged = times + np.round(delays * 1e9).astype(np.int64)
+        lagged[:, times == NAT] = NAT
+
+        return self.stack_time_variants(
+            frame, codes, unique_ids, "detection_time", lagged, "lagged", "lagged",
+            extra_columns={"lag_seconds": delays, "WasLagged": True}
+        )
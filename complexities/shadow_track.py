@@ -1,34 +1,32 @@
 # shadow_track.py
 
-import pandas as pd
+import numpy as np
 from .complexity_base import ComplexityModule
+from .derived_tracks import DerivedTracks
+
 
 class ShadowTrack(ComplexityModule):
+    """
+    Time-lagged copies of tracks. ``lag_seconds`` may be a list to sweep several
+    lags in one call (``<TrackID>_shadow_<k>`` clones).
+    """
+
     def __init__(self, params):
         super().__init__(params)
         self.lag_seconds = self.params.get("lag_seconds", 120)
 
-    def apply(self, tracks_df, sensors=None, emitters=None):
-        tracks_df = tracks_df.copy()
-        subset = self.select_target_tracks(tracks_df)
-        clones = []
-
-        for tid, track in subset.groupby("TrackID"):
-            track = track.sort_values("Timestamp").copy()
-            shadow = track.copy()
+    def derive(self, tracks_df):
+        derived = DerivedTracks(self.as_frame(tracks_df))
+        codes = derived.track_codes(self.params.get("track_ids", None))
+        lags_ns = np.round(np.atleast_1d(self.lag_seconds).astype(float) * 1e9).astype(np.int64)
+        sweep = len(lags_ns) > 1
 
-            # Apply time lag
-            shadow["Timestamp"] = shadow["Timestamp"] + pd.to_timedelta(self.lag_seconds, unit='s')
-
-            # Assign shadow identity and metadata
-            shadow["TrackID"] = f"{tid}_shadow"
-            shadow["ParentTrackID"] = tid
-            shadow["SyntheticType"] = "shadow"
-            shadow["IsSynthetic"] = True
-
-            clones.append(shadow)
-
-        if clones:
-            return pd.concat(clones, ignore_index=True)
-        return None
+        for k, lag_ns in enumerate(lags_ns):
+            suffix = f"shadow_{k}" if sweep else "shadow"
+            for i in codes:
+                derived.add(i, f"{derived.unique_ids[i]}_{suffix}", "shadow", time_offset_ns=lag_ns,
+                            sweep=k if sweep else -1)
+        return derived
 
+    def apply(self, tracks_df, sensors=None, emitters=None):
+        return self.lazy_result(self.derive(tracks_df))
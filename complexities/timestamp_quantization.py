@@ -1,34 +1,46 @@
 import pandas as pd
+import numpy as np
+from elintgen.track_store import to_datetime_ns
 from .complexity_base import ComplexityModule
 
-class TimestampQuantization(ComplexityModule):
-    def __init__(self, params):
-        super().__init__(params)
-        self.resolution = self.params.get("resolution", "10s")
-        self.target_ids = self.params.get("track_ids", None)
-
-    def apply(self, tracks_df, sensors=None, emitters=None):
-        subset = self.select_target_tracks(tracks_df)
+NAT = np.iinfo(np.int64).min
 
-        modified_tracks = []
 
-        for tid, group in subset.groupby("TrackID"):
-            if str(tid) not in self.target_ids:
-                continue
+def round_ns(times, resolution_ns):
+    """
+    Round int64 nanosecond times to a multiple of ``resolution_ns``, ties to even
+    (as ``Series.dt.round``). NaT values are kept.
+    """
+    rem = times % resolution_ns
+    base = times - rem
+    up = (2 * rem > resolution_ns) | ((2 * rem == resolution_ns) & ((base // resolution_ns) % 2 == 1))
+    return np.where(times == NAT, NAT, base + up * resolution_ns)
 
-            group = group.copy()
-            group["detection_time"] = group["detection_time"].dt.round(self.resolution)
-            group["WasQuantized"] = True
 
-            group["TrackID"] = f"{tid}_quantized"
-            group["ParentTrackID"] = tid
-            group["IsSynthetic"] = True
-            group["SyntheticType"] = "quantized"
+class TimestampQuantization(ComplexityModule):
+    """
+    Round detection times to a reporting resolution.
 
-            modified_tracks.append(group)
+    ``resolution`` may be a list (e.g. ["1s", "10s", "1min"]) to sweep several
+    resolutions in one call; each becomes its own set of ``<TrackID>_quantized_<k>``
+    clones, computed from one selection of the input.
+    """
 
-        if modified_tracks:
-            return pd.concat(modified_tracks, ignore_index=True)
-        else:
-            return pd.DataFrame(columns=tracks_df.columns)
+    def __init__(self, params):
+        super().__init__(params)
+        self.resolution = self.params.get("resolution", "10s")
+        self.target_ids = self.params.get("track_ids", None)
 
+    def apply(self, tracks_df, sensors=None, emitters=None):
+        frame, codes, unique_ids = self.target_rows(tracks_df, self.target_ids)
+        if frame.empty:
+            return pd.DataFrame(columns=frame.columns)
+
+        resolutions = self.resolution if isinstance(self.resolution, (list, tuple)) else [self.resolution]
+        times = to_datetime_ns(frame["detection_time"])
+        quantized = np.stack([round_ns(times, pd.to_timedelta(r).value) for r in resolutions])
+
+        return self.stack_time_variants(
+            frame, codes, unique_ids, "detection_time", quantized, "quantized", "quantized",
+            extra_columns={"WasQuantized": True}
+        )
@@ -1,48 +1,72 @@
 import pandas as pd
 import numpy as np
-import random
 import string
+from elintgen.sampling import resolve_rng
 from .complexity_base import ComplexityModule
 
+# Replacement characters as sorted uint32 code points, for vectorized substitution
+CHAR_POOL = np.sort(np.array([ord(c) for c in string.ascii_letters + string.digits], dtype=np.uint32))
+
+
+def substitute_random_chars(values, rng):
+    """
+    Replace one random character of every string in ``values`` with a different
+    letter or digit, in one pass over a fixed-width NumPy unicode array.
+
+    Parameters:
+        values (array-like): Non-empty strings.
+        rng: NumPy random source.
+
+    Returns:
+        np.ndarray: Object array of modified strings.
+    """
+    arr = np.asarray(values, dtype=str)
+    n = len(arr)
+    if n == 0:
+        return np.empty(0, dtype=object)
+    width = arr.dtype.itemsize // 4
+    chars = arr.view(np.uint32).reshape(n, width).copy()
+    lengths = np.char.str_len(arr)
+    rows = np.arange(n)
+    pos = np.minimum((rng.random(n) * lengths).astype(np.int64), lengths - 1)
+
+    # Uniform over the pool minus the old character (the whole pool if it is not in it)
+    old = chars[rows, pos]
+    slot = np.searchsorted(CHAR_POOL, old)
+    in_pool = CHAR_POOL[np.minimum(slot, len(CHAR_POOL) - 1)] == old
+    k = np.floor(rng.random(n) * (len(CHAR_POOL) - in_pool)).astype(np.int64)
+    k += in_pool & (k >= slot)
+    chars[rows, pos] = CHAR_POOL[k]
+    return chars.view(f"<U{width}").ravel().astype(object)
+
+
 class TypoIDs(ComplexityModule):
     def __init__(self, params):
         super().__init__(params)
         self.fields = self.params.get("fields", [])
         self.typo_probability = self.params.get("typo_probability", 0.1)
         self.target_ids = self.params.get("track_ids", None)
-
-    def random_typo(self, value):
-        if not isinstance(value, str) or len(value) == 0:
-            return value
-        idx = random.randint(0, len(value) - 1)
-        char_pool = string.ascii_letters + string.digits
-        new_char = random.choice(char_pool.replace(value[idx], ""))
-        return value[:idx] + new_char + value[idx+1:]
+        self.seed = self.params.get("seed", None)
 
     def apply(self, tracks_df, sensors=None, emitters=None):
-        subset = self.select_target_tracks(tracks_df)
-
-        modified_tracks = []
+        frame, codes, unique_ids = self.target_rows(tracks_df, self.target_ids)
+        if frame.empty:
+            return pd.DataFrame(columns=frame.columns)
 
-        for tid, group in subset.groupby("TrackID"):
-            if str(tid) not in self.target_ids:
+        rng = resolve_rng(self.seed)
+        for field in self.fields:
+            if field not in frame.columns:
                 continue
+            mask = rng.random(len(frame)) < self.typo_probability
+            values = frame[field].to_numpy(dtype=object)
+            try:
+                lengths = pd.Series(values[mask], dtype=object).str.len().to_numpy(dtype=float)
+            except AttributeError:  # no strings in this field
+                continue
+            rows = np.flatnonzero(mask)[np.nan_to_num(lengths) > 0]  # non-empty strings only
+            if len(rows):
+                values = values.copy()
+                values[rows] = substitute_random_chars(values[rows], rng)
+                frame[field] = values
 
-            group = group.copy()
-            for field in self.fields:
-                if field in group.columns:
-                    mask = np.random.rand(len(group)) < self.typo_probability
-                    group.loc[mask, field] = group.loc[mask, field].apply(self.random_typo)
-
-            group["TrackID"] = f"{tid}_typo"
-            group["ParentTrackID"] = tid
-            group["IsSynthetic"] = True
-            group["SyntheticType"] = "typo"
-
-            modified_tracks.append(group)
-
-        if modified_tracks:
-            return pd.concat(modified_tracks, ignore_index=True)
-        else:
-            return pd.DataFrame(columns=tracks_df.columns)
-
+        return self.tag_synthetic(frame, codes, unique_ids, "typo", "typo")
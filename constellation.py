@@ -0,0 +1,295 @@
+# constellation.py
+
+"""
+Constellations of many fixed sensor sites (DF masts, shore radars, ...).
+
+A ``Constellation`` holds sensor instances as parallel arrays: a site ID, a profile
+key into the sensor registry, a location and optional per-site profile overrides
+(e.g. ``max_range_km`` or ``pos_error_km``). Each site's effective profile is the
+registry profile with ``detector_location`` set to the site.
+
+Sites are indexed by a KD-tree over unit vectors on the sphere (chord distance is
+monotonic in great-circle distance), so generation only pairs each chunk of tracks
+with the sites whose reach (``max_range_km`` / ``coverage_radius_km``, limited by
+the radio horizon, see coverage.py) touches the chunk. Sites without a range pair
+with every track. All relevant (track, site) pairs of a chunk are then generated in
+one batched pass: one spline fit for the fleet, one spline evaluation for all
+samples, and one detection frame per (site, emitter).
+"""
+import numpy as np
+import pandas as pd
+
+from .batch_spline import BatchSpline
+from .compiled_profiles import CompiledProfiles
+from .coverage import coverage_radius_km
+from .elint_generator import (_detections_at_times, _link_params, _replicate_candidates,
+                              _track_emitters)
+from .geom_utils import EARTH_RADIUS_KM, haversine_km
+from .kernels import get_kernels
+from .sampling import resolve_rng
+from .track_store import as_track_store
+
+
+def unit_vectors(lat, lon):
+    """(n, 3) unit vectors on the sphere for lat/lon arrays in degrees."""
+    phi, lam = np.radians(np.asarray(lat, dtype=float)), np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)])
+
+
+def chord_length(range_km):
+    """Unit-sphere chord length for a great-circle distance."""
+    return 2.0 * np.sin(np.minimum(np.asarray(range_km, dtype=float) / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+class Constellation:
+    """
+    Many sensor sites sharing a sensor profile registry.
+
+    Parameters:
+        sensor_profiles (dict): Registry the sites' ``sensor_type`` keys refer to.
+
+    Attributes:
+        site_ids, sensor_types (np.ndarray): Object arrays, one entry per site.
+        lats, lons (np.ndarray): Site locations.
+        overrides (list): Per-site profile overrides (dicts).
+
+    Sites added one at a time are buffered and appended to the arrays in one
+    concatenation on the next array access.
+    """
+
+    def __init__(self, sensor_profiles):
+        self.sensor_profiles = sensor_profiles
+        self._site_ids = np.empty(0, dtype=object)
+        self._sensor_types = np.empty(0, dtype=object)
+        self._lats = np.empty(0)
+        self._lons = np.empty(0)
+        self._pending = []
+        self.overrides = []
+        self._tree = None
+        self._ranges = None
+
+    def __len__(self):
+        return len(self._site_ids) + len(self._pending)
+
+    def __repr__(self):
+        types = ", ".join(f"{t}={n}" for t, n in zip(*np.unique(self.sensor_types.astype(str), return_counts=True)))
+        return f"Constellation(n_sites={len(self)}{', ' + types if types else ''})"
+
+    def add(self, site_id, sensor_type, location, **overrides):
+        """Add one site at ``location`` = (lat, lon), with optional profile overrides."""
+        if sensor_type not in self.sensor_profiles:
+            raise ValueError(f"Sensor profile '{sensor_type}' not found.")
+        self._pending.append((site_id, sensor_type, float(location[0]), float(location[1])))
+        self.overrides.append(dict(overrides))
+        self._tree = self._ranges = None
+        return self
+
+    def _consolidate(self):
+        if not self._pending:
+            return
+        site_ids, sensor_types, lats, lons = zip(*self._pending)
+        n = len(self._pending)
+        self._pending = []
+        self._site_ids = np.concatenate([self._site_ids, np.fromiter(site_ids, dtype=object, count=n)])
+        self._sensor_types = np.concatenate([self._sensor_types, np.fromiter(sensor_types, dtype=object, count=n)])
+        self._lats = np.concatenate([self._lats, lats])
+        self._lons = np.concatenate([self._lons, lons])
+
+    @property
+    def site_ids(self):
+        self._consolidate()
+        return self._site_ids
+
+    @property
+    def sensor_types(self):
+        self._consolidate()
+        return self._sensor_types
+
+    @property
+    def lats(self):
+        self._consolidate()
+        return self._lats
+
+    @property
+    def lons(self):
+        self._consolidate()
+        return self._lons
+
+    @classmethod
+    def from_frame(cls, sites_df, sensor_profiles, site_col="site_id", type_col="sensor_type",
+                   lat_col="lat", lon_col="lon"):
+        """
+        Build from a table of sites. Any other non-null column is a profile override
+        for that site (e.g. ``max_range_km``).
+        """
+        missing = [c for c in (site_col, type_col, lat_col, lon_col) if c not in sites_df.columns]
+        if missing:
+            raise ValueError(f"Sites table is missing columns: {missing}")
+        unknown = sorted(set(sites_df[type_col].astype(str)) - set(sensor_profiles))
+        if unknown:
+            raise ValueError(f"Sensor profile '{unknown[0]}' not found.")
+        extra = [c for c in sites_df.columns if c not in (site_col, type_col, lat_col, lon_col)]
+        con = cls(sensor_profiles)
+        con._site_ids = sites_df[site_col].to_numpy(dtype=object)
+        con._sensor_types = sites_df[type_col].astype(str).to_numpy(dtype=object)
+        con._lats = sites_df[lat_col].to_numpy(dtype=float)
+        con._lons = sites_df[lon_col].to_numpy(dtype=float)
+        records = sites_df[extra].to_dict("records") if extra else [{} for _ in range(len(sites_df))]
+        con.overrides = [{k: v for k, v in r.items() if not (np.isscalar(v) and pd.isna(v))} for r in records]
+        return con
+
+    def profile(self, i):
+        """Effective sensor profile of site ``i``."""
+        return {**self.sensor_profiles[self.sensor_types[i]],
+                'detector_location': (self.lats[i], self.lons[i]),
+                **self.overrides[i]}
+
+    def ranges_km(self):
+        """Reach of every site in km (inf where the profile sets no range)."""
+        if self._ranges is None:
+            radii = [coverage_radius_km(self.profile(i)) for i in range(len(self))]
+            self._ranges = np.array([np.inf if r is None else r for r in radii], dtype=float)
+        return self._ranges
+
+    def tree(self):
+        """KD-tree over the sites' unit vectors (built on first use)."""
+        if self._tree is None:
+            from scipy.spatial import cKDTree
+            self._tree = cKDTree(unit_vectors(self.lats, self.lons))
+        return self._tree
+
+    def pairs(self, lats, lons, point_track):
+        """
+        Relevant (site, track) pairs for a set of track points.
+
+        Parameters:
+            lats, lons (np.ndarray): Track points (e.g. all points of a chunk of tracks).
+            point_track (np.ndarray): Track index of each point.
+
+        Returns:
+            tuple: (site, track) index arrays, unique pairs sorted by site then track.
+        """
+        from scipy.spatial import cKDTree
+        ranges = self.ranges_km()
+        bounded = np.isfinite(ranges)
+        sites, tracks = [], []
+        if bounded.any():
+            points = cKDTree(unit_vectors(lats, lons))
+            dist = self.tree().sparse_distance_matrix(points, float(chord_length(ranges[bounded].max())),
+                                                      output_type="ndarray")
+            near = dist["v"] <= chord_length(ranges[dist["i"]])
+            near &= bounded[dist["i"]]
+            sites.append(dist["i"][near])
+            tracks.append(point_track[dist["j"][near]])
+        unbounded = np.flatnonzero(~bounded)
+        if len(unbounded):
+            chunk_tracks = np.unique(point_track)
+            sites.append(np.repeat(unbounded, len(chunk_tracks)))
+            tracks.append(np.tile(chunk_tracks, len(unbounded)))
+        if not sites:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        keys = np.unique(np.concatenate(sites).astype(np.int64) * (point_track.max() + 1)
+                         + np.concatenate(tracks).astype(np.int64))
+        return keys // (point_track.max() + 1), keys % (point_track.max() + 1)
+
+    def generate(self,
+                 tracks,
+                 emitter_profiles,
+                 emitter_type=None,
+                 error_scale=1.0,
+                 emitter_field="emitter_profile",
+                 emitter_fallback="nav_radar_x_band",
+                 min_points=2,
+                 interpolation="cubic",
+                 chunk_size=1000,
+                 link_budget=None,
+                 emission_resolution_sec=60.0,
+                 rng=None,
+                 backend="numpy"):
+        """
+        Generate detections from every site for the tracks in its reach.
+
+        Parameters:
+            tracks (pd.DataFrame or TrackStore): AIS tracks.
+            chunk_size (int): Tracks per chunk; each chunk queries the site index once
+                and is generated in one batched pass.
+            emission_resolution_sec (float): Bucket width for time-varying
+                ``emission_prob`` callables (see ``CompiledProfiles.emission_probability``).
+            Other parameters are as for ``generate_elint_for_tracks``.
+
+        Samples are kept only while the track is within the site's reach. Each row's
+        ``detector_id`` is ``<sensor_type>_<site_id>``.
+
+        Returns:
+            pd.DataFrame: Detections grouped by chunk, then site, then track, in time order.
+        """
+        rng = resolve_rng(rng)
+        kernels = get_kernels(backend)
+        store = as_track_store(tracks)
+        if len(store) == 0 or len(self) == 0:
+            return pd.DataFrame()
+        lengths = np.array([b - a for a, b in (store.bounds(i) for i in range(len(store)))], dtype=np.int64)
+        valid = np.flatnonzero(lengths >= min_points)
+        if len(valid) == 0:
+            return pd.DataFrame()
+
+        # Deterministic setup shared by all sites
+        splines = BatchSpline.from_store(store, kind=interpolation)
+        first, last = splines.offsets[:-1], splines.offsets[1:] - 1
+        emitter_names, emitter_of = _track_emitters(store, valid, emitter_type, emitter_field, emitter_fallback,
+                                                    emitter_profiles)
+        track_emitter = np.full(len(store), -1, dtype=np.int64)
+        track_emitter[valid] = emitter_of
+        tables = CompiledProfiles({}, {name: emitter_profiles[name] for name in emitter_names})
+        profiles = [self.profile(i) for i in range(len(self))]
+        links = [_link_params(p, link_budget) for p in profiles]
+        ranges = self.ranges_km()
+
+        frames = []
+        for c0 in range(0, len(valid), chunk_size):
+            chunk = valid[c0:c0 + chunk_size]
+            point_track = np.repeat(chunk, lengths[chunk])
+            rows = np.concatenate([np.arange(*store.bounds(i)) for i in chunk])
+            site_of, track_of = self.pairs(store.lats[rows], store.lons[rows], point_track)
+            if len(site_of) == 0:
+                continue
+
+            # Candidate times per site, drawn for all of its tracks at once
+            pair_site, pair_track, times = [], [], []
+            for s in np.unique(site_of):
+                t_idx = track_of[site_of == s]
+                _, j, t = _replicate_candidates(profiles[s], splines.knots[first[t_idx]],
+                                                splines.knots[last[t_idx]], 1, rng)
+                pair_site.append(np.full(len(t), s))
+                pair_track.append(t_idx[j])
+                times.append(t)
+            site, track, times = (np.concatenate(pair_site), np.concatenate(pair_track), np.concatenate(times))
+
+            keep = rng.random(len(times)) <= tables.emission_probability(track_emitter[track], times,
+                                                                         emission_resolution_sec)
+            site, track, times = site[keep], track[keep], times[keep]
+            positions = splines.evaluate(track, times)
+            in_range = haversine_km(self.lats[site], self.lons[site], positions[:, 0], positions[:, 1]) <= ranges[site]
+            site, track, times, positions = site[in_range], track[in_range], times[in_range], positions[in_range]
+            if len(times) == 0:
+                continue
+
+            # One detection frame per (site, emitter)
+            group = site * len(emitter_names) + track_emitter[track]
+            order = np.argsort(group, kind="stable")
+            bounds = np.flatnonzero(np.diff(group[order])) + 1
+            chunk_frames = []
+            for g_rows in np.split(order, bounds):
+                s, e = site[g_rows[0]], track_emitter[track[g_rows[0]]]
+                frame = _detections_at_times(
+                    store.track_ids[track[g_rows]], times[g_rows], positions[g_rows, 0], positions[g_rows, 1],
+                    self.sensor_types[s], profiles[s], emitter_names[e], emitter_profiles[emitter_names[e]],
+                    self.site_ids[s], error_scale, rng, kernels, links[s]
+                )
+                frame.index = g_rows[frame.index]
+                chunk_frames.append(frame)
+            frames.append(pd.concat(chunk_frames).sort_index())
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,181 @@
+# coverage.py
+
+"""
+Precomputed sensor coverage rasters.
+
+``build_coverage`` rasterizes a sensor's effective coverage onto a regular lat/lon
+grid once, from its profile and optional exclusion polygons:
+
+    disk      ``detector_location`` + ``max_range_km`` / ``coverage_radius_km``
+    horizon   ``antenna_height_m`` (and ``target_height_m``, default 10 m) limit the
+              range to the 4/3-earth radio horizon, 4.12 * (sqrt(h_a) + sqrt(h_t)) km
+    sector    ``sector_deg = (start, end)``: compass bearings from the site, clockwise;
+              wraps through north when start > end
+    no-go     ``exclusion_polygons`` (GeoJSON dict/file or shapely geometry) in the
+              profile or passed as ``exclusions`` (e.g. land masks for coastal radars)
+
+Cells are tested at their centers, so polygon tests run once per cell instead of
+once per sample. During generation, per-sample visibility is then a single
+vectorized gather (``CoverageRaster.visible``). Rasters can be cached on disk
+(``cache_dir``), keyed by the profile parameters, grid and exclusion geometry.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .geom_utils import compute_bearing, haversine_km
+
+DEFAULT_TARGET_HEIGHT_M = 10.0
+
+
+class CoverageRaster:
+    """
+    Boolean visibility on a regular lat/lon grid.
+
+    Parameters:
+        mask (np.ndarray): Visible cells, shape (n_lat, n_lon); row 0 is the southern edge.
+        bbox (tuple): (lon_min, lat_min, lon_max, lat_max) covered by the grid.
+
+    Positions outside the bbox are not visible.
+    """
+
+    def __init__(self, mask, bbox):
+        self.mask = np.asarray(mask, dtype=bool)
+        if self.mask.ndim != 2:
+            raise ValueError("Coverage mask must be a 2D array (n_lat, n_lon).")
+        self.bbox = tuple(float(v) for v in bbox)
+        n_lat, n_lon = self.mask.shape
+        lon_min, lat_min, lon_max, lat_max = self.bbox
+        self.lat_step = (lat_max - lat_min) / n_lat
+        self.lon_step = (lon_max - lon_min) / n_lon
+        self._flat = self.mask.ravel()
+
+    def __repr__(self):
+        return (f"CoverageRaster(shape={self.mask.shape}, bbox={self.bbox}, "
+                f"visible={self.mask.mean():.1%})")
+
+    def cell_centers(self):
+        """(lat, lon) center arrays of all cells, each of shape (n_lat, n_lon)."""
+        n_lat, n_lon = self.mask.shape
+        lats = self.bbox[1] + (np.arange(n_lat) + 0.5) * self.lat_step
+        lons = self.bbox[0] + (np.arange(n_lon) + 0.5) * self.lon_step
+        return np.meshgrid(lats, lons, indexing="ij")
+
+    def visible(self, lat, lon):
+        """Visibility of each (lat, lon) position, by one gather into the grid."""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        n_lat, n_lon = self.mask.shape
+        iy = np.floor((lat - self.bbox[1]) / self.lat_step).astype(np.int64)
+        ix = np.floor((lon - self.bbox[0]) / self.lon_step).astype(np.int64)
+        inside = (iy >= 0) & (iy < n_lat) & (ix >= 0) & (ix < n_lon)
+        cell = np.where(inside, iy * n_lon + ix, 0)
+        return inside & self._flat[cell]
+
+    def save(self, path):
+        """Write the raster to ``path`` (a .npz file)."""
+        with open(path, "wb") as f:
+            np.savez_compressed(f, mask=self.mask, bbox=np.array(self.bbox))
+
+    @classmethod
+    def load(cls, path):
+        """Load a raster written by ``save``."""
+        with np.load(path) as data:
+            return cls(data["mask"], tuple(data["bbox"]))
+
+
+def coverage_radius_km(sensor):
+    """Effective range of a sensor: its coverage radius, limited by the radio horizon."""
+    radius = sensor.get('max_range_km', sensor.get('coverage_radius_km'))
+    if sensor.get('antenna_height_m') is not None:
+        target = sensor.get('target_height_m', DEFAULT_TARGET_HEIGHT_M)
+        horizon = 4.12 * (np.sqrt(sensor['antenna_height_m']) + np.sqrt(target))
+        radius = horizon if radius is None else min(radius, horizon)
+    return radius
+
+
+def _exclusion_geometry(exclusions):
+    if exclusions is None:
+        return None
+    if isinstance(exclusions, str):
+        with open(exclusions) as f:
+            exclusions = json.load(f)
+    from .detection_index import _as_geometry
+    return _as_geometry(exclusions)
+
+
+def _cache_key(sensor, bbox, cell_deg, geometry):
+    payload = {
+        "site": list(sensor['detector_location']) if sensor.get('detector_location') else None,
+        "radius_km": coverage_radius_km(sensor),
+        "sector_deg": list(sensor['sector_deg']) if sensor.get('sector_deg') is not None else None,
+        "bbox": [round(float(v), 9) for v in bbox],
+        "cell_deg": float(cell_deg),
+        "exclusions": hashlib.sha256(geometry.wkb).hexdigest() if geometry is not None else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def build_coverage(sensor, bbox=None, cell_deg=0.01, exclusions=None, cache_dir=None):
+    """
+    Rasterize a sensor's effective coverage.
+
+    Parameters:
+        sensor (dict): Sensor profile (see the module docstring for the keys used).
+        bbox (tuple): (lon_min, lat_min, lon_max, lat_max). Defaults to the box around
+            the sensor's coverage disk; required for sensors without a fixed site or range.
+        cell_deg (float): Grid resolution in degrees.
+        exclusions: No-go polygons (GeoJSON dict or file path, or shapely geometry),
+            added to the profile's ``exclusion_polygons``.
+        cache_dir (str): If given, rasters are loaded from / saved to this directory.
+
+    Returns:
+        CoverageRaster
+    """
+    site = sensor.get('detector_location')
+    radius = coverage_radius_km(sensor)
+    if bbox is None:
+        if not site or radius is None:
+            raise ValueError("Coverage for a sensor without a fixed site and range needs a bbox.")
+        dlat = radius / 111.0
+        dlon = radius / (111.320 * np.cos(np.radians(min(abs(site[0]) + dlat, 89.0))))
+        bbox = (site[1] - dlon, site[0] - dlat, site[1] + dlon, site[0] + dlat)
+
+    geometry = _exclusion_geometry(sensor.get('exclusion_polygons'))
+    extra = _exclusion_geometry(exclusions)
+    if extra is not None:
+        geometry = extra if geometry is None else geometry.union(extra)
+
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, f"coverage_{_cache_key(sensor, bbox, cell_deg, geometry)}.npz")
+        if os.path.exists(path):
+            return CoverageRaster.load(path)
+
+    lon_min, lat_min, lon_max, lat_max = bbox
+    n_lat = max(int(np.ceil((lat_max - lat_min) / cell_deg)), 1)
+    n_lon = max(int(np.ceil((lon_max - lon_min) / cell_deg)), 1)
+    raster = CoverageRaster(np.ones((n_lat, n_lon), dtype=bool),
+                            (lon_min, lat_min, lon_min + n_lon * cell_deg, lat_min + n_lat * cell_deg))
+    lats, lons = raster.cell_centers()
+    mask = raster.mask
+
+    if site and radius is not None:
+        mask &= haversine_km(site[0], site[1], lats, lons) <= radius
+    if site and sensor.get('sector_deg') is not None:
+        start, end = (float(v) % 360 for v in sensor['sector_deg'])
+        bearing = compute_bearing(site[0], site[1], lats, lons)
+        mask &= ((bearing >= start) & (bearing <= end)) if start <= end else ((bearing >= start) | (bearing <= end))
+    if geometry is not None and mask.any():
+        import shapely
+        mask[mask] = ~shapely.contains_xy(geometry, lons[mask], lats[mask])
+
+    raster = CoverageRaster(mask, raster.bbox)
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        raster.save(tmp)
+        os.replace(tmp, path)
+    return raster
@@ -0,0 +1,315 @@
+# detection_index.py
+
+"""
+Spatio-temporal index over generated ELINT detections.
+
+Detections are bucketed by (time bucket, lat cell, lon cell) into a single sorted
+int64 key. A query only touches the key ranges of occupied time buckets that overlap
+its time window and bounding box (clamped to the indexed data's extent), then applies exact time / position / sensor / emitter filters to
+those candidates. The index can be filled incrementally while detections are
+generated and is saved next to the Parquet/CSV output.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+INDEX_SUFFIX = ".idx.npz"
+
+
+def _to_ns(t):
+    """Timestamp-like (str, datetime, POSIX seconds) -> int64 nanoseconds."""
+    if isinstance(t, (int, float, np.integer, np.floating)):
+        return int(round(float(t) * 1e9))
+    return pd.Timestamp(t).as_unit("ns").value
+
+
+class DetectionIndex:
+    """
+    Time-bucket x lat/lon grid index over detection rows.
+
+    Parameters:
+        time_bucket_sec (float): Width of a time bucket.
+        cell_deg (float): Size of a spatial grid cell in degrees.
+        lat_col, lon_col (str): Position columns to index (detected position by default).
+        time_col (str): Time column to index.
+
+    Row positions refer to the order in which rows were added, which matches the
+    order of the concatenated detection output.
+    """
+
+    def __init__(self, time_bucket_sec=600, cell_deg=0.25,
+                 lat_col="detected_lat", lon_col="detected_lon", time_col="detection_time"):
+        self.time_bucket_ns = int(time_bucket_sec * 1e9)
+        self.cell_deg = float(cell_deg)
+        self.lat_col, self.lon_col, self.time_col = lat_col, lon_col, time_col
+        self.n_lat = int(np.ceil(180.0 / self.cell_deg))
+        self.n_lon = int(np.ceil(360.0 / self.cell_deg))
+        # Keys are (bucket * n_lat + cy) * n_lon + cx; any datetime64[ns] bucket must fit in int64
+        if (2 ** 63 // self.time_bucket_ns + 1) * self.n_lat * self.n_lon >= 2 ** 63:
+            raise ValueError(
+                f"time_bucket_sec={time_bucket_sec} with cell_deg={cell_deg} gives "
+                f"{self.n_lat * self.n_lon} cells per bucket, too many for int64 keys; "
+                "use a coarser grid or longer time buckets."
+            )
+        self.sensor_codes = {}
+        self.emitter_codes = {}
+        self.frame = None
+
+        self._keys = np.empty(0, dtype=np.int64)
+        self._rows = np.empty(0, dtype=np.int64)
+        self._times = np.empty(0, dtype=np.int64)
+        self._lats = np.empty(0)
+        self._lons = np.empty(0)
+        self._sensor = np.empty(0, dtype=np.int32)
+        self._emitter = np.empty(0, dtype=np.int32)
+        self._pending = []
+        self._occupancy = None
+        self.n_rows = 0
+
+    def __len__(self):
+        return self.n_rows
+
+    def __repr__(self):
+        return f"DetectionIndex(n_rows={self.n_rows}, time_bucket_sec={self.time_bucket_ns / 1e9:g}, cell_deg={self.cell_deg:g})"
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _cells(self, lats, lons):
+        # Clipped, not wrapped, so lon=180 lands in the last cell as it does for query bounds
+        cy = np.clip((np.asarray(lats) + 90.0) // self.cell_deg, 0, self.n_lat - 1).astype(np.int64)
+        cx = np.clip((np.asarray(lons) + 180.0) // self.cell_deg, 0, self.n_lon - 1).astype(np.int64)
+        return cy, cx
+
+    def _key(self, bucket, cy, cx):
+        return (bucket * self.n_lat + cy) * self.n_lon + cx
+
+    def _encode(self, values, table):
+        codes = np.empty(len(values), dtype=np.int32)
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        lookup = np.array([table.setdefault(u, len(table)) for u in uniques], dtype=np.int32)
+        codes[:] = lookup[inverse] if len(uniques) else 0
+        return codes
+
+    def add(self, df):
+        """
+        Append a batch of detections. Rows get the next ``len(df)`` row positions.
+        """
+        n = len(df)
+        if n == 0:
+            return self
+        times = df[self.time_col].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        lats = df[self.lat_col].to_numpy(dtype=float)
+        lons = df[self.lon_col].to_numpy(dtype=float)
+        cy, cx = self._cells(lats, lons)
+        keys = self._key(times // self.time_bucket_ns, cy, cx)
+        sensor = (self._encode(df["sensor_type"], self.sensor_codes)
+                  if "sensor_type" in df.columns else np.full(n, -1, dtype=np.int32))
+        emitter = (self._encode(df["emitter_type"], self.emitter_codes)
+                   if "emitter_type" in df.columns else np.full(n, -1, dtype=np.int32))
+        rows = np.arange(self.n_rows, self.n_rows + n, dtype=np.int64)
+        self._pending.append((keys, rows, times, lats, lons, sensor, emitter))
+        self.n_rows += n
+        return self
+
+    def _consolidate(self):
+        if not self._pending:
+            return
+        parts = list(zip(*self._pending))
+        self._pending = []
+        arrays = [np.concatenate([old, *new]) for old, new in zip(
+            (self._keys, self._rows, self._times, self._lats, self._lons, self._sensor, self._emitter), parts
+        )]
+        order = np.argsort(arrays[0], kind="stable")
+        (self._keys, self._rows, self._times, self._lats, self._lons,
+         self._sensor, self._emitter) = (a[order] for a in arrays)
+        self._occupancy = None
+
+    def _occupied(self):
+        """Occupied time buckets (sorted) and the lat/lon cell extent of the indexed rows."""
+        if self._occupancy is None:
+            cells = self.n_lat * self.n_lon
+            buckets = self._keys // cells
+            starts = np.flatnonzero(np.diff(buckets, prepend=buckets[:1] - 1)) if len(buckets) else []
+            cy, cx = (self._keys % cells) // self.n_lon, self._keys % self.n_lon
+            extent = (cy.min(), cy.max(), cx.min(), cx.max()) if len(cy) else (0, -1, 0, -1)
+            self._occupancy = (buckets[starts], *(int(v) for v in extent))
+        return self._occupancy
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def query(self, t0, t1, bbox=None, polygon=None, sensor_type=None, emitter_type=None):
+        """
+        Find detections within a time window and area.
+
+        Parameters:
+            t0, t1: Window bounds (Timestamp, string or POSIX seconds), inclusive.
+            bbox (tuple): (lon_min, lat_min, lon_max, lat_max).
+            polygon: GeoJSON dict (FeatureCollection/Feature/geometry) or shapely geometry.
+            sensor_type, emitter_type (str or list): Optional attribute filters.
+
+        Returns:
+            pd.DataFrame if a frame is attached (see ``read_detections``), otherwise
+            a sorted array of row positions.
+        """
+        self._consolidate()
+        t0_ns, t1_ns = _to_ns(t0), _to_ns(t1)
+
+        geom = _as_geometry(polygon) if polygon is not None else None
+        if geom is not None:
+            gb = geom.bounds
+            bbox = gb if bbox is None else (max(bbox[0], gb[0]), max(bbox[1], gb[1]),
+                                            min(bbox[2], gb[2]), min(bbox[3], gb[3]))
+        if bbox is None:
+            bbox = (-180.0, -90.0, 180.0, 90.0)
+        lon_min, lat_min, lon_max, lat_max = bbox
+
+        # Candidate key ranges: one contiguous x-range per (occupied time bucket, lat row),
+        # with the window and box clamped to the buckets and cells that hold data
+        occupied, data_cy0, data_cy1, data_cx0, data_cx1 = self._occupied()
+        b0, b1 = t0_ns // self.time_bucket_ns, t1_ns // self.time_bucket_ns
+        (cy0, cy1), (cx0, cx1) = (map(int, c) for c in self._cells([lat_min, lat_max], [lon_min, lon_max]))
+        cy0, cy1 = max(cy0, data_cy0), min(cy1, data_cy1)
+        if lon_min <= lon_max:
+            x_ranges = [(max(cx0, data_cx0), min(cx1, data_cx1))]
+        else:  # antimeridian
+            x_ranges = [(max(cx0, data_cx0), data_cx1), (data_cx0, min(cx1, data_cx1))]
+        x_ranges = [(xa, xb) for xa, xb in x_ranges if xa <= xb]
+
+        buckets = occupied[np.searchsorted(occupied, b0, side="left"):np.searchsorted(occupied, b1, side="right")]
+        if len(buckets) == 0 or cy0 > cy1 or not x_ranges:
+            return self._result(np.empty(0, dtype=np.int64))
+        rows_y = np.arange(cy0, cy1 + 1, dtype=np.int64)
+        lo_parts, hi_parts = [], []
+        for xa, xb in x_ranges:
+            lo_parts.append(self._key(buckets[:, None], rows_y[None, :], xa).ravel())
+            hi_parts.append(self._key(buckets[:, None], rows_y[None, :], xb).ravel())
+        lo = np.searchsorted(self._keys, np.concatenate(lo_parts), side="left")
+        hi = np.searchsorted(self._keys, np.concatenate(hi_parts), side="right")
+        nonempty = hi > lo
+        lo, hi = lo[nonempty], hi[nonempty]
+        if len(lo) == 0:
+            return self._result(np.empty(0, dtype=np.int64))
+        lengths = hi - lo
+        cand = np.repeat(lo - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+
+        # Exact filters on the candidates only
+        lats, lons, times = self._lats[cand], self._lons[cand], self._times[cand]
+        keep = (times >= t0_ns) & (times <= t1_ns) & (lats >= lat_min) & (lats <= lat_max)
+        if lon_min <= lon_max:
+            keep &= (lons >= lon_min) & (lons <= lon_max)
+        else:
+            keep &= (lons >= lon_min) | (lons <= lon_max)
+        if sensor_type is not None:
+            keep &= np.isin(self._sensor[cand], self._lookup(sensor_type, self.sensor_codes))
+        if emitter_type is not None:
+            keep &= np.isin(self._emitter[cand], self._lookup(emitter_type, self.emitter_codes))
+        cand = cand[keep]
+        if geom is not None and len(cand):
+            import shapely
+            cand = cand[shapely.contains_xy(geom, self._lons[cand], self._lats[cand])]
+
+        return self._result(np.sort(self._rows[cand]))
+
+    @staticmethod
+    def _lookup(values, table):
+        values = [values] if isinstance(values, str) else values
+        return np.array([table[v] for v in values if v in table], dtype=np.int32)
+
+    def _result(self, rows):
+        if self.frame is not None:
+            return self.frame.iloc[rows]
+        return rows
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path):
+        """Write the index to ``path`` (a .npz file)."""
+        self._consolidate()
+        meta = {
+            "time_bucket_ns": self.time_bucket_ns, "cell_deg": self.cell_deg,
+            "lat_col": self.lat_col, "lon_col": self.lon_col, "time_col": self.time_col,
+            "sensor_codes": self.sensor_codes, "emitter_codes": self.emitter_codes,
+            "n_rows": self.n_rows,
+        }
+        with open(path, "wb") as f:
+            np.savez(f, keys=self._keys, rows=self._rows, times=self._times, lats=self._lats,
+                     lons=self._lons, sensor=self._sensor, emitter=self._emitter,
+                     meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by ``save``."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            index = cls(meta["time_bucket_ns"] / 1e9, meta["cell_deg"],
+                        meta["lat_col"], meta["lon_col"], meta["time_col"])
+            index.time_bucket_ns = meta["time_bucket_ns"]
+            index.sensor_codes = meta["sensor_codes"]
+            index.emitter_codes = meta["emitter_codes"]
+            index.n_rows = meta["n_rows"]
+            (index._keys, index._rows, index._times, index._lats, index._lons,
+             index._sensor, index._emitter) = (data[k] for k in
+                                               ("keys", "rows", "times", "lats", "lons", "sensor", "emitter"))
+        return index
+
+
+def _as_geometry(polygon):
+    """GeoJSON dict or shapely geometry -> shapely geometry (union of all features)."""
+    if hasattr(polygon, "bounds"):
+        return polygon
+    from shapely.geometry import shape
+    from shapely.ops import unary_union
+    if polygon.get("type") == "FeatureCollection":
+        return unary_union([shape(f["geometry"]) for f in polygon["features"]])
+    if polygon.get("type") == "Feature":
+        return shape(polygon["geometry"])
+    return shape(polygon)
+
+
+def write_detections(elint_df, path, index=None, **index_kwargs):
+    """
+    Write detections to Parquet (``.parquet``) or CSV and save a spatio-temporal index next to it.
+
+    Parameters:
+        elint_df (pd.DataFrame): Detections, in the row order the index was built with.
+        path (str): Output path.
+        index (DetectionIndex): Index built during generation; built here if None.
+
+    Returns:
+        DetectionIndex: The saved index.
+    """
+    if index is None:
+        index = DetectionIndex(**index_kwargs).add(elint_df)
+    elif index.n_rows != len(elint_df):
+        raise ValueError(f"Index covers {index.n_rows} rows but the output has {len(elint_df)}.")
+
+    if os.path.splitext(path)[1] == ".parquet":
+        elint_df.to_parquet(path, index=False)
+    else:
+        elint_df.to_csv(path, index=False)
+    index.save(path + INDEX_SUFFIX)
+    return index
+
+
+def read_detections(path):
+    """
+    Read detections written by ``write_detections`` together with their index.
+
+    Returns:
+        DetectionIndex: Index with the detections attached as ``index.frame``,
+        so ``index.query(...)`` returns DataFrame rows.
+    """
+    if os.path.splitext(path)[1] == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    index = DetectionIndex.load(path + INDEX_SUFFIX)
+    if index.time_col in df.columns:
+        df[index.time_col] = pd.to_datetime(df[index.time_col])
+    index.frame = df
+    return index
@@ -1,7 +1,215 @@
 import numpy as np
 import pandas as pd
-from scipy.interpolate import CubicSpline
-from .geom_utils import compute_bearing, offset_position
+from .access_windows import compute_access_windows, footprint_from_points, track_access_windows
+from .batch_spline import BatchSpline
+from .bearings import BEARING_COLUMNS, bearing_measurements, bearing_sigma
+from .clutter import coverage_disk, generate_clutter
+from .compiled_profiles import CompiledProfiles
+from .coverage import CoverageRaster, build_coverage, coverage_radius_km
+from .emitter_activity import ActivityTimelines
+from .error_model import covariance_terms, error_cholesky, error_model
+from .link_budget import apply_link_budget, link_parameters
+from .geom_utils import compute_bearing
+from .kernels import NUMPY_KERNELS, get_kernels
+from .sampling import draw_detection_times, thin_by_emission, resolve_rng
+from .track_store import TrackStore, as_track_store
+
+
+def _track_arrays(track_df, emitter_field):
+    """
+    Extract (track_id, times [s], latitudes, longitudes, emitter_value) for a single track.
+
+    DataFrames are sorted, cleaned of duplicate timestamps and converted; a single-track
+    TrackStore is already sorted and is read through zero-copy views.
+    """
+    if isinstance(track_df, TrackStore):
+        if len(track_df) != 1:
+            raise ValueError(
+                f"Expected a single-track TrackStore, got {len(track_df)} tracks. "
+                "Use generate_elint_for_tracks for multi-track stores."
+            )
+        track = track_df.track(0)
+        times = track.times / 1e9
+        latitudes, longitudes = track.lats, track.lons
+        keep = np.concatenate([[True], np.diff(track.times) != 0])
+        if not keep.all():
+            print(f"Dropped {(~keep).sum()} duplicate timestamps.")
+            times, latitudes, longitudes = times[keep], latitudes[keep], longitudes[keep]
+        emitter_value = track_df.column(emitter_field, 0)[0] if emitter_field in track_df.columns else None
+        return track.track_id, times, latitudes, longitudes, emitter_value
+
+    # Sort by TrackID + Timestamp to ensure temporal order
+    track_df = track_df.sort_values(by=["TrackID", "Timestamp"])
+
+    # Ensure Timestamp is datetime
+    track_df['Timestamp'] = pd.to_datetime(track_df['Timestamp'])
+
+    # Drop duplicate timestamps (can break spline interpolation)
+    duplicated_mask = track_df['Timestamp'].duplicated(keep='first')
+    if duplicated_mask.any():
+        print(f"Found repeated timestamps at indices: {np.where(duplicated_mask)[0]}")
+        track_df = track_df[~duplicated_mask].reset_index(drop=True)
+        print(f"Dropped {duplicated_mask.sum()} duplicate timestamps.")
+
+    # Convert times to POSIX seconds
+    times = track_df['Timestamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9
+    latitudes = track_df['Latitude'].values
+    longitudes = track_df['Longitude'].values
+    emitter_value = track_df[emitter_field].iloc[0] if emitter_field in track_df.columns else None
+    return track_df['TrackID'].iloc[0], times, latitudes, longitudes, emitter_value
+
+
+def _error_angle_deg(error_bias, detector_loc, lat, lon, rng, kernels=NUMPY_KERNELS):
+    """Orientation of the error ellipse (degrees) for each position, per the sensor's bias."""
+    n = len(lat)
+    if error_bias == 'random':
+        return rng.uniform(0, 360, n)
+    if error_bias == 'random_small':
+        return rng.normal(0, 10, n)
+    if error_bias == 'bearing_dominant' and detector_loc:
+        if np.ndim(detector_loc[0]):  # per-sample sensor positions (mobile platforms)
+            return compute_bearing(detector_loc[0], detector_loc[1], lat, lon)
+        return kernels.bearing_deg(detector_loc[0], detector_loc[1], lat, lon)
+    return np.zeros(n)
+
+
+def _link_params(sensor, link_budget):
+    """Resolve the generator's ``link_budget`` argument (None/False, True or a dict)."""
+    if not link_budget:
+        return None
+    return link_parameters(sensor, link_budget if isinstance(link_budget, dict) else None)
+
+
+def _resolve_coverage(coverage, sensor, store):
+    """Resolve the generator's ``coverage`` argument into a CoverageRaster (or None)."""
+    if coverage is None or coverage is False or isinstance(coverage, CoverageRaster):
+        return coverage
+    kwargs = dict(coverage) if isinstance(coverage, dict) else {}
+    if 'bbox' not in kwargs and (not sensor.get('detector_location') or coverage_radius_km(sensor) is None):
+        kwargs['bbox'] = (store.lons.min(), store.lats.min(), store.lons.max(), store.lats.max())
+    return build_coverage(sensor, **kwargs)
+
+
+def _check_measurement(measurement, sensor, sensor_type, detection_index=None):
+    """Validate the generator's ``measurement`` mode (and the index it would fill)."""
+    if measurement not in ("position", "bearing"):
+        raise ValueError(f"Unsupported measurement: {measurement}")
+    if measurement == "bearing":
+        if not sensor.get('detector_location'):
+            raise ValueError(f"Sensor '{sensor_type}' has no detector_location for bearing measurements.")
+        # true_lat/true_lon are NaN for false alarms, so bearings are indexed by the site
+        if detection_index is not None and (
+                detection_index.time_col not in BEARING_COLUMNS
+                or (detection_index.lat_col, detection_index.lon_col) != ('site_lat', 'site_lon')):
+            raise ValueError("Bearing output has no true position for false alarms; "
+                             "index bearings by lat_col='site_lat', lon_col='site_lon'.")
+
+
+def _detections_at_times(track_id, sample_times, lat, lon, sensor_type, sensor, emitter_type, emitter,
+                         detector_id, error_scale, rng, kernels=NUMPY_KERNELS, link=None, site=None,
+                         error_growth=None, measurement="position"):
+    """
+    Build detections from true positions at the kept sample times: draw band and
+    power, orient and apply the sensor's position error (see error_model.py).
+    ``track_id`` is one ID or an array with one ID per sample.
+
+    With ``measurement="bearing"`` no position error is drawn: the rows are lines of
+    bearing from the sensor's ``detector_location`` (see bearings.py), and only the
+    bearing noise is drawn after band, power and any link-budget gating.
+
+    With ``link`` (see link_budget.py), samples are first gated by their SNR-based
+    detection probability and the kept errors grow with 1/sqrt(SNR); ``snr_db`` and
+    ``range_km`` are added to the output, whose index holds the positions of the kept
+    samples in the input.
+
+    ``site`` gives per-sample (lat, lon) sensor positions for mobile platforms (see
+    platforms.py), used for bearing-dominant orientation and the link budget in place
+    of ``detector_location``; ``error_growth`` is an extra per-sample error multiplier.
+    """
+    n = len(sample_times)
+    pos_error_major, pos_error_minor = sensor['pos_error_km']
+    pos_error_major *= float(error_scale)
+    pos_error_minor *= float(error_scale)
+    chol = error_cholesky(sensor, error_scale)
+
+    # Pick frequency band and power
+    band = rng.choice(emitter['bands'], n)
+    power = rng.uniform(*emitter['power_range_dbm'], n)
+
+    # Range / SNR gating in one bulk pass
+    if link is not None:
+        keep, snr, range_km, growth = apply_link_budget(lat, lon, power, band, link, rng, site=site)
+        if np.ndim(track_id):
+            track_id = np.asarray(track_id)[keep]
+        sample_times, lat, lon, band, power = sample_times[keep], lat[keep], lon[keep], band[keep], power[keep]
+        snr, range_km, growth = snr[keep], range_km[keep], growth[keep]
+        if site is not None:
+            site = (site[0][keep], site[1][keep])
+        if error_growth is not None:
+            error_growth = error_growth[keep]
+        n = len(sample_times)
+    if error_growth is not None:
+        growth = error_growth * growth if link is not None else error_growth
+
+    if measurement == "bearing":
+        truth = pd.DataFrame({
+            'detector_id': f"{sensor_type}_{detector_id}",
+            'TrackID': np.full(n, track_id, dtype=object),
+            'detection_time': pd.to_datetime(sample_times, unit='s'),
+            'true_lat': lat,
+            'true_lon': lon,
+            'sensor_type': sensor_type,
+            'emitter_type': emitter_type,
+            'frequency_band': band,
+            'power_dbm': power,
+        })
+        if link is not None:
+            truth.index = np.flatnonzero(keep)
+        return bearing_measurements(truth, sensor['detector_location'], bearing_sigma(sensor), rng)
+
+    # Determine bias angle for error ellipse
+    detector_loc = site if site is not None else sensor.get('detector_location', None)
+    angle_deg = _error_angle_deg(sensor['error_bias'], detector_loc, lat, lon, rng, kernels)
+
+    # Apply position error with rotation
+    if error_model(sensor) == "boundary":
+        theta = rng.uniform(0, 2 * np.pi, n)
+        det_lat, det_lon = kernels.inject_error(lat, lon, theta, angle_deg, pos_error_major, pos_error_minor)
+    else:
+        z = rng.standard_normal((2, n))
+        det_lat, det_lon = kernels.gaussian_error(lat, lon, z[0], z[1], angle_deg, chol)
+    cov_ee, cov_nn, cov_en = covariance_terms(chol, angle_deg)
+    if link is not None or error_growth is not None:
+        det_lat = lat + (det_lat - lat) * growth
+        det_lon = lon + (det_lon - lon) * growth
+        pos_error_major, pos_error_minor = pos_error_major * growth, pos_error_minor * growth
+        cov_ee, cov_nn, cov_en = cov_ee * growth ** 2, cov_nn * growth ** 2, cov_en * growth ** 2
+
+    elint_df = pd.DataFrame({
+        'detector_id': f"{sensor_type}_{detector_id}",
+        'TrackID': np.full(n, track_id, dtype=object),
+        'detection_time': pd.to_datetime(sample_times, unit='s'),
+        'true_lat': lat,
+        'true_lon': lon,
+        'detected_lat': det_lat,
+        'detected_lon': det_lon,
+        'sensor_type': sensor_type,
+        'emitter_type': emitter_type,
+        'frequency_band': band,
+        'power_dbm': power,
+        'error_major_km': pos_error_major,
+        'error_minor_km': pos_error_minor,
+        'error_angle_deg': angle_deg,
+        'cov_ee_km2': cov_ee,
+        'cov_nn_km2': cov_nn,
+        'cov_en_km2': cov_en,
+        'is_false_alarm': np.zeros(n, dtype=bool)
+    })
+    if link is not None:
+        elint_df['snr_db'] = snr
+        elint_df['range_km'] = range_km
+        elint_df.index = np.flatnonzero(keep)
+    return elint_df
 
 
 def generate_elint_detections_from_spline(track_df, 
@@ -12,16 +220,27 @@ def generate_elint_detections_from_spline(track_df,
                                           detector_id=0,
                                           error_scale=1.0,           
                                           emitter_field="emitter_profile",  
-                                          emitter_fallback="nav_radar_x_band"):
+                                          emitter_fallback="nav_radar_x_band",
+                                          splines=None,
+                                          rng=None,
+                                          access_windows=None,
+                                          detection_index=None,
+                                          interpolation="cubic",
+                                          activity=None,
+                                          link_budget=None,
+                                          coverage=None,
+                                          backend="numpy",
+                                          measurement="position"):
     """
     Generate synthetic ELINT detections along a given AIS track using a cubic spline interpolator.
 
     Parameters
     ----------
-    track_df : pd.DataFrame
+    track_df : pd.DataFrame or TrackStore
         AIS track data with at least columns:
         ['TrackID', 'Timestamp', 'Longitude', 'Latitude'].
         Optionally includes emitter_field for automatic emitter resolution.
+        A TrackStore must hold exactly one track.
     sensor_type : str
         Key into sensor_profiles.
     emitter_type : str, optional
@@ -38,17 +257,51 @@ def generate_elint_detections_from_spline(track_df,
         Column in track_df to use for emitter auto-resolution.
     emitter_fallback : str, default "nav_radar_x_band"
         Fallback emitter profile if emitter_field is missing.
+    splines : tuple, optional
+        Pre-fitted (lat_spline, lon_spline) callables over POSIX seconds. When given,
+        the splines are used as-is instead of being re-fitted from the track.
+    rng : None, int or np.random.Generator, optional
+        Random source. None uses the global ``np.random`` state.
+    access_windows : AccessWindows, optional
+        Precomputed pass intervals for orbital sensors. If None and the sensor profile
+        has an ``orbit`` entry, windows are computed for this track's span and footprint.
+    detection_index : DetectionIndex, optional
+        If given, the generated detections are appended to this index.
+    interpolation : str, default "cubic"
+        Track interpolant when splines are not given: "cubic" (not-a-knot, as CubicSpline),
+        "akima" (less overshoot on noisy AIS) or "linear". See batch_spline.py.
+    activity : ActivityTimelines, optional
+        Shared Markov on/off timelines (see emitter_activity.py). When given, samples
+        are kept where this track's emitter timeline is on instead of being thinned
+        independently; a missing timeline is simulated and added.
+    backend : str, default "numpy"
+        Kernel backend for the per-sample error and bearing math: "numpy", "numba"
+        or "auto" (see kernels.py). Results are the same for the same seed.
+    link_budget : bool or dict, optional
+        Range/SNR-dependent detection probability and error growth for sensors with a
+        ``detector_location`` (see link_budget.py): True for the profile's parameters,
+        or a dict of overrides. Adds ``snr_db`` and ``range_km`` columns.
+    coverage : CoverageRaster, optional
+        Precomputed sensor coverage (see coverage.py); samples at positions outside
+        it are dropped with one array gather.
+    measurement : str, default "position"
+        "position" for position fixes, or "bearing" for lines of bearing from the
+        sensor's ``detector_location`` (see bearings.py). Bearings skip the position
+        error draws; a ``detection_index`` must then index ``site_lat``/``site_lon``.
+
+    Detection times are drawn directly from the sensor's arrival process
+    (``arrival_process`` in the sensor profile, Poisson by default; see sampling.py)
+    and thinned by the emitter's emission probability (or its activity timeline).
 
     Returns
     -------
     elint_df : pd.DataFrame
         Generated ELINT detections.
-    lat_spline, lon_spline : CubicSpline
+    lat_spline, lon_spline : PPoly
         Splines for latitude and longitude over time.
     """
 
-    # Sort by TrackID + Timestamp to ensure temporal order
-    track_df = track_df.sort_values(by=["TrackID", "Timestamp"])
+    track_id, times, latitudes, longitudes, emitter_value = _track_arrays(track_df, emitter_field)
 
     # Load sensor profile
     if sensor_profiles is None or sensor_type not in sensor_profiles:
@@ -57,8 +310,8 @@ def generate_elint_detections_from_spline(track_df,
 
     # --- Resolve emitter_type from track_df if not given ---
     if emitter_type is None:
-        if emitter_field in track_df.columns:
-            em = track_df[emitter_field].iloc[0]
+        if emitter_value is not None:
+            em = emitter_value
             emitter_type = em[0] if isinstance(em, (list, tuple)) else em
         else:
             emitter_type = emitter_fallback
@@ -67,105 +320,50 @@ def generate_elint_detections_from_spline(track_df,
     if emitter_profiles is None or emitter_type not in emitter_profiles:
         raise ValueError(f"Emitter profile '{emitter_type}' not found.")
     emitter = emitter_profiles[emitter_type]
+    _check_measurement(measurement, sensor, sensor_type, detection_index)
 
-    # Apply global error scale to sensor's position error
-    pos_error_major, pos_error_minor = sensor['pos_error_km']
-    pos_error_major *= float(error_scale)
-    pos_error_minor *= float(error_scale)
-
-    error_bias = sensor['error_bias']
-    detector_loc = sensor.get('detector_location', None)
-
-    elint_records = []
-
-    # Ensure Timestamp is datetime
-    track_df['Timestamp'] = pd.to_datetime(track_df['Timestamp'])
-
-    # Drop duplicate timestamps (can break spline interpolation)
-    duplicated_mask = track_df['Timestamp'].duplicated(keep='first')
-    if duplicated_mask.any():
-        print(f"Found repeated timestamps at indices: {np.where(duplicated_mask)[0]}")
-        track_df = track_df[~duplicated_mask].reset_index(drop=True)
-        print(f"Dropped {duplicated_mask.sum()} duplicate timestamps.")
-
-    # Convert times to POSIX seconds
-    times = track_df['Timestamp'].astype(np.int64).values / 1e9
-    latitudes = track_df['Latitude'].values
-    longitudes = track_df['Longitude'].values
+    rng = resolve_rng(rng)
+    kernels = get_kernels(backend)
 
     # Check monotonicity of timestamps
     if not np.all(np.diff(times) > 0):
         print("Warning: times aren't strictly increasing")
         print(np.diff(times))
 
-    # Fit cubic splines to lat/lon over time
-    lat_spline = CubicSpline(times, latitudes)
-    lon_spline = CubicSpline(times, longitudes)
-
-    # Determine sampling times
-    start_time = times[0]
-    end_time = times[-1]
-    duration_minutes = (end_time - start_time) / 60
-    n_samples = int(duration_minutes * sensor['sample_rate_per_min'] * 1.5)
-    sample_times = np.linspace(start_time, end_time, n_samples)
-    sample_timestamps = pd.to_datetime(sample_times, unit='s')
-
-    # Generate detections
-    for timestamp in sample_timestamps:
-        lat = lat_spline(timestamp.timestamp())
-        lon = lon_spline(timestamp.timestamp())
-
-        # Random chance to skip sample based on rate (1 per minute = 1.0)
-        if np.random.rand() > sensor['sample_rate_per_min']:
-            continue
+    # Fit splines to lat/lon over time
+    if splines is not None:
+        lat_spline, lon_spline = splines
+    else:
+        lat_spline, lon_spline = BatchSpline.fit(
+            times, np.column_stack([latitudes, longitudes]), [0, len(times)], kind=interpolation
+        ).track_splines(0)
 
-        # Probability of emitter being active
-        emit_prob = emitter['emission_prob'](timestamp) if callable(emitter['emission_prob']) else emitter['emission_prob']
-        if np.random.rand() > emit_prob:
-            continue
+    # Draw detection times from the sensor's arrival process, then thin by emitter activity.
+    # Splines are only evaluated at the surviving times.
+    if access_windows is None and 'orbit' in sensor:
+        access_windows = compute_access_windows(
+            sensor['orbit'], times[0], times[-1], footprint_from_points(latitudes, longitudes)
+        )
+    sample_times = draw_detection_times(sensor, times[0], times[-1], rng, windows=access_windows)
+    if activity is not None:
+        timeline = activity.ensure(track_id, emitter_type, times[0], times[-1], emitter_profiles, rng)
+        sample_times = sample_times[activity.is_on(timeline, sample_times)]
+    else:
+        sample_times = thin_by_emission(emitter, sample_times, rng)
+    lat, lon = lat_spline(sample_times), lon_spline(sample_times)
+    if coverage is not None:
+        visible = coverage.visible(lat, lon)
+        sample_times, lat, lon = sample_times[visible], lat[visible], lon[visible]
+    elint_df = _detections_at_times(
+        track_id, sample_times, lat, lon,
+        sensor_type, sensor, emitter_type, emitter, detector_id, error_scale, rng, kernels,
+        _link_params(sensor, link_budget), measurement=measurement
+    ).reset_index(drop=True)
 
-        # Pick frequency band and power
-        band = np.random.choice(emitter['bands'])
-        power = np.random.uniform(*emitter['power_range_dbm'])
-
-        # Determine bias angle for error ellipse
-        if error_bias == 'random':
-            angle_deg = np.random.uniform(0, 360)
-        elif error_bias == 'random_small':
-            angle_deg = np.random.normal(0, 10)
-        elif error_bias == 'bearing_dominant' and detector_loc:
-            angle_deg = compute_bearing(detector_loc[0], detector_loc[1], lat, lon) % 360
-        else:
-            angle_deg = 0
-
-        # Apply position error with rotation
-        theta = np.random.uniform(0, 2 * np.pi)
-        dx = pos_error_major * np.cos(theta)
-        dy = pos_error_minor * np.sin(theta)
-        angle_rad = np.radians(angle_deg)
-        dx_rot = dx * np.cos(angle_rad) - dy * np.sin(angle_rad)
-        dy_rot = dx * np.sin(angle_rad) + dy * np.cos(angle_rad)
-        det_lat, det_lon = offset_position(lat, lon, dx_rot, dy_rot)
-
-        # Append record
-        elint_records.append({
-            'detector_id': f"{sensor_type}_{detector_id}",
-            'TrackID': track_df['TrackID'].iloc[0],
-            'detection_time': timestamp,
-            'true_lat': lat,
-            'true_lon': lon,
-            'detected_lat': det_lat,
-            'detected_lon': det_lon,
-            'sensor_type': sensor_type,
-            'emitter_type': emitter_type,
-            'frequency_band': band,
-            'power_dbm': power,
-            'error_major_km': pos_error_major,
-            'error_minor_km': pos_error_minor,
-            'error_angle_deg': angle_deg
-        })
+    if detection_index is not None:
+        detection_index.add(elint_df)
 
-    return pd.DataFrame(elint_records), lat_spline, lon_spline
+    return elint_df, lat_spline, lon_spline
 
 def generate_elint_for_all_emitters(track_df,
                                     sensor_type,
@@ -177,11 +375,15 @@ def generate_elint_for_all_emitters(track_df,
                                     detector_id=0):
     """
     Generate a separate ELINT DataFrame for each emitter type in the track's emitter_field.
+    Accepts a DataFrame or a single-track TrackStore.
     Returns a list of DataFrames, one per emitter.
     """
     # Resolve list of emitters for this track
-    if emitter_field in track_df.columns:
-        em = track_df[emitter_field].iloc[0]
+    if isinstance(track_df, TrackStore):
+        em = track_df.column(emitter_field, 0)[0] if emitter_field in track_df.columns else None
+    else:
+        em = track_df[emitter_field].iloc[0] if emitter_field in track_df.columns else None
+    if em is not None:
         emitter_list = list(em) if isinstance(em, (list, tuple)) else [em]
     else:
         emitter_list = [emitter_fallback]
@@ -200,3 +402,323 @@ def generate_elint_for_all_emitters(track_df,
         elint_dfs.append(df_elint)
 
     return elint_dfs
+
+
+def generate_elint_for_tracks(tracks,
+                              sensor_type,
+                              sensor_profiles,
+                              emitter_profiles,
+                              emitter_type=None,
+                              error_scale=1.0,
+                              emitter_field="emitter_profile",
+                              emitter_fallback="nav_radar_x_band",
+                              detector_id=0,
+                              min_points=2,
+                              detection_index=None,
+                              interpolation="cubic",
+                              clutter=None,
+                              measurement="position",
+                              activity=None,
+                              link_budget=None,
+                              coverage=None,
+                              backend="numpy"):
+    """
+    Generate ELINT detections for every track in a multi-track DataFrame or TrackStore.
+
+    The input is converted to a TrackStore once; each track is then passed to
+    generate_elint_detections_from_spline as an O(1) zero-copy slice rather than
+    a groupby copy. Tracks with fewer than ``min_points`` points are skipped.
+    If ``detection_index`` is given, it is filled incrementally in output row order.
+    Splines for all tracks are fitted in one batched pass (see batch_spline.py).
+
+    ``clutter`` adds Poisson false alarms for the sensor over the fleet's time span
+    (see clutter.py): True for the defaults, or a dict of ``generate_clutter`` keyword
+    arguments. Sensors without a fixed coverage disk default to the fleet's bounding box.
+
+    ``activity`` shares emitter on/off state across sensors (see emitter_activity.py):
+    pass an ActivityTimelines built once with ``ActivityTimelines.from_tracks`` and
+    reuse it for every sensor, or True to simulate timelines for this call only.
+    Timelines missing from a passed ActivityTimelines are simulated in one batch and
+    added to it.
+
+    ``backend`` selects the per-sample kernels ("numpy", "numba" or "auto"; see kernels.py).
+
+    ``link_budget`` gates detections by range and SNR and grows their errors at low
+    SNR (True or a dict of overrides; see link_budget.py).
+
+    ``coverage`` drops samples outside the sensor's effective coverage (see coverage.py):
+    a prebuilt CoverageRaster, True to rasterize the profile, or a dict of
+    ``build_coverage`` keyword arguments (e.g. ``exclusions``, ``cell_deg``, ``cache_dir``).
+    Sensors without a fixed site and range default to the fleet's bounding box.
+
+    ``measurement="bearing"`` returns lines of bearing from the sensor's
+    ``detector_location`` instead of position fixes (see bearings.py); no position
+    error is drawn for them. False alarms have no true position, so a
+    ``detection_index`` for bearings must index the site
+    (``lat_col="site_lat", lon_col="site_lon"``). The measurement mode is checked
+    before anything is generated.
+
+    Returns:
+        pd.DataFrame: Concatenated detections for all tracks.
+    """
+    # Validate the output mode before anything is generated or written to the index
+    sensor = sensor_profiles.get(sensor_type, {})
+    _check_measurement(measurement, sensor, sensor_type, detection_index)
+
+    store = as_track_store(tracks)
+    if len(store) == 0:
+        return pd.DataFrame()
+
+    # Orbital sensors: pass windows over each track's own span and footprint
+    access_windows = None
+    if 'orbit' in sensor:
+        access_windows = track_access_windows(sensor['orbit'], store)
+
+    splines = BatchSpline.from_store(store, kind=interpolation)
+    coverage = _resolve_coverage(coverage, sensor, store)
+    if activity is True:
+        activity = ActivityTimelines.from_tracks(store, emitter_profiles, emitter_field, emitter_fallback,
+                                                 emitter_types=[emitter_type] if emitter_type is not None else None)
+    elif activity is False:
+        activity = None
+    elif activity is not None:
+        # Simulate every timeline the run needs in one batch instead of one per track
+        valid = [i for i in range(len(store)) if np.diff(store.bounds(i))[0] >= min_points]
+        if valid:
+            emitter_names, codes = _track_emitters(store, valid, emitter_type, emitter_field, emitter_fallback,
+                                                   emitter_profiles)
+            first = np.array([store.bounds(i)[0] for i in valid])
+            last = np.array([store.bounds(i)[1] - 1 for i in valid])
+            activity.extend(list(zip(store.track_ids[valid], emitter_names[codes])),
+                            store.times[first] / 1e9, store.times[last] / 1e9, emitter_profiles)
+
+    elint_dfs = []
+    for i in range(len(store)):
+        start, stop = store.bounds(i)
+        if stop - start < min_points:
+            continue
+        df_elint, _, _ = generate_elint_detections_from_spline(
+            track_df=store.view(i),
+            sensor_type=sensor_type,
+            emitter_type=emitter_type,
+            sensor_profiles=sensor_profiles,
+            emitter_profiles=emitter_profiles,
+            detector_id=detector_id,
+            error_scale=error_scale,
+            emitter_field=emitter_field,
+            emitter_fallback=emitter_fallback,
+            access_windows=access_windows[i] if access_windows is not None else None,
+            detection_index=detection_index,
+            splines=splines.track_splines(i),
+            activity=activity,
+            link_budget=link_budget,
+            coverage=coverage,
+            backend=backend,
+            measurement=measurement
+        )
+        elint_dfs.append(df_elint)
+
+    if clutter:
+        clutter_kwargs = dict(clutter) if isinstance(clutter, dict) else {}
+        if (coverage_disk(sensor)[0] is None
+                and not any(k in clutter_kwargs for k in ("region", "bbox", "density"))):
+            clutter_kwargs["bbox"] = (store.lons.min(), store.lats.min(), store.lons.max(), store.lats.max())
+        clutter_kwargs.setdefault("emitter_profiles", emitter_profiles)
+        clutter_kwargs.setdefault("error_scale", error_scale)
+        clutter_kwargs.setdefault("detector_id", detector_id)
+        clutter_df = generate_clutter(
+            sensor_type, sensor_profiles, store.times.min() / 1e9, store.times.max() / 1e9,
+            detection_index=detection_index if measurement == "position" else None, **clutter_kwargs
+        )
+        if measurement == "bearing":
+            clutter_df = bearing_measurements(clutter_df, sensor['detector_location'], bearing_sigma(sensor))
+            if detection_index is not None:
+                detection_index.add(clutter_df)
+        elint_dfs.append(clutter_df)
+
+    elint_dfs = [df for df in elint_dfs if not df.empty]
+    if not elint_dfs:
+        return pd.DataFrame()
+    return pd.concat(elint_dfs, ignore_index=True)
+
+
+
+def _track_emitters(store, indices, emitter_type, emitter_field, emitter_fallback, emitter_profiles):
+    """
+    Resolve one emitter profile per track (as ``generate_elint_detections_from_spline``).
+
+    Returns:
+        tuple: (emitter_names, codes) with ``emitter_names[codes[k]]`` the emitter of
+        track ``indices[k]``.
+    """
+    names = []
+    for i in indices:
+        name = emitter_type
+        if name is None:
+            em = store.column(emitter_field, i)[0] if emitter_field in store.columns else None
+            name = (em[0] if isinstance(em, (list, tuple)) else em) if em is not None else emitter_fallback
+        if emitter_profiles is None or name not in emitter_profiles:
+            raise ValueError(f"Emitter profile '{name}' not found.")
+        names.append(name)
+    return np.unique(np.array(names, dtype=object).astype(str), return_inverse=True)
+
+
+def _replicate_candidates(sensor, starts, ends, n_reps, rng, windows=None):
+    """
+    Candidate detection times for ``n_reps`` replicates of every track span.
+
+    Poisson arrivals without access windows are drawn for all (replicate, track)
+    pairs at once; other processes fall back to ``draw_detection_times`` per pair.
+    ``windows`` is one AccessWindows for all tracks or a list with one per track.
+
+    Returns:
+        tuple: (replicate, track, times) arrays grouped by replicate, then track,
+        sorted by time within each group. ``track`` indexes ``starts``/``ends``.
+    """
+    n_tracks = len(starts)
+    process = sensor.get('arrival_process', 'poisson')
+    if process == 'poisson' and windows is None:
+        spans = np.maximum(ends - starts, 0.0)
+        counts = rng.poisson(sensor['sample_rate_per_min'] / 60.0 * np.tile(spans, (n_reps, 1))).ravel()
+        replicate = np.repeat(np.repeat(np.arange(n_reps), n_tracks), counts)
+        track = np.repeat(np.tile(np.arange(n_tracks), n_reps), counts)
+        times = starts[track] + rng.random(len(track)) * spans[track]
+        order = np.lexsort((times, track, replicate))
+        return replicate[order], track[order], times[order]
+
+    replicate, track, times = [], [], []
+    for k in range(n_reps):
+        for j in range(n_tracks):
+            t = draw_detection_times(sensor, starts[j], ends[j], rng,
+                                     windows=windows[j] if isinstance(windows, list) else windows)
+            replicate.append(np.full(len(t), k))
+            track.append(np.full(len(t), j))
+            times.append(t)
+    if not times:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(replicate), np.concatenate(track), np.concatenate(times)
+
+
+def iter_elint_replicates(tracks,
+                          sensor_type,
+                          sensor_profiles,
+                          emitter_profiles,
+                          n_replicates,
+                          emitter_type=None,
+                          error_scale=1.0,
+                          emitter_field="emitter_profile",
+                          emitter_fallback="nav_radar_x_band",
+                          detector_id=0,
+                          min_points=2,
+                          interpolation="cubic",
+                          batch_size=None,
+                          emission_resolution_sec=60.0,
+                          link_budget=None,
+                          coverage=None,
+                          rng=None,
+                          backend="numpy"):
+    """
+    Yield Monte Carlo replicates of ``generate_elint_for_tracks`` in batches.
+
+    The deterministic work is done once for all replicates: the input is converted
+    to a TrackStore, splines for every track are fitted in one batched pass, emitters
+    are resolved per track and orbital access windows are computed per track.
+    Each batch then draws the stochastic quantities (arrival times, emission gating,
+    band, power and position error) for all of its replicates as single arrays and
+    evaluates every sample position in one spline pass.
+
+    Parameters:
+        n_replicates (int): Number of independent realizations.
+        batch_size (int): Replicates per yielded frame (default all at once). Memory
+            is bounded by one batch; results for a given ``rng`` seed depend on it.
+        emission_resolution_sec (float): Time-varying ``emission_prob`` callables are
+            evaluated once per emitter and time bucket of this width (see
+            ``CompiledProfiles.emission_probability``) instead of once per sample.
+        rng: See ``sampling.resolve_rng``.
+        Other parameters are as for ``generate_elint_for_tracks``.
+
+    Yields:
+        pd.DataFrame: Detections with a leading ``replicate`` column, grouped by
+        replicate, then track in store order, then detection time.
+    """
+    if n_replicates < 1:
+        raise ValueError(f"n_replicates must be at least 1, got {n_replicates}")
+    if sensor_profiles is None or sensor_type not in sensor_profiles:
+        raise ValueError(f"Sensor profile '{sensor_type}' not found.")
+    sensor = sensor_profiles[sensor_type]
+    rng = resolve_rng(rng)
+    kernels = get_kernels(backend)
+    link = _link_params(sensor, link_budget)
+    batch_size = n_replicates if batch_size is None else max(int(batch_size), 1)
+
+    store = as_track_store(tracks)
+    lengths = np.array([b - a for a, b in (store.bounds(i) for i in range(len(store)))], dtype=np.int64)
+    valid = np.flatnonzero(lengths >= min_points)
+    if len(valid) == 0:
+        return
+
+    # Deterministic, replicate-independent setup
+    splines = BatchSpline.from_store(store, kind=interpolation)
+    first = splines.offsets[:-1][valid]
+    last = splines.offsets[1:][valid] - 1
+    starts, ends = splines.knots[first], splines.knots[last]
+    access_windows = None
+    if 'orbit' in sensor:
+        access_windows = track_access_windows(sensor['orbit'], store, valid)
+
+    emitter_names, emitter_of = _track_emitters(store, valid, emitter_type, emitter_field, emitter_fallback,
+                                                emitter_profiles)
+    track_ids = store.track_ids[valid]
+    coverage = _resolve_coverage(coverage, sensor, store)
+    tables = CompiledProfiles({}, {name: emitter_profiles[name] for name in emitter_names})
+
+    for r0 in range(0, n_replicates, batch_size):
+        n_reps = min(batch_size, n_replicates - r0)
+        replicate, track, times = _replicate_candidates(sensor, starts, ends, n_reps, rng, access_windows)
+
+        # Emission gating for all samples of the batch in one uniform draw
+        row_emitter = emitter_of[track]
+        p = tables.emission_probability(row_emitter, times, emission_resolution_sec)
+        keep = rng.random(len(times)) <= p
+        replicate, track, times, row_emitter = replicate[keep], track[keep], times[keep], row_emitter[keep]
+        if len(times) == 0:
+            continue
+
+        positions = splines.evaluate(valid[track], times)
+        if coverage is not None:
+            visible = coverage.visible(positions[:, 0], positions[:, 1])
+            replicate, track, times, row_emitter = (replicate[visible], track[visible],
+                                                    times[visible], row_emitter[visible])
+            positions = positions[visible]
+            if len(times) == 0:
+                continue
+        frames = []
+        for e, name in enumerate(emitter_names):
+            rows = np.flatnonzero(row_emitter == e)
+            if len(rows) == 0:
+                continue
+            frame = _detections_at_times(
+                track_ids[track[rows]], times[rows], positions[rows, 0], positions[rows, 1],
+                sensor_type, sensor, name, emitter_profiles[name], detector_id, error_scale, rng, kernels, link
+            )
+            frame.index = rows[frame.index]
+            frames.append(frame)
+        elint_df = pd.concat(frames).sort_index()
+        elint_df.insert(0, 'replicate', r0 + replicate[elint_df.index])
+        elint_df = elint_df.reset_index(drop=True)
+        yield elint_df
+
+
+def generate_elint_replicates(tracks, sensor_type, sensor_profiles, emitter_profiles, n_replicates, **kwargs):
+    """
+    Generate ``n_replicates`` Monte Carlo realizations of the detections for every
+    track, sharing the deterministic setup (see ``iter_elint_replicates``).
+
+    Returns:
+        pd.DataFrame: Replicate-indexed detections (``replicate`` column, 0-based).
+    """
+    frames = list(iter_elint_replicates(tracks, sensor_type, sensor_profiles, emitter_profiles,
+                                        n_replicates, **kwargs))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
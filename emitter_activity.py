@@ -0,0 +1,338 @@
+# emitter_activity.py
+
+"""
+Markov-modulated emitter on/off timelines shared across sensors.
+
+Each (track, emitter) pair is simulated once as a two-state continuous-time Markov
+chain. The fraction of time the emitter is on follows its profile's
+``emission_prob`` (constant or one of the time-varying helpers such as
+``day_night_prob`` / ``bursty``), and the mean on + off cycle length comes from
+``activity_cycle_min`` or, if absent, the profile's ``duty_cycle`` label:
+
+    on dwell ~ Exp(mean = cycle * p(t)),  off dwell ~ Exp(mean = cycle * (1 - p(t)))
+
+Dwells are exponential, so the chain can be restarted at every block boundary
+(hourly by default, matching the profile helpers) with the new rates. All
+timelines are simulated together, block by block, with bulk draws.
+
+Timelines are stored run-length encoded as flat on-interval arrays with CSR
+offsets; any sensor queries them in bulk with ``is_on``, so every sensor sees the
+same emitter state at the same instant.
+"""
+import numpy as np
+import pandas as pd
+
+from .access_windows import AccessWindows
+from .sampling import resolve_rng
+from .track_store import as_track_store
+
+DEFAULT_ACTIVITY_CYCLE_MIN = 30.0
+DUTY_CYCLE_MINUTES = {
+    "continuous": 240.0,
+    "frequent": 90.0,
+    "intermittent": 30.0,
+    "sporadic": 15.0,
+}
+MIN_ON_FRACTION = 1e-3
+
+
+def activity_cycle_sec(emitter):
+    """Mean on + off cycle length of an emitter profile, in seconds."""
+    if 'activity_cycle_min' in emitter:
+        return 60.0 * emitter['activity_cycle_min']
+    return 60.0 * DUTY_CYCLE_MINUTES.get(emitter.get('duty_cycle'), DEFAULT_ACTIVITY_CYCLE_MIN)
+
+
+def _on_fraction(emitter, t):
+    """Emitter on-probability at POSIX time ``t`` (one value per block)."""
+    emit_prob = emitter['emission_prob']
+    if callable(emit_prob):
+        emit_prob = emit_prob(pd.Timestamp(t, unit='s'))
+    return float(emit_prob)
+
+
+def simulate_markov_activity(t_start, t_end, emitter_codes, emitters, rng=None, block_sec=3600.0):
+    """
+    Simulate on/off timelines for many emitters at once.
+
+    Parameters:
+        t_start, t_end (np.ndarray): Span of each timeline (POSIX seconds).
+        emitter_codes (np.ndarray): Index into ``emitters`` for each timeline.
+        emitters (list): Emitter profile dicts.
+        rng: See ``sampling.resolve_rng``.
+        block_sec (float): Rates are re-evaluated every block.
+
+    Returns:
+        tuple: (initial_state, change_timeline, change_times), change events sorted
+        by (timeline, time).
+    """
+    rng = resolve_rng(rng)
+    t_start = np.asarray(t_start, dtype=float)
+    t_end = np.asarray(t_end, dtype=float)
+    emitter_codes = np.asarray(emitter_codes, dtype=np.int64)
+    m = len(t_start)
+    if m == 0:
+        return np.zeros(0, dtype=bool), np.empty(0, dtype=np.int64), np.empty(0)
+
+    cycle = np.array([activity_cycle_sec(e) for e in emitters])[emitter_codes]
+    time_varying = any(callable(e['emission_prob']) for e in emitters)
+    if not time_varying:
+        block_sec = max(float(np.max(t_end) - np.min(t_start)), 1.0) + 1.0
+
+    state = np.zeros(m, dtype=bool)
+    initial = np.zeros(m, dtype=bool)
+    started = np.zeros(m, dtype=bool)
+    ch_idx, ch_t = [], []
+
+    first = np.floor(np.min(t_start) / block_sec) * block_sec
+    for b0 in np.arange(first, np.max(t_end), block_sec):
+        b1 = b0 + block_sec
+        ai = np.flatnonzero((t_start < b1) & (t_end >= b0))
+        if len(ai) == 0:
+            continue
+        p_by_emitter = np.array([_on_fraction(e, b0) for e in emitters])
+        p = np.clip(p_by_emitter[emitter_codes[ai]], MIN_ON_FRACTION, 1 - MIN_ON_FRACTION)
+
+        new = ~started[ai]
+        if np.any(new):
+            state[ai[new]] = rng.random(int(new.sum())) < p[new]
+            initial[ai[new]] = state[ai[new]]
+            started[ai[new]] = True
+
+        c = np.maximum(b0, t_start[ai])
+        end = np.minimum(b1, t_end[ai])
+        mean_on, mean_off = cycle[ai] * p, cycle[ai] * (1 - p)
+        s = state[ai]
+        rows = np.arange(len(ai))
+        while len(rows):
+            k = int(min(np.max(2 * (end[rows] - c[rows]) / cycle[ai[rows]]) + 4, 4096))
+            dwell_on = (s[rows, None] ^ (np.arange(k) % 2 == 1))
+            mean = np.where(dwell_on, mean_on[rows, None], mean_off[rows, None])
+            changes = c[rows, None] + np.cumsum(rng.exponential(1.0, (len(rows), k)) * mean, axis=1)
+            valid = changes < end[rows, None]
+            n_changes = valid.sum(axis=1)
+            r, j = np.nonzero(valid)
+            ch_idx.append(ai[rows[r]])
+            ch_t.append(changes[r, j])
+            s[rows] ^= (n_changes % 2 == 1)
+            more = n_changes == k
+            c[rows[more]] = changes[more, -1]
+            rows = rows[more]
+        state[ai] = s
+
+    ch_idx = np.concatenate(ch_idx) if ch_idx else np.empty(0, dtype=np.int64)
+    ch_t = np.concatenate(ch_t) if ch_t else np.empty(0)
+    order = np.lexsort((ch_t, ch_idx))
+    return initial, ch_idx[order], ch_t[order]
+
+
+class ActivityTimelines:
+    """
+    Run-length-encoded on/off timelines, one per (track_id, emitter_type).
+
+    Attributes:
+        keys (list): (track_id, emitter_type) of each timeline.
+        t_start, t_end (np.ndarray): Simulated span of each timeline (POSIX seconds).
+        on_starts, on_ends (np.ndarray): On intervals of all timelines, concatenated.
+        offsets (np.ndarray): Timeline ``i`` has on intervals ``offsets[i]:offsets[i + 1]``.
+    """
+
+    def __init__(self, keys, t_start, t_end, on_starts, on_ends, offsets):
+        self.keys = list(keys)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.t_start = np.asarray(t_start, dtype=float)
+        self.t_end = np.asarray(t_end, dtype=float)
+        self.on_starts = np.asarray(on_starts, dtype=float)
+        self.on_ends = np.asarray(on_ends, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._keys = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __repr__(self):
+        return f"ActivityTimelines(n_timelines={len(self)}, n_on_intervals={len(self.on_starts)})"
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    @classmethod
+    def simulate(cls, keys, t_start, t_end, emitter_profiles, rng=None, block_sec=3600.0):
+        """
+        Simulate timelines for (track_id, emitter_type) keys over the given spans.
+        """
+        keys = list(keys)
+        t_start = np.asarray(t_start, dtype=float)
+        t_end = np.asarray(t_end, dtype=float)
+        names = sorted({e for _, e in keys})
+        missing = [e for e in names if e not in emitter_profiles]
+        if missing:
+            raise ValueError(f"Emitter profile '{missing[0]}' not found.")
+        lookup = {e: j for j, e in enumerate(names)}
+        codes = np.array([lookup[e] for _, e in keys], dtype=np.int64)
+        initial, ch_idx, ch_t = simulate_markov_activity(
+            t_start, t_end, codes, [emitter_profiles[e] for e in names], rng, block_sec
+        )
+
+        # Segment boundaries per timeline: start, changes..., end
+        m = len(keys)
+        n_changes = np.bincount(ch_idx, minlength=m)
+        bounds_offsets = np.concatenate([[0], np.cumsum(n_changes + 2)])
+        first, last = bounds_offsets[:-1], bounds_offsets[1:] - 1
+        bounds = np.empty(bounds_offsets[-1])
+        bounds[first] = t_start
+        bounds[last] = t_end
+        interior = np.ones(len(bounds), dtype=bool)
+        interior[first] = interior[last] = False
+        bounds[interior] = ch_t
+
+        # Segment j of a timeline lies between boundaries j and j + 1; states alternate
+        is_seg = np.ones(len(bounds), dtype=bool)
+        is_seg[last] = False
+        seg = np.flatnonzero(is_seg)
+        seg_timeline = np.repeat(np.arange(m), n_changes + 1)
+        seg_rank = seg - first[seg_timeline]
+        seg_on = initial[seg_timeline] ^ (seg_rank % 2 == 1)
+        seg_lo, seg_hi = bounds[seg], bounds[seg + 1]
+
+        on_timeline = seg_timeline[seg_on]
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(on_timeline, minlength=m))])
+        return cls(keys, t_start, t_end, seg_lo[seg_on], seg_hi[seg_on], offsets)
+
+    @classmethod
+    def from_tracks(cls, tracks, emitter_profiles, emitter_field="emitter_profile",
+                    emitter_fallback="nav_radar_x_band", emitter_types=None, rng=None, block_sec=3600.0):
+        """
+        Simulate one timeline per (track, emitter) over each track's span.
+
+        Every emitter listed in the track's ``emitter_field`` gets a timeline (or the
+        given ``emitter_types`` / the fallback if the field is missing).
+        """
+        store = as_track_store(tracks)
+        keys, starts, ends = [], [], []
+        for i in range(len(store)):
+            start, stop = store.bounds(i)
+            if stop == start:
+                continue
+            if emitter_types is not None:
+                ems = list(emitter_types)
+            elif emitter_field in store.columns:
+                em = store.columns[emitter_field][start]
+                ems = list(em) if isinstance(em, (list, tuple, np.ndarray)) else [em]
+            else:
+                ems = [emitter_fallback]
+            for em in ems:
+                keys.append((store.track_ids[i], em))
+                starts.append(store.times[start] / 1e9)
+                ends.append(store.times[stop - 1] / 1e9)
+        return cls.simulate(keys, starts, ends, emitter_profiles, rng, block_sec)
+
+    def merge(self, other):
+        """Return a new object with the timelines of both (``other`` wins on duplicate keys)."""
+        keep = [i for i, key in enumerate(self.keys) if key not in other.index]
+        parts = [(self, keep), (other, list(range(len(other))))]
+        keys, t0, t1, starts, ends, counts = [], [], [], [], [], []
+        for obj, idx in parts:
+            for i in idx:
+                a, b = obj.offsets[i], obj.offsets[i + 1]
+                keys.append(obj.keys[i])
+                t0.append(obj.t_start[i])
+                t1.append(obj.t_end[i])
+                starts.append(obj.on_starts[a:b])
+                ends.append(obj.on_ends[a:b])
+                counts.append(b - a)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return ActivityTimelines(keys, t0, t1,
+                                 np.concatenate(starts) if starts else [],
+                                 np.concatenate(ends) if ends else [], offsets)
+
+    def extend(self, keys, t_start, t_end, emitter_profiles, rng=None):
+        """
+        Simulate the (track_id, emitter_type) keys that have no timeline yet, in one
+        batch, and append them in place. Existing timelines are left unchanged.
+        """
+        keys = list(keys)
+        t_start = np.asarray(t_start, dtype=float)
+        t_end = np.asarray(t_end, dtype=float)
+        seen = set()
+        missing = []
+        for j, key in enumerate(keys):
+            if key not in self.index and key not in seen:
+                seen.add(key)
+                missing.append(j)
+        if not missing:
+            return self
+        new = ActivityTimelines.simulate([keys[j] for j in missing], t_start[missing], t_end[missing],
+                                         emitter_profiles, rng)
+        for key in new.keys:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+        self.offsets = np.concatenate([self.offsets, new.offsets[1:] + self.offsets[-1]])
+        self.t_start = np.concatenate([self.t_start, new.t_start])
+        self.t_end = np.concatenate([self.t_end, new.t_end])
+        self.on_starts = np.concatenate([self.on_starts, new.on_starts])
+        self.on_ends = np.concatenate([self.on_ends, new.on_ends])
+        self._keys = None
+        return self
+
+    def ensure(self, track_id, emitter_type, t_start, t_end, emitter_profiles, rng=None):
+        """
+        Index of the (track_id, emitter_type) timeline, simulating and adding it if missing.
+        """
+        key = (track_id, emitter_type)
+        if key not in self.index:
+            self.extend([key], [t_start], [t_end], emitter_profiles, rng)
+        return self.index[key]
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def windows(self, i):
+        """On intervals of timeline ``i`` as AccessWindows."""
+        a, b = self.offsets[i], self.offsets[i + 1]
+        return AccessWindows(self.on_starts[a:b], self.on_ends[a:b])
+
+    def _search_keys(self):
+        """Timeline-major monotonic keys over all on intervals (cached)."""
+        if self._keys is None:
+            stride = float(np.max(self.t_end - self.t_start, initial=0.0)) + 1.0
+            owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+            self._keys = (stride, owner * stride + (self.on_starts - self.t_start[owner]))
+        return self._keys
+
+    def is_on(self, timeline_index, times):
+        """
+        Bulk state query: True where timeline ``timeline_index`` is on at ``times``.
+
+        ``timeline_index`` may be a scalar or an array matching ``times``; times
+        outside a timeline's simulated span are reported as off.
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        if np.ndim(timeline_index) == 0:
+            # One timeline: search its own intervals, no fleet-wide keys needed
+            i = int(timeline_index)
+            a, b = self.offsets[i], self.offsets[i + 1]
+            pos = np.searchsorted(self.on_starts[a:b], times, side="right") - 1
+            inside = (times >= self.t_start[i]) & (times <= self.t_end[i]) & (pos >= 0)
+            on = np.zeros(times.shape, dtype=bool)
+            on[inside] = times[inside] <= self.on_ends[a:b][pos[inside]]
+            return on
+        idx = np.broadcast_to(np.asarray(timeline_index, dtype=np.int64), times.shape)
+        stride, keys = self._search_keys()
+        local = times - self.t_start[idx]
+        inside = (local >= 0) & (times <= self.t_end[idx])
+        pos = np.searchsorted(keys, idx * stride + np.clip(local, 0.0, stride - 1.0), side="right") - 1
+        valid = inside & (pos >= self.offsets[idx]) & (pos < self.offsets[idx + 1])
+        on = np.zeros(times.shape, dtype=bool)
+        on[valid] = times[valid] <= self.on_ends[pos[valid]]
+        return on
+
+    def duty_cycle(self):
+        """Fraction of its span each timeline is on."""
+        owner = np.repeat(np.arange(len(self)), np.diff(self.offsets))
+        on_time = np.bincount(owner, weights=self.on_ends - self.on_starts, minlength=len(self))
+        span = self.t_end - self.t_start
+        return np.divide(on_time, span, out=np.ones(len(self)), where=span > 0)
@@ -0,0 +1,69 @@
+# error_model.py
+
+"""
+Position-error models for detections.
+
+A sensor's ``pos_error_km = [major, minor]`` gives the 1-sigma axes of its error
+ellipse. The ``error_model`` key of the sensor profile selects how offsets are drawn:
+
+    "gaussian"  Bivariate normal offsets (default). The sensor's covariance in the
+                ellipse frame is factored once (``error_cholesky``); each detection
+                draws two standard normals, multiplies by the factor and rotates by
+                its orientation, so interior points are sampled with the right density.
+    "boundary"  Legacy behavior: a point on the ellipse boundary at a uniform angle.
+
+Orientation (``error_angle_deg``) follows the sensor's ``error_bias`` and is the
+rotation of the major axis counterclockwise from east, as applied by the kernels.
+The rotated covariance is reported per detection as ``cov_ee_km2``, ``cov_nn_km2``
+and ``cov_en_km2`` (east/north, km^2), as for triangulated fixes in bearings.py.
+"""
+import numpy as np
+
+ERROR_MODELS = ("gaussian", "boundary")
+DEFAULT_ERROR_MODEL = "gaussian"
+
+
+def cholesky_2x2(cov_ee, cov_nn, cov_en):
+    """
+    Lower-triangular factor L of a 2x2 covariance (L @ L.T == cov), in closed form.
+    Singular (e.g. zero minor axis) covariances are allowed.
+    """
+    l00 = np.sqrt(max(cov_ee, 0.0))
+    l10 = cov_en / l00 if l00 > 0 else 0.0
+    l11 = np.sqrt(max(cov_nn - l10 * l10, 0.0))
+    return np.array([[l00, 0.0], [l10, l11]])
+
+
+def error_cholesky(sensor, error_scale=1.0):
+    """
+    Cholesky factor of a sensor's error covariance in the ellipse frame (major axis east).
+
+    Returns:
+        np.ndarray: (2, 2) lower-triangular factor in km.
+    """
+    major, minor = (float(v) * float(error_scale) for v in sensor['pos_error_km'])
+    return cholesky_2x2(major * major, minor * minor, 0.0)
+
+
+def error_model(sensor):
+    """Return the sensor's error model name, validating it."""
+    model = sensor.get('error_model', DEFAULT_ERROR_MODEL)
+    if model not in ERROR_MODELS:
+        raise ValueError(f"Unsupported error model: {model}")
+    return model
+
+
+def covariance_terms(chol, angle_deg):
+    """
+    Rotate the frame covariance ``chol @ chol.T`` by ``angle_deg`` (per detection).
+
+    Returns:
+        tuple: (cov_ee, cov_nn, cov_en) arrays in km^2.
+    """
+    c = chol @ chol.T
+    a = np.radians(angle_deg)
+    ca, sa = np.cos(a), np.sin(a)
+    cov_ee = c[0, 0] * ca * ca - 2 * c[0, 1] * ca * sa + c[1, 1] * sa * sa
+    cov_nn = c[0, 0] * sa * sa + 2 * c[0, 1] * ca * sa + c[1, 1] * ca * ca
+    cov_en = (c[0, 0] - c[1, 1]) * ca * sa + c[0, 1] * (ca * ca - sa * sa)
+    return cov_ee, cov_nn, cov_en
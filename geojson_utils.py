@@ -1,10 +1,10 @@
 import json
 import pandas as pd
-import plotly.express as px
+import shapely
 from shapely.geometry import shape, Point, Polygon
-import geopandas as gpd
 import numpy as np
-from scipy.interpolate import CubicSpline
+from .batch_spline import BatchSpline
+from .track_store import as_track_store
 
 def load_geojson(filename):
     """Load GeoJSON file and return parsed object."""
@@ -14,6 +14,7 @@ def load_geojson(filename):
 
 def plot_geojson_file(filename, fig=None, color="blue", zoom=7):
     """Plot GeoJSON polygons on a Plotly map, optionally adding to existing fig."""
+    import plotly.express as px
     geojson_data = load_geojson(filename)
     features = geojson_data.get("features", [geojson_data] if geojson_data.get("type") == "Feature" else [])
 
@@ -73,6 +74,7 @@ def plot_geojson_polygon(geojson_data, fig=None, color="blue", zoom=7):
     Returns:
         fig (go.Figure): Updated figure
     """
+    import plotly.express as px
     features = geojson_data.get("features", [geojson_data] if geojson_data.get("type") == "Feature" else [])
 
     if not features:
@@ -133,6 +135,7 @@ def mask_elint_by_geojson(elint_df, geojson_file, lat_col="detected_lat", lon_co
     Returns:
         Series: Boolean mask (True where row is kept)
     """
+    import geopandas as gpd
     if isinstance(geojson_file, str):
         with open(geojson_file, 'r') as f:
             geojson_data = json.load(f)
@@ -153,62 +156,72 @@ def mask_elint_by_geojson(elint_df, geojson_file, lat_col="detected_lat", lon_co
 def extract_region_subtracks(
     df, region_geojson,
     lat_col="Latitude", lon_col="Longitude", time_col="Timestamp", id_col="mmsi",
-    resample_interval_sec=600
+    resample_interval_sec=600, interpolation="cubic"
 ):
     """
     Given sparse AIS data, fit a spline to each MMSI track, resample it,
     and extract only the contiguous subtracks fully within a GeoJSON-defined region.
 
     All original metadata fields are copied into the resampled output where possible.
+    ``df`` may also be a TrackStore built with the same column names; tracks are then
+    read as zero-copy slices instead of being grouped and copied.
+
+    Splines for all tracks are fitted in one batch and all resampled times are
+    evaluated in one pass (see batch_spline.py); ``interpolation`` may be
+    "cubic", "akima" or "linear".
     """
     region_geom = shape(region_geojson["features"][0]["geometry"])
-    df = df.copy()
-    df[time_col] = pd.to_datetime(df[time_col])
-    df = df.sort_values([id_col, time_col])
+    store = as_track_store(df, id_col=id_col, time_col=time_col, lat_col=lat_col, lon_col=lon_col)
+
+    # Tracks with non-finite positions cannot be splined; skip them as a per-track fit would
+    finite = np.isfinite(store.lats) & np.isfinite(store.lons)
+    if not finite.all():
+        bad = np.zeros(len(store), dtype=bool)
+        bad[store.row_track_index()[~finite]] = True
+        store = store.select(store.track_ids[~bad])
+    splines = BatchSpline.from_store(store, kind=interpolation)
+
+    # Resample timestamps for every track with enough points to spline
+    track_idx, t_parts = [], []
+    for i in np.flatnonzero(store.lengths >= 4):
+        a, b = splines.offsets[i], splines.offsets[i + 1]
+        t_resampled = np.arange(splines.knots[a], splines.knots[b - 1], resample_interval_sec)
+        track_idx.append(np.full(len(t_resampled), i, dtype=np.int64))
+        t_parts.append(t_resampled)
+    if not t_parts:
+        return pd.DataFrame(columns=store.column_order + ["TrackID"])
+
+    track_idx = np.concatenate(track_idx)
+    t_all = np.concatenate(t_parts)
+    positions = splines.evaluate(track_idx, t_all)
+    in_region_all = shapely.contains_xy(region_geom, positions[:, 1], positions[:, 0])
+    bounds = np.concatenate([[0], np.cumsum([len(t) for t in t_parts])])
 
     all_subtracks = []
     global_track_counter = 0
 
-    for mmsi, group in df.groupby(id_col):
-        group = group.copy()
-
-        if len(group) < 4:
-            continue  # not enough points to spline
-
-        t = group[time_col].astype(np.int64) / 1e9  # seconds since epoch
-        lat = group[lat_col].values
-        lon = group[lon_col].values
-
-        try:
-            lat_spline = CubicSpline(t, lat)
-            lon_spline = CubicSpline(t, lon)
-        except Exception:
-            continue  # skip if spline fails
-
-        # Resample timestamps
-        t_min, t_max = t.min(), t.max()
-        t_resampled = np.arange(t_min, t_max, resample_interval_sec)
-        timestamps_resampled = pd.to_datetime(t_resampled, unit='s')
-        lat_resampled = lat_spline(t_resampled)
-        lon_resampled = lon_spline(t_resampled)
+    for j, t_resampled in enumerate(t_parts):
+        lo, hi = bounds[j], bounds[j + 1]
+        if hi == lo:
+            continue
+        i = track_idx[lo]
+        mmsi = store.track_ids[i]
 
         df_resampled = pd.DataFrame({
-            "Timestamp": timestamps_resampled,
-            "Latitude": lat_resampled,
-            "Longitude": lon_resampled,
+            "Timestamp": pd.to_datetime(t_resampled, unit='s'),
+            "Latitude": positions[lo:hi, 0],
+            "Longitude": positions[lo:hi, 1],
             id_col: mmsi
         })
 
         # Copy static fields from the first row of the original group
-        static_data = group.iloc[0].drop([lat_col, lon_col, time_col], errors="ignore")
-        for col in static_data.index:
-            df_resampled[col] = static_data[col]
+        start, _ = store.bounds(i)
+        for col in store.column_order:
+            if col in store.columns:
+                df_resampled[col] = store.columns[col][start]
 
-        # Point-in-polygon test
-        df_resampled["InRegion"] = df_resampled.apply(
-            lambda row: region_geom.contains(Point(row["Longitude"], row["Latitude"])),
-            axis=1
-        )
+        # Point-in-polygon test (computed for all tracks above)
+        df_resampled["InRegion"] = in_region_all[lo:hi]
 
         # Group by contiguous InRegion blocks
         in_region = df_resampled["InRegion"]
@@ -223,7 +236,7 @@ def extract_region_subtracks(
     if all_subtracks:
         return pd.concat(all_subtracks, ignore_index=True)
     else:
-        return pd.DataFrame(columns=df.columns.tolist() + ["TrackID"])
+        return pd.DataFrame(columns=store.column_order + ["TrackID"])
 
 
 
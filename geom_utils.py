@@ -2,6 +2,8 @@
 
 import numpy as np
 
+EARTH_RADIUS_KM = 6371.0
+
 def compute_bearing(lat1, lon1, lat2, lon2):
     """
     Compute the bearing in degrees from point (lat1, lon1) to (lat2, lon2).
@@ -34,3 +36,20 @@ def offset_position(lat, lon, dx_km, dy_km):
     new_lat = lat + (dy_km / 111.0)
     new_lon = lon + (dx_km / (111.320 * np.cos(np.radians(lat))))
     return new_lat, new_lon
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in kilometers between two points (vectorized).
+
+    Parameters:
+        lat1, lon1 (float or array): First point(s) in degrees.
+        lat2, lon2 (float or array): Second point(s) in degrees.
+
+    Returns:
+        float or np.ndarray: Distance in km.
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.asarray(lon2) - np.asarray(lon1))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
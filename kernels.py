@@ -0,0 +1,175 @@
+# kernels.py
+
+"""
+Per-sample math kernels for the detection generator, with an optional Numba backend.
+
+Backends:
+    "numpy"  Vectorized NumPy (default, no extra dependency)
+    "numba"  Numba-compiled loops (``pip install numba``); falls back to NumPy
+             with a warning if Numba is not installed
+    "auto"   Numba when installed, otherwise NumPy
+
+All random numbers are drawn by the caller with NumPy before a kernel runs, so
+both backends consume the random stream identically and give the same results
+under the same seed (up to last-bit rounding differences between NumPy's and
+the C library's trigonometric functions).
+
+Kernels:
+    inject_error(lat, lon, theta, angle_deg, major_km, minor_km) -> (det_lat, det_lon)
+        Point on the error ellipse at parameter ``theta``, rotated by ``angle_deg``
+        and applied with the same flat-earth offset as ``geom_utils.offset_position``.
+    gaussian_error(lat, lon, z_major, z_minor, angle_deg, chol) -> (det_lat, det_lon)
+        Standard normal pairs scaled by the sensor's 2x2 Cholesky factor (see
+        error_model.py), rotated by ``angle_deg`` and offset the same way.
+    bearing_deg(lat1, lon1, lat2, lon2) -> bearing from a fixed point (0-360)
+
+Emission thinning is a plain ``u <= p`` comparison and stays in NumPy; the costly
+part, time-varying ``emission_prob`` callables, is bucketed in sampling.py.
+"""
+import numpy as np
+
+from .geom_utils import compute_bearing, offset_position
+
+BACKENDS = ("numpy", "numba", "auto")
+
+
+# ----------------------------------------------------------------------
+# NumPy backend
+# ----------------------------------------------------------------------
+def _inject_error_numpy(lat, lon, theta, angle_deg, major_km, minor_km):
+    dx = major_km * np.cos(theta)
+    dy = minor_km * np.sin(theta)
+    angle_rad = np.radians(angle_deg)
+    dx_rot = dx * np.cos(angle_rad) - dy * np.sin(angle_rad)
+    dy_rot = dx * np.sin(angle_rad) + dy * np.cos(angle_rad)
+    return offset_position(lat, lon, dx_rot, dy_rot)
+
+
+def _gaussian_error_numpy(lat, lon, z_major, z_minor, angle_deg, chol):
+    dx = chol[0, 0] * z_major
+    dy = chol[1, 0] * z_major + chol[1, 1] * z_minor
+    angle_rad = np.radians(angle_deg)
+    dx_rot = dx * np.cos(angle_rad) - dy * np.sin(angle_rad)
+    dy_rot = dx * np.sin(angle_rad) + dy * np.cos(angle_rad)
+    return offset_position(lat, lon, dx_rot, dy_rot)
+
+
+def _bearing_numpy(lat1, lon1, lat2, lon2):
+    return compute_bearing(lat1, lon1, lat2, lon2) % 360
+
+
+class _Kernels:
+    """Namespace of kernel functions for one backend."""
+
+    def __init__(self, name, inject_error, gaussian_error, bearing_deg):
+        self.name = name
+        self.inject_error = inject_error
+        self.gaussian_error = gaussian_error
+        self.bearing_deg = bearing_deg
+
+    def __repr__(self):
+        return f"Kernels(backend='{self.name}')"
+
+
+NUMPY_KERNELS = _Kernels("numpy", _inject_error_numpy, _gaussian_error_numpy, _bearing_numpy)
+
+
+# ----------------------------------------------------------------------
+# Numba backend (compiled on first use)
+# ----------------------------------------------------------------------
+_NUMBA_KERNELS = None
+
+
+def _build_numba_kernels():
+    import numba
+
+    deg2rad = np.pi / 180.0
+    rad2deg = 180.0 / np.pi
+
+    @numba.njit(cache=True)
+    def _inject_error_loop(lat, lon, theta, angle_deg, major_km, minor_km, out_lat, out_lon):
+        for i in range(lat.shape[0]):
+            dx = major_km * np.cos(theta[i])
+            dy = minor_km * np.sin(theta[i])
+            a = angle_deg[i] * deg2rad
+            ca, sa = np.cos(a), np.sin(a)
+            dx_rot = dx * ca - dy * sa
+            dy_rot = dx * sa + dy * ca
+            out_lat[i] = lat[i] + dy_rot / 111.0
+            out_lon[i] = lon[i] + dx_rot / (111.320 * np.cos(lat[i] * deg2rad))
+
+    @numba.njit(cache=True)
+    def _gaussian_error_loop(lat, lon, z_major, z_minor, angle_deg, l00, l10, l11, out_lat, out_lon):
+        for i in range(lat.shape[0]):
+            dx = l00 * z_major[i]
+            dy = l10 * z_major[i] + l11 * z_minor[i]
+            a = angle_deg[i] * deg2rad
+            ca, sa = np.cos(a), np.sin(a)
+            dx_rot = dx * ca - dy * sa
+            dy_rot = dx * sa + dy * ca
+            out_lat[i] = lat[i] + dy_rot / 111.0
+            out_lon[i] = lon[i] + dx_rot / (111.320 * np.cos(lat[i] * deg2rad))
+
+    @numba.njit(cache=True)
+    def _bearing_loop(lat1, lon1, lat2, lon2, out):
+        phi1 = lat1 * deg2rad
+        for i in range(lat2.shape[0]):
+            phi2 = lat2[i] * deg2rad
+            dl = (lon2[i] - lon1) * deg2rad
+            x = np.sin(dl) * np.cos(phi2)
+            y = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dl)
+            out[i] = (np.arctan2(x, y) * rad2deg + 360.0) % 360.0
+
+    def inject_error(lat, lon, theta, angle_deg, major_km, minor_km):
+        lat = np.ascontiguousarray(lat, dtype=np.float64)
+        lon = np.ascontiguousarray(lon, dtype=np.float64)
+        out_lat, out_lon = np.empty_like(lat), np.empty_like(lat)
+        _inject_error_loop(lat, lon, np.ascontiguousarray(theta, dtype=np.float64),
+                           np.ascontiguousarray(np.broadcast_to(angle_deg, lat.shape), dtype=np.float64),
+                           float(major_km), float(minor_km), out_lat, out_lon)
+        return out_lat, out_lon
+
+    def gaussian_error(lat, lon, z_major, z_minor, angle_deg, chol):
+        lat = np.ascontiguousarray(lat, dtype=np.float64)
+        lon = np.ascontiguousarray(lon, dtype=np.float64)
+        out_lat, out_lon = np.empty_like(lat), np.empty_like(lat)
+        _gaussian_error_loop(lat, lon, np.ascontiguousarray(z_major, dtype=np.float64),
+                             np.ascontiguousarray(z_minor, dtype=np.float64),
+                             np.ascontiguousarray(np.broadcast_to(angle_deg, lat.shape), dtype=np.float64),
+                             float(chol[0, 0]), float(chol[1, 0]), float(chol[1, 1]), out_lat, out_lon)
+        return out_lat, out_lon
+
+    def bearing_deg(lat1, lon1, lat2, lon2):
+        lat2 = np.ascontiguousarray(lat2, dtype=np.float64)
+        out = np.empty_like(lat2)
+        _bearing_loop(float(lat1), float(lon1), lat2, np.ascontiguousarray(lon2, dtype=np.float64), out)
+        return out
+
+    return _Kernels("numba", inject_error, gaussian_error, bearing_deg)
+
+
+def numba_available():
+    """True if Numba can be imported."""
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_kernels(backend="numpy"):
+    """
+    Return the kernel namespace for a backend ("numpy", "numba" or "auto").
+    """
+    global _NUMBA_KERNELS
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported kernel backend: {backend}")
+    if backend == "numpy":
+        return NUMPY_KERNELS
+    if not numba_available():
+        if backend == "numba":
+            print("Warning: numba is not installed; using the NumPy kernels.")
+        return NUMPY_KERNELS
+    if _NUMBA_KERNELS is None:
+        _NUMBA_KERNELS = _build_numba_kernels()
+    return _NUMBA_KERNELS
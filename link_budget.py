@@ -0,0 +1,127 @@
+# link_budget.py
+
+"""
+Range- and link-budget-dependent detection probability and position error.
+
+For a sensor with a fixed ``detector_location``, every sample is processed in one
+vectorized pass:
+
+    range_km   great-circle distance from the sensor to the true position
+    snr_db     power_dbm + rx_gain_db - FSPL(range, band) - noise_floor_dbm
+    P(detect)  logistic in SNR: 0.5 at ``snr_threshold_db``, width ``snr_slope_db``;
+               zero beyond ``max_range_km`` (radar/radio horizon) when the profile sets it
+    growth     position error multiplier sqrt(10^((error_ref_snr_db - snr_db) / 10)),
+               i.e. error ~ 1/sqrt(SNR), never below the profile's ``pos_error_km``
+               and capped at ``max_error_growth``
+
+Free-space path loss uses a representative center frequency per band
+(``BAND_FREQ_MHZ``). The parameters above are read from the sensor profile when
+present (e.g. ``"noise_floor_dbm": -105``), otherwise from ``LINK_DEFAULTS``, and
+can be overridden per call with a dict (``link_budget={...}`` in the generator).
+"""
+import numpy as np
+
+from .geom_utils import haversine_km
+
+# Representative center frequencies (MHz) for the emitter band labels
+BAND_FREQ_MHZ = {
+    "AIS": 162.0,
+    "VHF": 156.0,
+    "UHF": 400.0,
+    "L": 1500.0,
+    "S": 3000.0,
+    "S-band": 3000.0,
+    "C": 5600.0,
+    "X": 9400.0,
+    "Ku": 14000.0,
+    "Acoustic-50kHz": 0.05,
+    "Acoustic-120kHz": 0.12,
+    "Acoustic-200kHz": 0.2,
+}
+
+LINK_DEFAULTS = {
+    "noise_floor_dbm": -100.0,
+    "rx_gain_db": 0.0,
+    "snr_threshold_db": 10.0,
+    "snr_slope_db": 2.0,
+    "error_ref_snr_db": 20.0,
+    "max_error_growth": 10.0,
+}
+
+
+def link_parameters(sensor, overrides=None, require_site=True):
+    """
+    Resolve link-budget parameters for a sensor: ``overrides``, then profile keys,
+    then ``LINK_DEFAULTS``. Also carries ``detector_location``, ``max_range_km`` and
+    ``band_freq_mhz`` (a band -> MHz table, overridable).
+
+    Raises:
+        ValueError: If the sensor has no fixed ``detector_location`` and ``require_site``
+            is set (mobile platforms pass per-sample positions instead).
+    """
+    overrides = dict(overrides or {})
+    params = {key: float(overrides.get(key, sensor.get(key, default))) for key, default in LINK_DEFAULTS.items()}
+    params["detector_location"] = overrides.get("detector_location", sensor.get("detector_location"))
+    if require_site and not params["detector_location"]:
+        raise ValueError("Link budget needs a sensor with a fixed detector_location.")
+    params["max_range_km"] = overrides.get("max_range_km", sensor.get("max_range_km"))
+    params["band_freq_mhz"] = {**BAND_FREQ_MHZ, **overrides.get("band_freq_mhz", {})}
+    return params
+
+
+def band_frequencies(bands, band_freq_mhz=None):
+    """Center frequency (MHz) for each band label, mapped once per distinct label."""
+    table = BAND_FREQ_MHZ if band_freq_mhz is None else band_freq_mhz
+    uniques, inverse = np.unique(np.asarray(bands, dtype=object).astype(str), return_inverse=True)
+    missing = [b for b in uniques if b not in table]
+    if missing:
+        raise ValueError(f"No center frequency for band '{missing[0]}'; pass band_freq_mhz.")
+    return np.array([table[b] for b in uniques], dtype=float)[inverse]
+
+
+def free_space_path_loss_db(range_km, freq_mhz):
+    """Free-space path loss in dB (range clipped to 10 m)."""
+    return 20 * np.log10(np.maximum(range_km, 0.01)) + 20 * np.log10(freq_mhz) + 32.44
+
+
+def snr_db(power_dbm, range_km, freq_mhz, params):
+    """Received SNR in dB for emitted ``power_dbm`` over ``range_km`` at ``freq_mhz``."""
+    received = power_dbm + params["rx_gain_db"] - free_space_path_loss_db(range_km, freq_mhz)
+    return received - params["noise_floor_dbm"]
+
+
+def detection_probability(snr, range_km, params):
+    """Logistic detection probability in SNR, zero beyond ``max_range_km`` if set."""
+    pd_ = 1.0 / (1.0 + np.exp(-(snr - params["snr_threshold_db"]) / params["snr_slope_db"]))
+    if params.get("max_range_km") is not None:
+        pd_ = np.where(range_km <= params["max_range_km"], pd_, 0.0)
+    return pd_
+
+
+def error_growth(snr, params):
+    """Position-error multiplier: 1/sqrt(SNR) relative to ``error_ref_snr_db``, in [1, max_error_growth]."""
+    growth = np.sqrt(10.0 ** ((params["error_ref_snr_db"] - snr) / 10.0))
+    return np.clip(growth, 1.0, params["max_error_growth"])
+
+
+def apply_link_budget(lat, lon, power_dbm, bands, params, rng, site=None):
+    """
+    Bulk link-budget stage for one batch of samples.
+
+    Parameters:
+        lat, lon (np.ndarray): True positions.
+        power_dbm (np.ndarray): Drawn emitter power per sample.
+        bands (array-like): Drawn band label per sample.
+        params (dict): From ``link_parameters``.
+        rng: Random source for the detection draw (one uniform per sample).
+        site (tuple): Optional per-sample (lat, lon) sensor positions (mobile
+            platforms) in place of ``detector_location``.
+
+    Returns:
+        tuple: (keep, snr_db, range_km, growth) arrays over all samples.
+    """
+    site_lat, site_lon = params["detector_location"] if site is None else site
+    range_km = haversine_km(site_lat, site_lon, lat, lon)
+    snr = snr_db(power_dbm, range_km, band_frequencies(bands, params["band_freq_mhz"]), params)
+    keep = rng.random(len(snr)) <= detection_probability(snr, range_km, params)
+    return keep, snr, range_km, error_growth(snr, params)
@@ -0,0 +1,348 @@
+# parallel.py
+
+"""
+Process-pool ELINT generation over shared-memory track and spline tables.
+
+Track arrays and per-track cubic spline coefficients are written once into a
+``multiprocessing.shared_memory`` block (or a memory-mapped file); workers attach
+to it zero-copy and only receive (start, stop) track ranges. Results come back as
+Arrow IPC record batches when pyarrow is available, otherwise as DataFrames.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import PPoly
+
+from .batch_spline import BatchSpline
+from .access_windows import track_access_windows
+from .elint_generator import generate_elint_detections_from_spline
+from .profiles import get_sensor_profiles, get_emitter_profiles
+from .track_store import TrackStore, as_track_store
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+
+class SharedArrays:
+    """
+    A set of named NumPy arrays laid out in one shared buffer.
+
+    The buffer is either a ``multiprocessing.shared_memory`` block (``backend="shm"``)
+    or a memory-mapped file (``backend="memmap"``). ``descriptor`` is a small picklable
+    dict that other processes pass to ``SharedArrays.attach`` to get zero-copy views.
+    """
+
+    _ALIGN = 64
+
+    def __init__(self, arrays, layout, backend, shm=None, path=None, owner=False):
+        self.arrays = arrays
+        self.layout = layout
+        self.backend = backend
+        self._shm = shm
+        self.path = path
+        self._owner = owner
+
+    @classmethod
+    def create(cls, arrays, backend="shm", path=None):
+        """
+        Copy ``arrays`` (dict of name -> ndarray) into a new shared buffer.
+
+        Parameters:
+            arrays (dict): Arrays to share.
+            backend (str): "shm" or "memmap".
+            path (str): File path for the memmap backend.
+
+        Returns:
+            SharedArrays: Owner handle; call ``close()`` when done.
+        """
+        layout = {}
+        offset = 0
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            layout[name] = (offset, arr.dtype.str, arr.shape)
+            offset += -(-arr.nbytes // cls._ALIGN) * cls._ALIGN
+        size = max(offset, 1)
+
+        if backend == "shm":
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            buf = shm.buf
+        elif backend == "memmap":
+            if path is None:
+                raise ValueError("memmap backend requires a path.")
+            shm = None
+            buf = np.memmap(path, dtype=np.uint8, mode="w+", shape=(size,))
+        else:
+            raise ValueError(f"Unsupported backend: {backend}")
+
+        views = cls._views(buf, layout)
+        for name, arr in arrays.items():
+            views[name][...] = arr
+        if backend == "memmap":
+            buf.flush()
+        return cls(views, layout, backend, shm=shm, path=path, owner=True)
+
+    @staticmethod
+    def _views(buf, layout):
+        views = {}
+        for name, (offset, dtype, shape) in layout.items():
+            count = int(np.prod(shape))
+            views[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(shape)
+        return views
+
+    @property
+    def descriptor(self):
+        name = self._shm.name if self._shm is not None else None
+        return {"backend": self.backend, "name": name, "path": self.path, "layout": self.layout}
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Attach to an existing shared buffer and return read-only views."""
+        if descriptor["backend"] == "shm":
+            shm = shared_memory.SharedMemory(name=descriptor["name"])
+            buf = shm.buf
+        else:
+            shm = None
+            buf = np.memmap(descriptor["path"], dtype=np.uint8, mode="r")
+        views = cls._views(buf, descriptor["layout"])
+        for v in views.values():
+            v.flags.writeable = False
+        return cls(views, descriptor["layout"], descriptor["backend"], shm=shm, path=descriptor["path"])
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def close(self):
+        """Release views; the owner also unlinks the shared block or file."""
+        self.arrays = {}
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+        elif self._owner and self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_spline_tables(store, kind="cubic"):
+    """
+    Fit lat/lon splines for every track in one batched pass and flatten the tables.
+
+    Duplicate timestamps within a track are dropped first. Track ``i``'s
+    coefficients are ``coef[:, interval_offsets[i]:interval_offsets[i + 1]]``
+    in SciPy's ``(4, n_i - 1)`` PPoly layout; tracks with fewer than two points
+    have no intervals and are skipped by the workers.
+
+    Returns:
+        dict: Arrays ready for ``SharedArrays.create``.
+    """
+    keep = store.unique_time_mask()
+    spline = BatchSpline.from_store(store, kind=kind)
+    return {
+        "offsets": spline.offsets,
+        "times_ns": store.times[keep],
+        "knots": spline.knots,
+        "lats": store.lats[keep],
+        "lons": store.lons[keep],
+        "interval_offsets": spline.interval_offsets,
+        "coef_lat": np.ascontiguousarray(spline.c[..., 0]),
+        "coef_lon": np.ascontiguousarray(spline.c[..., 1]),
+    }
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+_WORKER = {}
+
+
+def _init_worker(descriptor, config):
+    _WORKER["shared"] = SharedArrays.attach(descriptor)
+    _WORKER["config"] = config
+    _WORKER["sensor_profiles"] = config["sensor_profiles"] or get_sensor_profiles()
+    _WORKER["emitter_profiles"] = config["emitter_profiles"] or get_emitter_profiles()
+
+
+def _run_chunk(start, stop, track_ids, emitters, seed):
+    shared = _WORKER["shared"]
+    cfg = _WORKER["config"]
+    offsets, interval_offsets = shared["offsets"], shared["interval_offsets"]
+    if seed is not None:
+        np.random.seed(seed)
+
+    frames = []
+    for k, i in enumerate(range(start, stop)):
+        a, b = offsets[i], offsets[i + 1]
+        if b - a < 2:
+            continue
+        knots = shared["knots"][a:b]
+        c0, c1 = interval_offsets[i], interval_offsets[i + 1]
+        lat_spline = PPoly(shared["coef_lat"][:, c0:c1], knots)
+        lon_spline = PPoly(shared["coef_lon"][:, c0:c1], knots)
+        track = TrackStore([track_ids[k]], [0, b - a], shared["times_ns"][a:b],
+                           shared["lats"][a:b], shared["lons"][a:b])
+        emitter_type = cfg["emitter_type"]
+        if emitter_type is None:
+            em = emitters[k]
+            emitter_type = em[0] if isinstance(em, (list, tuple)) else (em if em is not None else cfg["emitter_fallback"])
+
+        df_elint, _, _ = generate_elint_detections_from_spline(
+            track_df=track,
+            sensor_type=cfg["sensor_type"],
+            emitter_type=emitter_type,
+            sensor_profiles=_WORKER["sensor_profiles"],
+            emitter_profiles=_WORKER["emitter_profiles"],
+            detector_id=cfg["detector_id"],
+            error_scale=cfg["error_scale"],
+            splines=(lat_spline, lon_spline),
+            access_windows=cfg["access_windows"][i] if cfg["access_windows"] is not None else None,
+            backend=cfg["kernel_backend"]
+        )
+        if not df_elint.empty:
+            frames.append(df_elint)
+
+    if not frames:
+        return None
+    result = pd.concat(frames, ignore_index=True)
+    if pa is None or not cfg["as_arrow"]:
+        return result
+
+    # Serialize as one Arrow IPC stream: a single contiguous buffer to ship back
+    table = pa.Table.from_pandas(result, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+# ----------------------------------------------------------------------
+# Driver side
+# ----------------------------------------------------------------------
+def iter_elint_parallel(tracks,
+                        sensor_type,
+                        sensor_profiles=None,
+                        emitter_profiles=None,
+                        emitter_type=None,
+                        error_scale=1.0,
+                        emitter_field="emitter_profile",
+                        emitter_fallback="nav_radar_x_band",
+                        detector_id=0,
+                        n_workers=None,
+                        chunk_size=64,
+                        seed=None,
+                        backend="shm",
+                        path=None,
+                        as_arrow=True,
+                        mp_context=None,
+                        interpolation="cubic",
+                        kernel_backend="numpy"):
+    """
+    Generate ELINT detections for a fleet in a process pool, yielding results as they complete.
+
+    Parameters:
+        tracks (pd.DataFrame or TrackStore): Multi-track AIS data.
+        sensor_type (str): Key into sensor profiles.
+        sensor_profiles, emitter_profiles (dict): Profile registries. ``None`` uses the
+            package defaults inside each worker (these hold lambdas and cannot be pickled
+            under the "spawn" start method).
+        emitter_type (str): Force one emitter; otherwise resolved per track from emitter_field.
+        n_workers (int): Worker processes (default: os.cpu_count()).
+        chunk_size (int): Tracks per task.
+        seed (int): If given, each chunk is seeded deterministically from it, so results
+            do not depend on worker scheduling.
+        backend (str): "shm" for shared memory, "memmap" for a file at ``path``.
+        as_arrow (bool): Yield pyarrow.RecordBatch objects (requires pyarrow); otherwise DataFrames.
+        mp_context (str): Multiprocessing start method (default "fork" where available).
+        interpolation (str): "cubic", "akima" or "linear" (see batch_spline.py).
+        kernel_backend (str): Per-sample kernel backend in the workers: "numpy",
+            "numba" or "auto" (see kernels.py).
+
+    Yields:
+        pyarrow.RecordBatch or pd.DataFrame: One result per non-empty chunk.
+    """
+    store = as_track_store(tracks)
+    tables = build_spline_tables(store, kind=interpolation)
+    as_arrow = as_arrow and pa is not None
+
+    if emitter_field in store.columns:
+        starts = store.offsets[:-1][store.lengths > 0]
+        emitters = np.empty(len(store), dtype=object)
+        emitters[store.lengths > 0] = store.columns[emitter_field][starts]
+    else:
+        emitters = np.full(len(store), None, dtype=object)
+
+    # Orbital sensors: per-track pass windows are computed once here and shipped with the config
+    access_windows = None
+    sensor = (sensor_profiles or get_sensor_profiles()).get(sensor_type, {})
+    if "orbit" in sensor and store.n_points:
+        access_windows = track_access_windows(sensor["orbit"], store)
+
+    config = {
+        "sensor_type": sensor_type,
+        "sensor_profiles": sensor_profiles,
+        "emitter_profiles": emitter_profiles,
+        "emitter_type": emitter_type,
+        "emitter_fallback": emitter_fallback,
+        "detector_id": detector_id,
+        "error_scale": error_scale,
+        "as_arrow": as_arrow,
+        "access_windows": access_windows,
+        "kernel_backend": kernel_backend,
+    }
+    if mp_context is None:
+        mp_context = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+    n_chunks = -(-len(store) // chunk_size)
+    chunk_seeds = (np.random.SeedSequence(seed).generate_state(n_chunks)
+                   if seed is not None else [None] * n_chunks)
+
+    with SharedArrays.create(tables, backend=backend, path=path) as shared:
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=mp.get_context(mp_context),
+                                 initializer=_init_worker,
+                                 initargs=(shared.descriptor, config)) as pool:
+            futures = []
+            for k, start in enumerate(range(0, len(store), chunk_size)):
+                stop = min(start + chunk_size, len(store))
+                futures.append(pool.submit(
+                    _run_chunk, start, stop,
+                    list(store.track_ids[start:stop]), list(emitters[start:stop]),
+                    None if chunk_seeds[k] is None else int(chunk_seeds[k])
+                ))
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                if as_arrow:
+                    for batch in pa.ipc.open_stream(result):
+                        yield batch
+                else:
+                    yield result
+
+
+def generate_elint_parallel(tracks, sensor_type, **kwargs):
+    """
+    Collect the output of ``iter_elint_parallel`` into a single DataFrame,
+    sorted by TrackID and detection_time.
+
+    Returns:
+        pd.DataFrame: Detections for all tracks.
+    """
+    parts = list(iter_elint_parallel(tracks, sensor_type, **kwargs))
+    if not parts:
+        return pd.DataFrame()
+    if pa is not None and isinstance(parts[0], pa.RecordBatch):
+        df = pa.Table.from_batches(parts).to_pandas()
+    else:
+        df = pd.concat(parts, ignore_index=True)
+    return df.sort_values(["TrackID", "detection_time"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,260 @@
+# platforms.py
+
+"""
+Mobile sensor platforms: sensors attached to their own tracks.
+
+Airborne and shipborne sensors (``drone``, ``ship_esm``, ``uav_*``, ``fixedwing_*``)
+have a reach (``coverage_radius_km``) but no fixed position. ``PlatformTracks`` gives
+one or more platforms a trajectory, from AIS-style tracks (fitted with the batched
+splines) or from (lat, lon) spline callables.
+
+``generate_platform_detections`` pairs every platform with every target track whose
+time span and (margin-expanded) bounding box overlap, draws candidate times for all
+pairs at once, and co-evaluates target and platform positions at the same times in
+two bulk spline passes. Relative geometry for all samples is then array math:
+
+    gating  range <= the sensor's reach (``coverage_radius_km`` / ``max_range_km``,
+            limited by the radio horizon, see coverage.py); with ``sector_deg`` the
+            target must also lie in that sector relative to the platform's heading
+    error   ellipses are oriented from the platform for ``bearing_dominant`` sensors
+            and grow linearly with range beyond ``error_ref_range_km`` (profile key;
+            defaults to half the reach)
+
+The optional link budget (link_budget.py) uses the platform position per sample.
+"""
+import numpy as np
+import pandas as pd
+
+from .batch_spline import BatchSpline
+from .compiled_profiles import CompiledProfiles
+from .coverage import coverage_radius_km
+from .elint_generator import _detections_at_times, _replicate_candidates, _track_emitters
+from .geom_utils import compute_bearing, haversine_km
+from .kernels import get_kernels
+from .link_budget import link_parameters
+from .sampling import resolve_rng
+from .track_store import TrackStore, as_track_store
+
+
+def relative_geometry(sensor_lat, sensor_lon, target_lat, target_lon):
+    """
+    Range (km) and bearing (degrees from north) from sensor to target, element-wise.
+    """
+    return (haversine_km(sensor_lat, sensor_lon, target_lat, target_lon),
+            compute_bearing(sensor_lat, sensor_lon, target_lat, target_lon))
+
+
+class PlatformTracks:
+    """
+    Trajectories of one or more sensor platforms.
+
+    Parameters:
+        platform_ids (array-like): One ID per platform (used as ``detector_id``).
+        splines (BatchSpline or list): Batched (lat, lon) splines, or one
+            (lat_fn, lon_fn) pair of callables over POSIX seconds per platform.
+        t_start, t_end (array-like): Span of each platform (POSIX seconds); positions
+            outside it are NaN.
+    """
+
+    def __init__(self, platform_ids, splines, t_start, t_end):
+        self.platform_ids = np.asarray(platform_ids, dtype=object)
+        self.splines = splines
+        self.t_start = np.asarray(t_start, dtype=float)
+        self.t_end = np.asarray(t_end, dtype=float)
+        if not (len(self.platform_ids) == len(self.t_start) == len(self.t_end) == len(splines)):
+            raise ValueError("Platform IDs, splines and spans must have the same length.")
+
+    def __len__(self):
+        return len(self.platform_ids)
+
+    def __repr__(self):
+        return f"PlatformTracks(n_platforms={len(self)})"
+
+    @classmethod
+    def from_tracks(cls, tracks, interpolation="cubic", platform_id="platform", **store_kwargs):
+        """
+        Fit platforms from AIS-style tracks (DataFrame or TrackStore). A DataFrame
+        without a TrackID column is one platform named ``platform_id``.
+        """
+        if not isinstance(tracks, TrackStore) and store_kwargs.get("id_col", "TrackID") not in tracks.columns:
+            tracks = tracks.assign(**{store_kwargs.get("id_col", "TrackID"): platform_id})
+        store = as_track_store(tracks, **store_kwargs)
+        if len(store) == 0:
+            raise ValueError("No platform tracks given.")
+        splines = BatchSpline.from_store(store, kind=interpolation)
+        first, last = splines.offsets[:-1], splines.offsets[1:] - 1
+        return cls(store.track_ids, splines, splines.knots[first], splines.knots[last])
+
+    @classmethod
+    def from_splines(cls, splines, t_start, t_end, platform_ids=None):
+        """Platforms from (lat_fn, lon_fn) pairs of callables over POSIX seconds."""
+        splines = [tuple(pair) for pair in splines]
+        if platform_ids is None:
+            platform_ids = [f"platform_{i}" for i in range(len(splines))]
+        return cls(platform_ids, splines, np.broadcast_to(t_start, len(splines)),
+                   np.broadcast_to(t_end, len(splines)))
+
+    def positions(self, platform, times):
+        """
+        Platform positions for many (platform index, time) pairs in one pass.
+
+        Returns:
+            tuple: (lat, lon) arrays; NaN outside each platform's span.
+        """
+        times = np.asarray(times, dtype=float)
+        platform = np.broadcast_to(np.asarray(platform, dtype=np.int64), times.shape)
+        if isinstance(self.splines, BatchSpline):
+            pos = self.splines.evaluate(platform, times)
+            lat, lon = pos[:, 0].copy(), pos[:, 1].copy()
+        else:
+            lat, lon = np.empty(len(times)), np.empty(len(times))
+            for p in np.unique(platform):
+                rows = platform == p
+                lat_fn, lon_fn = self.splines[p]
+                lat[rows], lon[rows] = lat_fn(times[rows]), lon_fn(times[rows])
+        outside = (times < self.t_start[platform]) | (times > self.t_end[platform])
+        lat[outside] = np.nan
+        lon[outside] = np.nan
+        return lat, lon
+
+    def headings(self, platform, times, dt=1.0):
+        """Course over ground (degrees from north) by central differences over ``dt`` seconds."""
+        lat0, lon0 = self.positions(platform, np.clip(times - dt / 2, self.t_start[platform], None))
+        lat1, lon1 = self.positions(platform, np.clip(times + dt / 2, None, self.t_end[platform]))
+        return compute_bearing(lat0, lon0, lat1, lon1)
+
+    def bounding_boxes(self, n_samples=200):
+        """(lon_min, lat_min, lon_max, lat_max) per platform, as an (n, 4) array."""
+        frac = np.linspace(0.0, 1.0, n_samples)
+        platform = np.repeat(np.arange(len(self)), n_samples)
+        times = (self.t_start[:, None] + frac[None, :] * (self.t_end - self.t_start)[:, None]).ravel()
+        lat, lon = self.positions(platform, times)
+        lat, lon = lat.reshape(len(self), n_samples), lon.reshape(len(self), n_samples)
+        return np.column_stack([np.nanmin(lon, axis=1), np.nanmin(lat, axis=1),
+                                np.nanmax(lon, axis=1), np.nanmax(lat, axis=1)])
+
+
+def generate_platform_detections(tracks,
+                                 sensor_type,
+                                 sensor_profiles,
+                                 emitter_profiles,
+                                 platforms,
+                                 emitter_type=None,
+                                 error_scale=1.0,
+                                 emitter_field="emitter_profile",
+                                 emitter_fallback="nav_radar_x_band",
+                                 min_points=2,
+                                 interpolation="cubic",
+                                 link_budget=None,
+                                 emission_resolution_sec=60.0,
+                                 rng=None,
+                                 backend="numpy"):
+    """
+    Generate detections of target tracks by sensors riding on platform tracks.
+
+    Parameters:
+        tracks (pd.DataFrame or TrackStore): Target AIS tracks.
+        sensor_type (str): Key into sensor_profiles (shared by all platforms).
+        platforms (PlatformTracks, pd.DataFrame or TrackStore): Platform trajectories;
+            tracks are fitted with ``PlatformTracks.from_tracks``.
+        link_budget (bool or dict): Range/SNR gating and error growth from the
+            platform position (see link_budget.py).
+        emission_resolution_sec (float): Bucket width for time-varying
+            ``emission_prob`` callables (see ``CompiledProfiles.emission_probability``).
+        Other parameters are as for ``generate_elint_for_tracks``.
+
+    Returns:
+        pd.DataFrame: Detections with ``detector_id`` = ``<sensor_type>_<platform ID>``
+        and the sensor's position and relative geometry per row (``platform_lat``,
+        ``platform_lon``, ``platform_range_km``, ``platform_bearing_deg``), grouped by
+        platform, then track, in time order.
+    """
+    if sensor_profiles is None or sensor_type not in sensor_profiles:
+        raise ValueError(f"Sensor profile '{sensor_type}' not found.")
+    sensor = sensor_profiles[sensor_type]
+    rng = resolve_rng(rng)
+    kernels = get_kernels(backend)
+    if not isinstance(platforms, PlatformTracks):
+        platforms = PlatformTracks.from_tracks(platforms, interpolation=interpolation)
+
+    store = as_track_store(tracks)
+    lengths = np.array([b - a for a, b in (store.bounds(i) for i in range(len(store)))], dtype=np.int64)
+    valid = np.flatnonzero(lengths >= min_points)
+    if len(valid) == 0:
+        return pd.DataFrame()
+
+    splines = BatchSpline.from_store(store, kind=interpolation)
+    starts = splines.knots[splines.offsets[:-1][valid]]
+    ends = splines.knots[splines.offsets[1:][valid] - 1]
+    emitter_names, emitter_of = _track_emitters(store, valid, emitter_type, emitter_field, emitter_fallback,
+                                                emitter_profiles)
+    tables = CompiledProfiles({}, {name: emitter_profiles[name] for name in emitter_names})
+    link = link_parameters(sensor, link_budget if isinstance(link_budget, dict) else None,
+                           require_site=False) if link_budget else None
+
+    reach = coverage_radius_km(sensor)
+    reach = np.inf if reach is None else float(reach)
+    ref_range = sensor.get('error_ref_range_km', reach / 2 if np.isfinite(reach) else None)
+
+    # Candidate (platform, track) pairs: overlapping spans and reach-expanded boxes
+    firsts = np.array([store.bounds(i)[0] for i in valid])
+    track_box = np.column_stack([
+        np.minimum.reduceat(store.lons, firsts), np.minimum.reduceat(store.lats, firsts),
+        np.maximum.reduceat(store.lons, firsts), np.maximum.reduceat(store.lats, firsts),
+    ]) if len(store.lats) else np.empty((0, 4))
+    plat_box = platforms.bounding_boxes()
+    overlap = (platforms.t_start[:, None] < ends[None, :]) & (platforms.t_end[:, None] > starts[None, :])
+    if np.isfinite(reach):
+        dlat = reach / 111.0
+        max_lat = min(max(np.abs(plat_box[:, [1, 3]]).max(), np.abs(track_box[:, [1, 3]]).max()) + dlat, 89.0)
+        dlon = reach / (111.320 * np.cos(np.radians(max_lat)))
+        overlap &= (plat_box[:, None, 0] - dlon <= track_box[None, :, 2]) & (plat_box[:, None, 2] + dlon >= track_box[None, :, 0])
+        overlap &= (plat_box[:, None, 1] - dlat <= track_box[None, :, 3]) & (plat_box[:, None, 3] + dlat >= track_box[None, :, 1])
+    pair_platform, pair_track = np.nonzero(overlap)
+    if len(pair_platform) == 0:
+        return pd.DataFrame()
+
+    # Candidate times for all pairs over their common span, then emission gating
+    _, pair, times = _replicate_candidates(
+        sensor, np.maximum(platforms.t_start[pair_platform], starts[pair_track]),
+        np.minimum(platforms.t_end[pair_platform], ends[pair_track]), 1, rng
+    )
+    platform, track = pair_platform[pair], pair_track[pair]
+    keep = rng.random(len(times)) <= tables.emission_probability(emitter_of[track], times, emission_resolution_sec)
+    platform, track, times = platform[keep], track[keep], times[keep]
+
+    # Co-evaluate targets and platforms on the shared times, then relative geometry
+    target = splines.evaluate(valid[track], times)
+    plat_lat, plat_lon = platforms.positions(platform, times)
+    range_km, bearing = relative_geometry(plat_lat, plat_lon, target[:, 0], target[:, 1])
+    visible = range_km <= reach
+    if sensor.get('sector_deg') is not None:
+        start, end = (float(v) % 360 for v in sensor['sector_deg'])
+        relative = (bearing - platforms.headings(platform, times)) % 360
+        visible &= ((relative >= start) & (relative <= end)) if start <= end else ((relative >= start) | (relative <= end))
+    rows = np.flatnonzero(visible)
+    if len(rows) == 0:
+        return pd.DataFrame()
+    growth = np.maximum(range_km / ref_range, 1.0) if ref_range else np.ones(len(times))
+
+    # One detection frame per (platform, emitter)
+    group = platform[rows] * len(emitter_names) + emitter_of[track[rows]]
+    order = rows[np.argsort(group, kind="stable")]
+    splits = np.flatnonzero(np.diff(platform[order] * len(emitter_names) + emitter_of[track[order]])) + 1
+    frames = []
+    for g_rows in np.split(order, splits):
+        p, e = platform[g_rows[0]], emitter_of[track[g_rows[0]]]
+        frame = _detections_at_times(
+            store.track_ids[valid[track[g_rows]]], times[g_rows], target[g_rows, 0], target[g_rows, 1],
+            sensor_type, sensor, emitter_names[e], emitter_profiles[emitter_names[e]], platforms.platform_ids[p],
+            error_scale, rng, kernels, link, site=(plat_lat[g_rows], plat_lon[g_rows]),
+            error_growth=growth[g_rows]
+        )
+        kept = g_rows[frame.index]
+        frame['platform_lat'] = plat_lat[kept]
+        frame['platform_lon'] = plat_lon[kept]
+        frame['platform_range_km'] = range_km[kept]
+        frame['platform_bearing_deg'] = bearing[kept]
+        frame.index = kept
+        frames.append(frame)
+    return pd.concat(frames).sort_index().reset_index(drop=True)
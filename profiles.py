@@ -246,6 +246,9 @@ SENSOR_PROFILES = {
     # ------- Existing (kept) -------
     "satellite": {
         "sample_rate_per_min": 0.05,    # ~every 20 min
+        "arrival_process": "jittered_periodic",
+        "pass_sample_rate_per_min": 2.0,  # intercept cadence while in view
+        "orbit": {"altitude_km": 550, "inclination_deg": 53, "swath_km": 1500},
         "pos_error_km": [3.0, 1.0],
         "error_bias": "random",
         "coverage_area": "global",
@@ -256,6 +259,7 @@ SENSOR_PROFILES = {
         "sample_rate_per_min": 0.25,    # every ~4 min
         "pos_error_km": [2.0, 0.3],
         "error_bias": "bearing_dominant",
+        "bearing_sigma_deg": 1.0,     # 1-sigma line-of-bearing error (bearings.py)
         "detector_location": (23.565838, 119.609703),
         "max_range_km": 200,
         "coverage_area": "radial",
@@ -275,6 +279,7 @@ SENSOR_PROFILES = {
         "sample_rate_per_min": 0.5,
         "pos_error_km": [1.0, 0.2],
         "error_bias": "bearing_dominant",
+        "bearing_sigma_deg": 1.5,     # 1-sigma line-of-bearing error (bearings.py)
         "detector_location": (39.864086, 104.628741),
         "max_range_km": 50,
         "coverage_area": "radial",
@@ -301,6 +306,10 @@ SENSOR_PROFILES = {
     # ------- Satellites (variants) -------
     "satellite_leo_dense": {
         "sample_rate_per_min": 0.12,     # higher revisit (constellation)
+        "arrival_process": "jittered_periodic",
+        "pass_sample_rate_per_min": 2.0,
+        "orbit": {"altitude_km": 525, "inclination_deg": 53, "swath_km": 1500,
+                  "n_planes": 6, "sats_per_plane": 4},
         "pos_error_km": [2.5, 0.9],
         "error_bias": "random",
         "coverage_area": "global",
@@ -309,6 +318,10 @@ SENSOR_PROFILES = {
     },
     "satellite_meo": {
         "sample_rate_per_min": 0.08,
+        "arrival_process": "jittered_periodic",
+        "pass_sample_rate_per_min": 0.3,
+        "orbit": {"altitude_km": 8000, "inclination_deg": 55, "swath_km": 6000,
+                  "n_planes": 3, "sats_per_plane": 2},
         "pos_error_km": [6.0, 2.5],
         "error_bias": "random",
         "coverage_area": "global",
@@ -321,6 +334,7 @@ SENSOR_PROFILES = {
         "sample_rate_per_min": 0.35,
         "pos_error_km": [1.2, 0.2],
         "error_bias": "bearing_dominant",
+        "bearing_sigma_deg": 0.5,     # 1-sigma line-of-bearing error (bearings.py)
         "detector_location": (23.565838, 119.609703),
         "max_range_km": 60,
         "coverage_area": "radial",
@@ -331,6 +345,7 @@ SENSOR_PROFILES = {
         "sample_rate_per_min": 0.10,
         "pos_error_km": [15.0, 5.0],
         "error_bias": "bearing_dominant",
+        "bearing_sigma_deg": 3.0,     # 1-sigma line-of-bearing error (bearings.py)
         "detector_location": (23.565838, 119.609703),
         "max_range_km": 1500,
         "coverage_area": "radial",
@@ -394,6 +409,7 @@ SENSOR_PROFILES = {
         "sample_rate_per_min": 0.8,
         "pos_error_km": [1.5, 0.6],
         "error_bias": "bearing_dominant",
+        "bearing_sigma_deg": 1.0,     # 1-sigma line-of-bearing error (bearings.py)
         "detector_location": (24.200000, 120.300000),
         "max_range_km": 80,
         "coverage_area": "radial",
@@ -404,16 +420,20 @@ SENSOR_PROFILES = {
 
 
 def get_sensor_profiles(custom_profiles=None):
-    """Return sensor profiles with optional override."""
+    """Return sensor profiles with optional override (overrides are validated)."""
     if custom_profiles is not None:
+        from .compiled_profiles import validate_profiles
+        validate_profiles(sensor_profiles=custom_profiles)
         profiles = SENSOR_PROFILES.copy()
         profiles.update(custom_profiles)
         return profiles
     return SENSOR_PROFILES
 
 def get_emitter_profiles(custom_profiles=None):
-    """Return emitter profiles with optional override."""
+    """Return emitter profiles with optional override (overrides are validated)."""
     if custom_profiles is not None:
+        from .compiled_profiles import validate_profiles
+        validate_profiles(emitter_profiles=custom_profiles)
         profiles = EMITTER_PROFILES.copy()
         profiles.update(custom_profiles)
         return profiles
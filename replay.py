@@ -0,0 +1,593 @@
+# replay.py
+
+"""
+Real-time replay: ELINT detections streamed while AIS arrives.
+
+``ReplayEngine`` consumes an asynchronous stream of AIS records (``tail_file`` on a
+growing CSV/JSONL file, ``read_socket`` on a local line-delimited socket, or any
+async iterator of dicts) and emits detection batches to async sinks on a fixed
+schedule:
+
+    source -> bounded queue -> per-TrackID sliding windows -> tick every ``tick_sec``
+           -> batched spline fit + evaluation -> sinks (socket / JSONL / queue)
+
+Time:
+    Simulation time is the AIS timestamp. With ``speed`` set, the engine paces the
+    records against the wall clock at ``speed`` x real time (a recorded file replays
+    in scaled real time; a live feed simply keeps up) and ticks on a wall-clock
+    schedule. With ``speed=None`` the clock follows the data: ticks run in lock-step
+    with ingestion, as fast as the source and sinks allow, and a seeded run is
+    reproducible.
+
+Latency:
+    Detections are interpolated, never extrapolated: a sample at time t is emitted at
+    the first tick after a report later than t has arrived for its track. Latency
+    is therefore bounded by the track's AIS report interval plus ``tick_sec``
+    (``engine.stats['max_latency_sec']`` records the worst case seen). Tracks silent
+    for ``stale_sec`` are dropped.
+
+Backpressure:
+    The source is read into a queue of ``queue_size`` records, and every sink write
+    is awaited before the next tick (socket sinks drain, queue sinks block when
+    full), so a slow consumer delays ticks instead of buffering unbounded output.
+
+Candidate detection times are drawn per (sensor, track) in blocks of ``block_sec``
+ahead of the emitted horizon, so periodic sensors keep their phase across ticks.
+"""
+import asyncio
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .access_windows import compute_access_windows, footprint_from_points
+from .batch_spline import BatchSpline
+from .elint_generator import _detections_at_times
+from .kernels import get_kernels
+from .sampling import draw_detection_times, resolve_rng, thin_by_emission
+
+
+# ----------------------------------------------------------------------
+# Sources
+# ----------------------------------------------------------------------
+class _LineParser:
+    """Parse JSONL records, or CSV rows against the first (header) line."""
+
+    def __init__(self, fmt):
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported stream format: {fmt}")
+        self.fmt = fmt
+        self.header = None
+
+    def __call__(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        if self.fmt == "jsonl":
+            return json.loads(line)
+        row = next(csv.reader([line]))
+        if self.header is None:
+            self.header = row
+            return None
+        return dict(zip(self.header, row))
+
+
+async def tail_file(path, fmt=None, follow=True, poll_sec=0.25):
+    """
+    Yield AIS records from a CSV or JSONL file, following it as it grows.
+
+    Parameters:
+        path (str): File to read; the format defaults from the extension (.jsonl/.json
+            -> "jsonl", otherwise "csv" with a header line).
+        follow (bool): Keep polling for appended lines (like ``tail -f``); if False,
+            stop at end of file.
+        poll_sec (float): Polling interval at end of file.
+    """
+    fmt = fmt or ("jsonl" if str(path).endswith((".jsonl", ".json")) else "csv")
+    parse = _LineParser(fmt)
+    pending = ""
+    n = 0
+    with open(path) as f:
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    break
+                await asyncio.sleep(poll_sec)
+                continue
+            pending += line
+            if follow and not pending.endswith("\n"):
+                continue  # line still being written
+            record = parse(pending)
+            pending = ""
+            if record is not None:
+                yield record
+            n += 1
+            if n % 1000 == 0:
+                await asyncio.sleep(0)
+    if pending:
+        record = parse(pending)
+        if record is not None:
+            yield record
+
+
+async def read_socket(host="127.0.0.1", port=10110, fmt="jsonl"):
+    """Yield AIS records from a local TCP socket sending one record per line."""
+    reader, writer = await asyncio.open_connection(host, port)
+    parse = _LineParser(fmt)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            record = parse(line.decode())
+            if record is not None:
+                yield record
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+# ----------------------------------------------------------------------
+# Sinks
+# ----------------------------------------------------------------------
+def _to_jsonl(df):
+    return df.to_json(orient="records", lines=True, date_format="iso", date_unit="ms")
+
+
+class QueueSink:
+    """
+    Put each detection batch (DataFrame) on an ``asyncio.Queue``; ``None`` marks the end.
+    A bounded queue blocks the engine while the consumer is behind.
+    """
+
+    def __init__(self, queue=None, maxsize=64):
+        self.queue = queue if queue is not None else asyncio.Queue(maxsize)
+
+    async def write(self, df):
+        await self.queue.put(df)
+
+    async def close(self):
+        await self.queue.put(None)
+
+
+class JsonlSink:
+    """Append detections to a JSONL file (one detection per line)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def _write(self, text):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(text)
+        self._file.flush()
+
+    async def write(self, df):
+        await asyncio.to_thread(self._write, _to_jsonl(df))
+
+    async def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SocketSink:
+    """Send detections as JSON lines over a local TCP connection (waits on drain)."""
+
+    def __init__(self, host="127.0.0.1", port=10111):
+        self.host = host
+        self.port = port
+        self._writer = None
+
+    async def write(self, df):
+        if self._writer is None:
+            _, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(_to_jsonl(df).encode())
+        await self._writer.drain()
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+# ----------------------------------------------------------------------
+# Clock
+# ----------------------------------------------------------------------
+class ReplayClock:
+    """
+    Simulation clock in POSIX seconds.
+
+    With a ``speed``, simulation time runs at ``speed`` x the wall clock from the
+    first record; with ``speed=None`` it is the latest record time seen.
+    """
+
+    def __init__(self, speed=1.0):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive (or None to follow the data).")
+        self.speed = speed
+        self.sim0 = None
+        self.wall0 = None
+        self.latest = -np.inf
+        self.finished = False
+        self._wake = asyncio.Event()
+
+    def start(self, sim_t):
+        if self.sim0 is None:
+            self.sim0 = sim_t
+            self.wall0 = time.monotonic()
+
+    def now(self):
+        if self.sim0 is None:
+            return -np.inf
+        if self.speed is None:
+            return self.latest
+        return self.sim0 + (time.monotonic() - self.wall0) * self.speed
+
+    def advance(self, sim_t):
+        """Record that data up to ``sim_t`` has been ingested."""
+        self.latest = max(self.latest, sim_t)
+
+    def finish(self):
+        self.finished = True
+        self._wake.set()
+
+    async def sleep_until(self, sim_t):
+        """Wait until simulation time reaches ``sim_t`` (or the source has ended)."""
+        if self.speed is None:
+            return
+        while not self.finished and self.now() < sim_t:
+            self._wake.clear()
+            timeout = (sim_t - self.now()) / self.speed
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+# ----------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------
+class _ActiveTrack:
+    """Sliding window of recent reports for one TrackID."""
+
+    def __init__(self, track_id, emitter_type):
+        self.track_id = track_id
+        self.emitter_type = emitter_type
+        self.times = deque()
+        self.lats = deque()
+        self.lons = deque()
+
+    @property
+    def last_time(self):
+        return self.times[-1]
+
+    def append(self, t, lat, lon):
+        if self.times and t <= self.times[-1]:
+            return False  # duplicate or out-of-order report
+        self.times.append(t)
+        self.lats.append(lat)
+        self.lons.append(lon)
+        return True
+
+    def trim(self, cutoff, min_points=4):
+        """Drop reports older than ``cutoff``, keeping one before it for interpolation."""
+        while len(self.times) > min_points and self.times[1] < cutoff:
+            self.times.popleft()
+            self.lats.popleft()
+            self.lons.popleft()
+
+
+class _SensorCursor:
+    """Per (sensor, track) candidate times drawn ahead and the emitted horizon."""
+
+    def __init__(self, t0):
+        self.pending = np.empty(0)
+        self.drawn_until = t0
+        self.emitted_until = t0
+
+
+class ReplayEngine:
+    """
+    Stream ELINT detections for one or more sensors while AIS records arrive.
+
+    Parameters:
+        sensor_types (list): Sensor profile names to simulate.
+        sensor_profiles, emitter_profiles (dict): Profile registries.
+        sinks (list): Async sinks (``QueueSink``, ``JsonlSink``, ``SocketSink`` or any
+            object with ``async write(df)`` / ``async close()``).
+        speed (float or None): Time acceleration factor; None runs as fast as possible.
+        tick_sec (float): Emission period in simulation seconds.
+        report_interval_sec (dict): Optional per-sensor emission period (a multiple
+            of ``tick_sec`` in practice); sensors not listed report every tick.
+        window_sec (float): Reports kept per track behind the oldest emitted horizon.
+        stale_sec (float): Tracks without a report for this long are dropped.
+        block_sec (float): Span of candidate times drawn at once per (sensor, track).
+        id_col, time_col, lat_col, lon_col (str): Record field names.
+        emitter_field, emitter_fallback: Emitter resolution as in the batch generator.
+        interpolation (str): "cubic", "akima" or "linear" (see batch_spline.py).
+        error_scale, detector_id: As in ``generate_elint_for_tracks``.
+        queue_size (int): Maximum records buffered between source and engine.
+        rng: See ``sampling.resolve_rng``.
+        backend (str): Kernel backend (see kernels.py).
+
+    ``stats`` counts records, dropped records, emitted detections and the largest
+    emission latency in simulation seconds.
+    """
+
+    def __init__(self, sensor_types, sensor_profiles, emitter_profiles, sinks,
+                 speed=1.0, tick_sec=10.0, report_interval_sec=None, window_sec=1800.0,
+                 stale_sec=3600.0, block_sec=600.0,
+                 id_col="TrackID", time_col="Timestamp", lat_col="Latitude", lon_col="Longitude",
+                 emitter_field="emitter_profile", emitter_fallback="nav_radar_x_band",
+                 interpolation="cubic", error_scale=1.0, detector_id=0, queue_size=10000,
+                 rng=None, backend="numpy"):
+        if isinstance(sensor_types, str):
+            sensor_types = [sensor_types]
+        for sensor_type in sensor_types:
+            if sensor_type not in sensor_profiles:
+                raise ValueError(f"Sensor profile '{sensor_type}' not found.")
+        if emitter_fallback not in emitter_profiles:
+            raise ValueError(f"Emitter profile '{emitter_fallback}' not found.")
+        if tick_sec <= 0 or block_sec <= 0:
+            raise ValueError("tick_sec and block_sec must be positive.")
+        self.sensor_types = list(sensor_types)
+        self.sensor_profiles = sensor_profiles
+        self.emitter_profiles = emitter_profiles
+        self.sinks = list(sinks)
+        self.clock = ReplayClock(speed)
+        self.tick_sec = float(tick_sec)
+        self.report_interval_sec = dict(report_interval_sec or {})
+        self.window_sec = float(window_sec)
+        self.stale_sec = float(stale_sec)
+        self.block_sec = float(block_sec)
+        self.cols = (id_col, time_col, lat_col, lon_col)
+        self.emitter_field = emitter_field
+        self.emitter_fallback = emitter_fallback
+        self.interpolation = interpolation
+        self.error_scale = error_scale
+        self.detector_id = detector_id
+        self.queue_size = queue_size
+        self.rng = resolve_rng(rng)
+        self.kernels = get_kernels(backend)
+
+        self.tracks = {}
+        self._cursors = {}
+        self._next_report = {}
+        self._started = asyncio.Event()
+        self.stats = {"records": 0, "dropped": 0, "detections": 0, "ticks": 0, "max_latency_sec": 0.0}
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    def _resolve_emitter(self, record):
+        em = record.get(self.emitter_field)
+        if isinstance(em, (list, tuple)):
+            em = em[0] if em else None
+        if em is None or em == "" or (isinstance(em, float) and np.isnan(em)):
+            return self.emitter_fallback
+        if em not in self.emitter_profiles:
+            raise ValueError(f"Emitter profile '{em}' not found.")
+        return em
+
+    def add_record(self, record):
+        """Apply one AIS record (dict) to its track's window; returns its time in seconds."""
+        id_col, time_col, lat_col, lon_col = self.cols
+        track_id = record[id_col]
+        t = pd.Timestamp(record[time_col]).value / 1e9
+        track = self.tracks.get(track_id)
+        if track is None:
+            track = self.tracks[track_id] = _ActiveTrack(track_id, self._resolve_emitter(record))
+        if track.append(t, float(record[lat_col]), float(record[lon_col])):
+            self.stats["records"] += 1
+        else:
+            self.stats["dropped"] += 1
+        return t
+
+    async def _read_source(self, source, queue):
+        try:
+            async for record in source:
+                await queue.put(record)
+        finally:
+            await queue.put(None)
+
+    async def _consume(self, queue):
+        time_col = self.cols[1]
+        next_tick = None
+        while True:
+            record = await queue.get()
+            if record is None:
+                break
+            t = pd.Timestamp(record[time_col]).value / 1e9
+            if next_tick is None:
+                self.clock.start(t)
+                self._started.set()
+                next_tick = t + self.tick_sec
+            if self.clock.speed is None:
+                # Event time: run every tick this record passes before applying it,
+                # so output does not depend on task scheduling
+                while next_tick <= t:
+                    self.clock.advance(next_tick)
+                    await self._tick(next_tick)
+                    next_tick += self.tick_sec
+            else:
+                await self.clock.sleep_until(t)  # pace recorded streams at `speed`
+            self.add_record(record)
+            self.clock.advance(t)
+        self.clock.finish()
+        self._started.set()
+        if self.clock.speed is None and next_tick is not None:
+            await self._flush()
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+    def _draw_block(self, sensor, track, start, end):
+        windows = None
+        if 'orbit' in sensor:
+            windows = compute_access_windows(
+                sensor['orbit'], start, end,
+                footprint_from_points(np.asarray(track.lats), np.asarray(track.lons))
+            )
+        times = draw_detection_times(sensor, start, end, self.rng, windows=windows)
+        times = times[times > start]  # (start, end]: blocks do not overlap
+        return thin_by_emission(self.emitter_profiles[track.emitter_type], times, self.rng)
+
+    def _due_times(self, sensor_type, track, until):
+        """Candidate times of ``track`` for ``sensor_type`` in (emitted_until, until]."""
+        key = (sensor_type, track.track_id)
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            cursor = self._cursors[key] = _SensorCursor(track.times[0])
+        if until <= cursor.emitted_until:
+            return None
+        sensor = self.sensor_profiles[sensor_type]
+        blocks = [cursor.pending]
+        while cursor.drawn_until < until:
+            blocks.append(self._draw_block(sensor, track, cursor.drawn_until, cursor.drawn_until + self.block_sec))
+            cursor.drawn_until += self.block_sec
+        pending = np.concatenate(blocks)
+        k = np.searchsorted(pending, until, side="right")
+        cursor.pending = pending[k:]
+        cursor.emitted_until = until
+        return pending[:k]
+
+    def generate(self, now, sensor_types=None):
+        """
+        Detections due at simulation time ``now`` for the given sensors (default all).
+
+        Returns:
+            pd.DataFrame: Detections sorted by detection_time (may be empty).
+        """
+        sensor_types = self.sensor_types if sensor_types is None else sensor_types
+        tracks = [tr for tr in self.tracks.values() if len(tr.times) >= 2]
+
+        due = []  # (sensor_type, track position, times)
+        for sensor_type in sensor_types:
+            for j, track in enumerate(tracks):
+                times = self._due_times(sensor_type, track, min(now, track.last_time))
+                if times is not None and len(times):
+                    due.append((sensor_type, j, times))
+        if not due:
+            return pd.DataFrame()
+
+        # One batched spline fit over the involved tracks and one evaluation for all samples
+        used = np.unique([j for _, j, _ in due])
+        slot = np.full(len(tracks), -1, dtype=np.int64)
+        slot[used] = np.arange(len(used))
+        knots = np.concatenate([np.asarray(tracks[j].times) for j in used])
+        values = np.column_stack([
+            np.concatenate([np.asarray(tracks[j].lats) for j in used]),
+            np.concatenate([np.asarray(tracks[j].lons) for j in used]),
+        ])
+        offsets = np.concatenate([[0], np.cumsum([len(tracks[j].times) for j in used])])
+        splines = BatchSpline.fit(knots, values, offsets, kind=self.interpolation)
+        all_times = np.concatenate([times for _, _, times in due])
+        all_slots = np.concatenate([np.full(len(times), slot[j]) for _, j, times in due])
+        positions = splines.evaluate(all_slots, all_times)
+
+        # One detection frame per (sensor, emitter) group rather than per track
+        row_track = np.concatenate([np.full(len(times), j) for _, j, times in due])
+        groups = {}
+        a = 0
+        for sensor_type, j, times in due:
+            groups.setdefault((sensor_type, tracks[j].emitter_type), []).append(np.arange(a, a + len(times)))
+            a += len(times)
+        track_ids = np.array([tr.track_id for tr in tracks], dtype=object)
+
+        frames = []
+        for (sensor_type, emitter_type), rows in groups.items():
+            rows = np.concatenate(rows)
+            frames.append(_detections_at_times(
+                track_ids[row_track[rows]], all_times[rows], positions[rows, 0], positions[rows, 1],
+                sensor_type, self.sensor_profiles[sensor_type], emitter_type,
+                self.emitter_profiles[emitter_type], self.detector_id, self.error_scale,
+                self.rng, self.kernels
+            ))
+        return pd.concat(frames, ignore_index=True).sort_values("detection_time", kind="stable",
+                                                                ignore_index=True)
+
+    def _evict(self, now):
+        for track_id, track in list(self.tracks.items()):
+            if now - track.last_time > self.stale_sec:
+                del self.tracks[track_id]
+                for sensor_type in self.sensor_types:
+                    self._cursors.pop((sensor_type, track_id), None)
+                continue
+            horizons = [self._cursors[(s, track_id)].emitted_until
+                        for s in self.sensor_types if (s, track_id) in self._cursors]
+            if horizons:
+                track.trim(min(horizons) - self.window_sec)
+
+    async def _emit(self, df):
+        if df.empty:
+            return
+        latency = self.clock.now() - df["detection_time"].to_numpy(dtype="datetime64[ns]").astype(np.int64).min() / 1e9
+        self.stats["max_latency_sec"] = max(self.stats["max_latency_sec"], float(latency))
+        self.stats["detections"] += len(df)
+        for sink in self.sinks:
+            await sink.write(df)
+
+    async def _tick(self, now):
+        due = [s for s in self.sensor_types if now >= self._next_report.get(s, -np.inf)]
+        for s in due:
+            self._next_report[s] = now + self.report_interval_sec.get(s, self.tick_sec) - 1e-9
+        self.stats["ticks"] += 1
+        await self._emit(self.generate(now, due))
+        self._evict(now)
+
+    async def _flush(self):
+        """Emit everything covered by the received reports."""
+        self._next_report.clear()
+        await self._tick(self.clock.latest)
+
+    async def _schedule(self):
+        """Wall-clock tick loop (paced mode only)."""
+        await self._started.wait()
+        if self.clock.sim0 is None:
+            return
+        t = self.clock.sim0 + self.tick_sec
+        while True:
+            await self.clock.sleep_until(t)
+            if self.clock.finished and t >= self.clock.latest:
+                break
+            await self._tick(t)
+            t += self.tick_sec
+        await self._flush()
+
+    async def run(self, source):
+        """
+        Replay ``source`` (async iterator of AIS record dicts) to the sinks until it ends.
+
+        Returns:
+            dict: ``stats``.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        tasks = [
+            asyncio.create_task(self._read_source(source, queue)),
+            asyncio.create_task(self._consume(queue)),
+        ]
+        if self.clock.speed is not None:
+            tasks.append(asyncio.create_task(self._schedule()))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            for sink in self.sinks:
+                await sink.close()
+        return self.stats
+
+
+async def replay(source, sensor_types, sensor_profiles, emitter_profiles, sinks, **kwargs):
+    """Build a ReplayEngine and run it over ``source``; returns the engine's stats."""
+    engine = ReplayEngine(sensor_types, sensor_profiles, emitter_profiles, sinks, **kwargs)
+    return await engine.run(source)
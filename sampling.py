@@ -0,0 +1,152 @@
+# sampling.py
+
+"""
+Detection-time sampling: arrival processes and emission thinning.
+
+Each sensor profile may choose its arrival process with an ``arrival_process`` key:
+
+    "poisson"            Poisson arrivals at ``sample_rate_per_min`` (default)
+    "periodic"           Fixed revisit every 1 / ``sample_rate_per_min`` minutes, random phase
+    "jittered_periodic"  Periodic revisits with Gaussian jitter of ``revisit_jitter_sec``
+    "grid"               Legacy behavior: an evenly spaced grid of 1.5x the rate,
+                         Bernoulli-thinned by ``sample_rate_per_min``
+
+When access windows are supplied (orbital sensors, see access_windows.py), times are
+only produced inside the windows, at ``pass_sample_rate_per_min`` if the profile sets it.
+
+Time-varying ``emission_prob`` callables are evaluated once per ``resolution_sec``
+bucket (at the bucket start) rather than once per sample: every sample in a bucket
+shares that probability, an approximation that is exact for profiles changing on
+coarser steps than the bucket (e.g. hourly duty cycles with the 60 s default).
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_ARRIVAL_PROCESS = "poisson"
+EMISSION_RESOLUTION_SEC = 60.0
+
+
+def resolve_rng(rng=None):
+    """
+    Return a random source exposing the NumPy sampling API.
+
+    Parameters:
+        rng (None, int, np.random.Generator or np.random.RandomState):
+            None returns the ``np.random`` module itself (so ``np.random.seed`` applies);
+            an int seeds a new ``np.random.default_rng``.
+    """
+    if rng is None:
+        return np.random
+    if isinstance(rng, (int, np.integer)):
+        return np.random.default_rng(rng)
+    return rng
+
+
+def poisson_times(rate_per_sec, start, end, rng):
+    """Sorted Poisson arrival times on [start, end]."""
+    n = rng.poisson(rate_per_sec * max(end - start, 0.0))
+    return np.sort(rng.uniform(start, end, n))
+
+
+def periodic_times(period_sec, start, end, rng, jitter_sec=0.0):
+    """Revisits every ``period_sec`` with a random phase and optional Gaussian jitter."""
+    if period_sec <= 0 or end <= start:
+        return np.empty(0)
+    phase = rng.uniform(0, period_sec)
+    times = np.arange(start + phase, end, period_sec)
+    if jitter_sec > 0 and len(times):
+        times = np.sort(times + rng.normal(0, jitter_sec, len(times)))
+        times = times[(times >= start) & (times <= end)]
+    return times
+
+
+def grid_times(rate_per_min, start, end, rng):
+    """Legacy over-sampled grid, thinned in one draw by the per-sample rate."""
+    duration_minutes = (end - start) / 60
+    n_samples = int(duration_minutes * rate_per_min * 1.5)
+    times = np.linspace(start, end, n_samples)
+    return times[rng.random(n_samples) <= rate_per_min]
+
+
+def draw_detection_times(sensor, start, end, rng=None, windows=None):
+    """
+    Draw candidate detection times (POSIX seconds) for one sensor over [start, end].
+
+    Parameters:
+        sensor (dict): Sensor profile with ``sample_rate_per_min`` and optional
+            ``arrival_process`` / ``revisit_jitter_sec`` / ``pass_sample_rate_per_min`` keys.
+        start, end (float): Time span in POSIX seconds.
+        rng: See ``resolve_rng``.
+        windows (AccessWindows): Optional access intervals; no times are drawn outside them.
+
+    Returns:
+        np.ndarray: Sorted candidate times.
+    """
+    rng = resolve_rng(rng)
+    rate_per_min = sensor['sample_rate_per_min']
+    process = sensor.get('arrival_process', DEFAULT_ARRIVAL_PROCESS)
+
+    if windows is not None:
+        windows = windows.clip(start, end)
+        if len(windows) == 0:
+            return np.empty(0)
+        rate_per_min = sensor.get('pass_sample_rate_per_min', rate_per_min)
+        if process == "poisson":
+            # Draw directly over the union of the passes
+            n = rng.poisson(rate_per_min / 60.0 * windows.total_duration)
+            return windows.uniform_times(n, rng)
+        start, end = windows.starts[0], windows.ends[-1]
+
+    if process == "poisson":
+        times = poisson_times(rate_per_min / 60.0, start, end, rng)
+    elif process == "periodic":
+        times = periodic_times(60.0 / rate_per_min, start, end, rng)
+    elif process == "jittered_periodic":
+        period = 60.0 / rate_per_min
+        times = periodic_times(period, start, end, rng, sensor.get('revisit_jitter_sec', 0.1 * period))
+    elif process == "grid":
+        times = grid_times(rate_per_min, start, end, rng)
+    else:
+        raise ValueError(f"Unsupported arrival process: {process}")
+
+    if windows is not None:
+        times = times[windows.contains(times)]
+    return times
+
+
+def bucketed_probability(emit_prob, times, resolution_sec=EMISSION_RESOLUTION_SEC):
+    """
+    Evaluate a time-varying ``emission_prob`` callable once per distinct
+    ``resolution_sec`` bucket of ``times`` (with the bucket start as a pandas
+    Timestamp, as the profile helpers expect) and gather the values per time.
+    """
+    times = np.asarray(times, dtype=float)
+    if len(times) == 0:
+        return np.empty(0)
+    buckets, inverse = np.unique(np.floor(times / resolution_sec).astype(np.int64), return_inverse=True)
+    stamps = pd.to_datetime(buckets * resolution_sec, unit='s')
+    return np.array([emit_prob(t) for t in stamps], dtype=float)[inverse]
+
+
+def emission_probability(emitter, times, resolution_sec=EMISSION_RESOLUTION_SEC):
+    """
+    Evaluate an emitter's ``emission_prob`` at an array of POSIX-second times.
+
+    Constant probabilities broadcast; callables are evaluated per time bucket
+    (see ``bucketed_probability``).
+    """
+    emit_prob = emitter['emission_prob']
+    if not callable(emit_prob):
+        return np.full(len(times), float(emit_prob))
+    return bucketed_probability(emit_prob, times, resolution_sec)
+
+
+def thin_by_emission(emitter, times, rng=None, resolution_sec=EMISSION_RESOLUTION_SEC):
+    """
+    Keep each candidate time with the emitter's probability of being active.
+    """
+    rng = resolve_rng(rng)
+    if len(times) == 0:
+        return times
+    p = emission_probability(emitter, times, resolution_sec)
+    return times[rng.random(len(times)) <= p]
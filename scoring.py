@@ -0,0 +1,215 @@
+# scoring.py
+
+"""
+Truth association and scenario-difficulty scoring for generated detections.
+
+Detections are grouped into fixed time slices. For each slice a KD-tree is built
+over the truth positions of every track active in that slice, and all detections
+of the slice are associated against it in one bulk query. The per-detection result
+measures how often a detection falls closer to another track than to its own and
+how ambiguous the nearest-neighbour choice is.
+"""
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from .geom_utils import EARTH_RADIUS_KM
+from .track_store import as_track_store
+
+
+def latlon_to_xyz(lat, lon):
+    """Earth-centred Cartesian coordinates in km (chord distance ~ great-circle distance locally)."""
+    phi, lam = np.radians(lat), np.radians(lon)
+    cos_phi = np.cos(phi)
+    return EARTH_RADIUS_KM * np.column_stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)])
+
+
+def _truth_from_tracks(truth, det_slices, slice_sec, track_codes):
+    """Interpolate each truth track at the centre of every detection slice it spans."""
+    store = as_track_store(truth)
+    slice_ids, lats, lons, codes = [], [], [], []
+    for i in range(len(store)):
+        tid, t_ns, lat, lon = store.track(i)
+        if len(t_ns) == 0 or tid not in track_codes:
+            continue
+        t = t_ns / 1e9
+        lo = np.searchsorted(det_slices, np.floor(t[0] / slice_sec - 0.5), side="left")
+        hi = np.searchsorted(det_slices, np.ceil(t[-1] / slice_sec - 0.5), side="right")
+        sl = det_slices[lo:hi]
+        centers = (sl + 0.5) * slice_sec
+        sl = sl[(centers >= t[0]) & (centers <= t[-1])]
+        centers = (sl + 0.5) * slice_sec
+        slice_ids.append(sl)
+        lats.append(np.interp(centers, t, lat))
+        lons.append(np.interp(centers, t, lon))
+        codes.append(np.full(len(sl), track_codes[tid], dtype=np.int64))
+    if not slice_ids:
+        return np.empty(0, np.int64), np.empty(0), np.empty(0), np.empty(0, np.int64)
+    return np.concatenate(slice_ids), np.concatenate(lats), np.concatenate(lons), np.concatenate(codes)
+
+
+def _truth_from_detections(det_slice, det_code, true_lat, true_lon, n_tracks):
+    """Mean true position of each track over the detections in each slice."""
+    key = det_slice * n_tracks + det_code
+    uniq, inverse = np.unique(key, return_inverse=True)
+    counts = np.bincount(inverse)
+    lats = np.bincount(inverse, weights=true_lat) / counts
+    lons = np.bincount(inverse, weights=true_lon) / counts
+    return uniq // n_tracks, lats, lons, uniq % n_tracks
+
+
+def associate_detections(elint_df, truth=None, slice_sec=60.0, k=3, gate_sigma=3.0,
+                         lat_col="detected_lat", lon_col="detected_lon", time_col="detection_time"):
+    """
+    Associate every detection with the nearest truth tracks in its time slice.
+
+    Parameters:
+        elint_df (pd.DataFrame): Detections with TrackID, time, detected and true positions.
+        truth (pd.DataFrame or TrackStore): Optional ground-truth tracks (TrackID, Timestamp,
+            Latitude, Longitude). If None, truth positions are taken from the detections'
+            true_lat/true_lon, so tracks without detections in a slice are not candidates.
+        slice_sec (float): Time-slice width; truth is evaluated at each slice centre.
+        k (int): Number of nearest truth tracks to retrieve per detection.
+        gate_sigma (float): Gate radius as a multiple of ``error_major_km`` (if present).
+
+    Returns:
+        pd.DataFrame: One row per detection (same index as elint_df) with columns
+            own_dist_km, nearest_track, nearest_dist_km, second_dist_km,
+            own_rank (0 = nearest, -1 = not among the k nearest), confused,
+            ambiguity_ratio (nearest / second-nearest distance), n_in_gate.
+            Detections without a TrackID (clutter) are never ``confused``; their
+            own_dist_km is NaN and own_rank -1.
+    """
+    n = len(elint_df)
+    track_codes_arr, track_table = pd.factorize(elint_df["TrackID"].to_numpy(dtype=object))
+    track_codes = {tid: i for i, tid in enumerate(track_table)}
+    if truth is not None:
+        for tid in as_track_store(truth).track_ids:
+            track_codes.setdefault(tid, len(track_codes))
+    track_table = np.array(list(track_codes), dtype=object)
+    n_tracks = len(track_table)
+
+    t = elint_df[time_col].to_numpy(dtype="datetime64[ns]").view(np.int64) / 1e9
+    det_slice = np.floor(t / slice_sec).astype(np.int64)
+    det_xyz = latlon_to_xyz(elint_df[lat_col].to_numpy(dtype=float), elint_df[lon_col].to_numpy(dtype=float))
+
+    if truth is not None:
+        truth_slice, truth_lat, truth_lon, truth_code = _truth_from_tracks(
+            truth, np.unique(det_slice), slice_sec, track_codes)
+    else:
+        has_track = track_codes_arr >= 0  # clutter / false alarms carry no TrackID
+        truth_slice, truth_lat, truth_lon, truth_code = _truth_from_detections(
+            det_slice[has_track], track_codes_arr[has_track],
+            elint_df["true_lat"].to_numpy(dtype=float)[has_track],
+            elint_df["true_lon"].to_numpy(dtype=float)[has_track], n_tracks)
+
+    order = np.lexsort((truth_code, truth_slice))
+    truth_slice, truth_code = truth_slice[order], truth_code[order]
+    truth_xyz = latlon_to_xyz(truth_lat[order], truth_lon[order])
+    truth_key = truth_slice * n_tracks + truth_code
+
+    # Distance to the detection's own track (vectorized key lookup)
+    own_dist = np.full(n, np.nan)
+    if len(truth_key):
+        own_key = det_slice * n_tracks + track_codes_arr
+        pos = np.minimum(np.searchsorted(truth_key, own_key), len(truth_key) - 1)
+        found = (truth_key[pos] == own_key) & (track_codes_arr >= 0)
+        own_dist[found] = np.linalg.norm(det_xyz[found] - truth_xyz[pos[found]], axis=1)
+
+    nearest = np.full(n, -1, dtype=np.int64)
+    d1 = np.full(n, np.nan)
+    d2 = np.full(n, np.nan)
+    own_rank = np.full(n, -1, dtype=np.int64)
+    n_in_gate = np.zeros(n, dtype=np.int64)
+    gate = (gate_sigma * elint_df["error_major_km"].to_numpy(dtype=float)
+            if "error_major_km" in elint_df.columns else None)
+
+    # One KD-tree per slice, one bulk query per slice
+    det_order = np.argsort(det_slice, kind="stable")
+    slices, det_starts = np.unique(det_slice[det_order], return_index=True)
+    det_bounds = np.append(det_starts, n)
+    truth_lo = np.searchsorted(truth_slice, slices, side="left")
+    truth_hi = np.searchsorted(truth_slice, slices, side="right")
+    for j in range(len(slices)):
+        a, b = truth_lo[j], truth_hi[j]
+        if b == a:
+            continue
+        rows = det_order[det_bounds[j]:det_bounds[j + 1]]
+        kk = min(k, b - a)
+        tree = cKDTree(truth_xyz[a:b])
+        dist, idx = tree.query(det_xyz[rows], k=kk, workers=-1)
+        dist, idx = dist.reshape(len(rows), kk), idx.reshape(len(rows), kk)
+        cand_codes = truth_code[a:b][idx]
+        nearest[rows] = cand_codes[:, 0]
+        d1[rows] = dist[:, 0]
+        if kk > 1:
+            d2[rows] = dist[:, 1]
+        match = cand_codes == track_codes_arr[rows, None]
+        own_rank[rows] = np.where(match.any(axis=1), match.argmax(axis=1), -1)
+        if gate is not None:
+            n_in_gate[rows] = (dist <= gate[rows, None]).sum(axis=1)
+
+    nearest_track = np.where(nearest >= 0, track_table[np.maximum(nearest, 0)], None)
+    return pd.DataFrame({
+        "TrackID": elint_df["TrackID"].to_numpy(),
+        "own_dist_km": own_dist,
+        "nearest_track": nearest_track,
+        "nearest_dist_km": d1,
+        "second_dist_km": d2,
+        "own_rank": own_rank,
+        "confused": (track_codes_arr >= 0) & (nearest >= 0) & (nearest != track_codes_arr),
+        "ambiguity_ratio": d1 / d2,
+        "n_in_gate": n_in_gate,
+    }, index=elint_df.index)
+
+
+def confusion_matrix(assoc_df):
+    """
+    Count (own track, nearest track) pairs.
+
+    Returns:
+        pd.DataFrame: Long-format counts with columns TrackID, nearest_track, count,
+        sorted by count (descending).
+    """
+    valid = assoc_df[assoc_df["nearest_track"].notna()]
+    counts = valid.groupby(["TrackID", "nearest_track"], sort=False).size().rename("count")
+    return counts.reset_index().sort_values("count", ascending=False, ignore_index=True)
+
+
+def scenario_difficulty(assoc_df, ambiguity_threshold=0.8):
+    """
+    Summarize association results into scenario-level difficulty metrics.
+
+    Rates are over detections of a truth track; detections without a TrackID
+    (clutter) are only counted in n_false_alarms / false_alarm_rate.
+
+    Returns:
+        dict: n_detections, n_false_alarms, false_alarm_rate, confusion_rate,
+        own_not_in_top_k, ambiguous_rate (ambiguity_ratio above the threshold),
+        multi_gate_rate (more than one track inside the gate), median_own_dist_km.
+    """
+    n = len(assoc_df)
+    if n == 0:
+        return {"n_detections": 0}
+    n_false = int(assoc_df["TrackID"].isna().sum())
+    summary = {"n_detections": n, "n_false_alarms": n_false, "false_alarm_rate": n_false / n}
+    assoc_df = assoc_df[assoc_df["TrackID"].notna()]
+    if len(assoc_df) == 0:
+        return summary
+    return {
+        **summary,
+        "confusion_rate": float(assoc_df["confused"].mean()),
+        "own_not_in_top_k": float((assoc_df["own_rank"] < 0).mean()),
+        "ambiguous_rate": float((assoc_df["ambiguity_ratio"] > ambiguity_threshold).mean()),
+        "multi_gate_rate": float((assoc_df["n_in_gate"] > 1).mean()),
+        "median_own_dist_km": float(assoc_df["own_dist_km"].median()),
+    }
+
+
+def score_detections(elint_df, truth=None, **kwargs):
+    """
+    Associate detections to truth and return (assoc_df, summary, confusion).
+    Keyword arguments are passed to ``associate_detections``.
+    """
+    assoc_df = associate_detections(elint_df, truth=truth, **kwargs)
+    return assoc_df, scenario_difficulty(assoc_df), confusion_matrix(assoc_df)
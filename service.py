@@ -0,0 +1,464 @@
+# service.py
+
+"""
+Local HTTP generation service with request coalescing and a result cache.
+
+Wraps ``extract_region_subtracks`` + ``generate_elint_for_tracks`` behind a small
+HTTP API so several notebooks can share one generator:
+
+    POST /generate   JSON request (see ``REQUEST_DEFAULTS``) -> Parquet or Arrow IPC stream
+    GET  /stats      cache and coalescing counters (JSON)
+    GET  /health     "ok"
+
+Each request is normalized and hashed together with the AIS source's identity
+(path, size, mtime) and a fingerprint of the profile registries; the hash names the
+result in a content-addressed on-disk cache (``cache_dir/ab/abcdef....parquet``).
+The cache is bounded by ``max_bytes`` and evicts least-recently-used results.
+
+Identical requests that arrive while a result is being generated wait for that one
+generation instead of starting their own. Generation runs in a process pool; the
+worker writes the Parquet result straight into the cache, so detections never pass
+back through the server process. Responses are streamed from the cached file in
+chunks (Parquet) or record batches (Arrow IPC).
+
+Requests default to ``seed=0`` so a cached result is exactly what a fresh run of
+the same request would produce.
+
+The server binds to localhost by default; use ``start_service`` in a notebook or
+test and ``ServiceClient`` to call it.
+"""
+import hashlib
+import io
+import json
+import multiprocessing as mp
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pandas as pd
+
+from .profiles import get_emitter_profiles, get_sensor_profiles
+
+REQUEST_DEFAULTS = {
+    "ais": None,                  # AIS CSV/Parquet file, or ais_store directory (required)
+    "region": None,               # GeoJSON FeatureCollection (required)
+    "sensor_type": None,          # sensor profile name (required)
+    "emitter_type": None,         # None: from the track's emitter_profile, else fallback
+    "t_start": None,              # optional AIS time range
+    "t_end": None,
+    "id_col": "mmsi",
+    "time_col": "Timestamp",
+    "lat_col": "Latitude",
+    "lon_col": "Longitude",
+    "resample_interval_sec": 600,
+    "interpolation": "cubic",
+    "error_scale": 1.0,
+    "detector_id": 0,
+    "clutter": False,
+    "measurement": "position",
+    "seed": 0,
+}
+FORMATS = ("parquet", "arrow")
+CHUNK_BYTES = 1 << 20
+
+
+def normalize_request(request):
+    """
+    Fill defaults and check a generation request.
+
+    Raises:
+        ValueError: Unknown keys, missing required fields or unknown profiles.
+    """
+    unknown = set(request) - set(REQUEST_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown request fields: {sorted(unknown)}")
+    req = dict(REQUEST_DEFAULTS)
+    req.update(request)
+    for key in ("ais", "region", "sensor_type"):
+        if req[key] is None:
+            raise ValueError(f"Request field '{key}' is required.")
+    if req["sensor_type"] not in get_sensor_profiles():
+        raise ValueError(f"Sensor profile '{req['sensor_type']}' not found.")
+    if req["emitter_type"] is not None and req["emitter_type"] not in get_emitter_profiles():
+        raise ValueError(f"Emitter profile '{req['emitter_type']}' not found.")
+    req["ais"] = os.path.abspath(req["ais"])
+    if not os.path.exists(req["ais"]):
+        raise ValueError(f"AIS source not found: {req['ais']}")
+    for key in ("t_start", "t_end"):
+        if req[key] is not None:
+            req[key] = pd.Timestamp(req[key]).isoformat()
+    return req
+
+
+def _source_fingerprint(path):
+    """Identity of an AIS file or store directory: changes when its content does."""
+    if os.path.isdir(path):
+        from .ais_store import METADATA_FILE
+        path = os.path.join(path, METADATA_FILE)
+    st = os.stat(path)
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def profiles_fingerprint(sensor_profiles=None, emitter_profiles=None):
+    """Stable hash of the profile registries (callables hashed by qualified name)."""
+    sensor_profiles = get_sensor_profiles() if sensor_profiles is None else sensor_profiles
+    emitter_profiles = get_emitter_profiles() if emitter_profiles is None else emitter_profiles
+    text = json.dumps([sensor_profiles, emitter_profiles], sort_keys=True,
+                      default=lambda o: getattr(o, "__qualname__", repr(o)))
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def request_key(request, profiles_hash=None):
+    """Content address of a normalized request."""
+    payload = {
+        "request": request,
+        "source": _source_fingerprint(request["ais"]),
+        "profiles": profiles_hash or profiles_fingerprint(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+def _load_tracks(req):
+    from .geojson_utils import extract_region_subtracks
+    cols = dict(id_col=req["id_col"], time_col=req["time_col"], lat_col=req["lat_col"], lon_col=req["lon_col"])
+    if os.path.isdir(req["ais"]):
+        from .ais_store import read_region_tracks
+        ais = read_region_tracks(req["ais"], req["region"], t_start=req["t_start"], t_end=req["t_end"])
+    else:
+        if req["ais"].endswith(".parquet"):
+            ais = pd.read_parquet(req["ais"])
+        else:
+            ais = pd.read_csv(req["ais"])
+        ais[req["time_col"]] = pd.to_datetime(ais[req["time_col"]])
+        if req["t_start"] is not None:
+            ais = ais[ais[req["time_col"]] >= pd.Timestamp(req["t_start"])]
+        if req["t_end"] is not None:
+            ais = ais[ais[req["time_col"]] <= pd.Timestamp(req["t_end"])]
+    return extract_region_subtracks(ais, req["region"], resample_interval_sec=req["resample_interval_sec"],
+                                    interpolation=req["interpolation"], **cols)
+
+
+def _generate_to_file(req, path):
+    """Run one request and write the detections to ``path`` (Parquet). Returns the row count."""
+    import numpy as np
+    from .elint_generator import generate_elint_for_tracks
+
+    np.random.seed(req["seed"])
+    tracks = _load_tracks(req)
+    if len(tracks):
+        elint_df = generate_elint_for_tracks(
+            tracks, req["sensor_type"], get_sensor_profiles(), get_emitter_profiles(),
+            emitter_type=req["emitter_type"], error_scale=req["error_scale"],
+            detector_id=req["detector_id"], interpolation=req["interpolation"],
+            clutter=req["clutter"], measurement=req["measurement"]
+        )
+    else:
+        elint_df = pd.DataFrame()
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    elint_df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return len(elint_df)
+
+
+# ----------------------------------------------------------------------
+# Cache
+# ----------------------------------------------------------------------
+class ResultCache:
+    """
+    Content-addressed Parquet results on disk with size-bounded LRU eviction.
+
+    Entries are files ``root/<key[:2]>/<key>.parquet``; recency is kept in memory
+    and seeded from file modification times when the cache is reopened.
+    """
+
+    def __init__(self, root, max_bytes=2 << 30):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        found = []
+        for sub in os.listdir(root):
+            subdir = os.path.join(root, sub)
+            if not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                full = os.path.join(subdir, name)
+                if name.endswith(".tmp"):
+                    os.remove(full)  # interrupted write
+                elif name.endswith(".parquet"):
+                    st = os.stat(full)
+                    found.append((st.st_mtime_ns, name[:-len(".parquet")], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def total_bytes(self):
+        return sum(self._entries.values())
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.parquet")
+
+    def open(self, key):
+        """Open a cached result for reading (marks it recently used), or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            path = self.path(key)
+            try:
+                os.utime(path)
+                return open(path, "rb")
+            except FileNotFoundError:
+                del self._entries[key]
+                return None
+
+    def reserve(self, key):
+        """Path a worker should write ``key`` to (its directory is created)."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def commit(self, key):
+        """Register a written result and evict least-recently-used entries over budget."""
+        with self._lock:
+            self._entries[key] = os.path.getsize(self.path(key))
+            self._entries.move_to_end(key)
+            total = self.total_bytes
+            while total > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                try:
+                    os.remove(self.path(old))  # open readers keep their handle
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+
+
+# ----------------------------------------------------------------------
+# Service
+# ----------------------------------------------------------------------
+class GenerationService:
+    """
+    Request coalescing, caching and a worker pool; transport-independent.
+
+    Parameters:
+        cache_dir (str): Result cache directory.
+        max_bytes (int): Cache size bound.
+        n_workers (int): Generation processes (default: CPU count).
+        mp_context (str): Start method for the pool (default "spawn"; the server is
+            multi-threaded, so forking is avoided).
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 << 30, n_workers=None, mp_context="spawn"):
+        self.cache = ResultCache(cache_dir, max_bytes)
+        self.pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context(mp_context))
+        self.profiles_hash = profiles_fingerprint()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def result(self, request):
+        """
+        Return (open file of the Parquet result, status) for a request, generating it
+        if needed. Status is "hit", "miss" or "coalesced".
+        """
+        req = normalize_request(request)
+        key = request_key(req, self.profiles_hash)
+        with self._lock:
+            self.stats["requests"] += 1
+            f = self.cache.open(key)
+            if f is not None:
+                self.stats["hits"] += 1
+                return f, "hit"
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if owner:
+            try:
+                self.pool.submit(_generate_to_file, req, self.cache.reserve(key)).result()
+                self.cache.commit(key)
+                pending.set_result(key)
+            except BaseException as exc:
+                with self._lock:
+                    self.stats["errors"] += 1
+                pending.set_exception(exc)
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+        pending.result()  # re-raises a failed generation for every waiter
+
+        # Opened straight from disk: the entry may already have been evicted under pressure
+        f = self.cache.open(key) or open(self.cache.path(key), "rb")
+        return f, "miss" if owner else "coalesced"
+
+    def summary(self):
+        with self._lock:
+            return dict(self.stats, cached=len(self.cache), cache_bytes=self.cache.total_bytes,
+                        evictions=self.cache.evictions, inflight=len(self._inflight))
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # keep notebooks quiet
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, "ok")
+        elif self.path == "/stats":
+            self._send_json(200, self.server.service.summary())
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            fmt = request.pop("format", "parquet")
+            if fmt not in FORMATS:
+                raise ValueError(f"Unsupported format: {fmt}")
+            f, status = self.server.service.result(request)
+        except (ValueError, KeyError, TypeError) as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        except Exception as exc:
+            self._send_json(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+
+        with f:
+            self.send_response(200)
+            self.send_header("X-Cache", status)
+            if fmt == "parquet":
+                self.send_header("Content-Type", "application/vnd.apache.parquet")
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.end_headers()
+                while chunk := f.read(CHUNK_BYTES):
+                    self.wfile.write(chunk)
+            else:
+                self._stream_arrow(f)
+
+    def _stream_arrow(self, f):
+        """Arrow IPC stream, one record batch per Parquet row group (chunked encoding)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.send_header("Content-Type", "application/vnd.apache.arrow.stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        parquet = pq.ParquetFile(f)
+        buf = io.BytesIO()
+        with pa.ipc.new_stream(buf, parquet.schema_arrow) as writer:
+            for batch in parquet.iter_batches():
+                writer.write_batch(batch)
+                self._write_chunk(buf.getvalue())
+                buf.seek(0)
+                buf.truncate()
+        self._write_chunk(buf.getvalue())
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, _Handler)
+        self.service = service
+
+
+def start_service(cache_dir, host="127.0.0.1", port=0, **kwargs):
+    """
+    Start the service in a background thread.
+
+    Parameters:
+        cache_dir (str): Result cache directory.
+        host, port: Bind address (port 0 picks a free port).
+        **kwargs: Passed to GenerationService (max_bytes, n_workers, mp_context).
+
+    Returns:
+        (server, url): Call ``server.shutdown()`` and ``server.service.close()`` to stop.
+    """
+    server = _Server((host, port), GenerationService(cache_dir, **kwargs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+
+def serve(cache_dir, host="127.0.0.1", port=8765, **kwargs):
+    """Run the service in the foreground until interrupted."""
+    server = _Server((host, port), GenerationService(cache_dir, **kwargs))
+    print(f"ELINT generation service on http://{host}:{port} (cache: {cache_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+
+
+class ServiceClient:
+    """Minimal client for the generation service."""
+
+    def __init__(self, url="http://127.0.0.1:8765", timeout=None):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.last_status = None
+
+    def generate(self, format="parquet", **request):
+        """
+        Request detections; returns a DataFrame. ``last_status`` records whether the
+        result was a cache "hit", a "miss" or "coalesced" with another request.
+        """
+        body = json.dumps(dict(request, format=format), default=str).encode()
+        req = Request(f"{self.url}/generate", data=body, method="POST",
+                      headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(req, timeout=self.timeout) as resp:
+                self.last_status = resp.headers.get("X-Cache")
+                data = resp.read()
+        except HTTPError as exc:
+            message = json.loads(exc.read() or b'{}').get("error", exc.reason)
+            raise ValueError(f"Service error ({exc.code}): {message}") from None
+        if format == "arrow":
+            import pyarrow as pa
+            return pa.ipc.open_stream(data).read_all().to_pandas()
+        return pd.read_parquet(io.BytesIO(data))
+
+    def stats(self):
+        with urlopen(f"{self.url}/stats", timeout=self.timeout) as resp:
+            return json.loads(resp.read())
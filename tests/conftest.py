@@ -0,0 +1,52 @@
+# conftest.py
+
+"""
+Shared test setup.
+
+The repository root is the ``elintgen`` package (see pyproject.toml), so when it is
+not installed it is registered under that name from the checkout.
+"""
+import importlib.util
+import pathlib
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+if importlib.util.find_spec("elintgen") is None:
+    _spec = importlib.util.spec_from_file_location("elintgen", ROOT / "__init__.py",
+                                                   submodule_search_locations=[str(ROOT)])
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules["elintgen"] = _module
+    _spec.loader.exec_module(_module)
+
+
+def make_tracks(n_tracks=3, n_points=30, seed=0, lat0=36.0, lon0=-76.0):
+    """Straight-line AIS tracks over three hours with irregular report times."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for k in range(n_tracks):
+        offsets = np.sort(rng.choice(np.arange(0, 3 * 3600, 60), n_points, replace=False))
+        frames.append(pd.DataFrame({
+            "TrackID": f"T{k}",
+            "Timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(offsets, unit="s"),
+            "Latitude": lat0 + 0.05 * k + np.linspace(0, 0.5, n_points),
+            "Longitude": lon0 + np.linspace(0, 0.5, n_points),
+            "emitter_profile": "nav_radar_x_band",
+            "mmsi": str(1000 + k),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def tracks():
+    return make_tracks()
+
+
+@pytest.fixture(scope="session")
+def profiles():
+    from elintgen.profiles import get_emitter_profiles, get_sensor_profiles
+    return get_sensor_profiles(), get_emitter_profiles()
@@ -0,0 +1,63 @@
+# test_batch_spline.py
+
+"""BatchSpline fits against the SciPy interpolants they replace."""
+import numpy as np
+import pytest
+from scipy.interpolate import Akima1DInterpolator, CubicSpline
+
+from elintgen.batch_spline import BatchSpline
+from elintgen.track_store import TrackStore
+
+LENGTHS = [2, 3, 4, 7, 40]
+
+
+@pytest.fixture
+def fleet():
+    rng = np.random.default_rng(1)
+    knots = [np.cumsum(rng.uniform(30, 600, n)) + 1.7e9 for n in LENGTHS]
+    values = [np.column_stack([36 + np.cumsum(rng.normal(0, 0.01, n)), -76 + np.cumsum(rng.normal(0, 0.01, n))])
+              for n in LENGTHS]
+    offsets = np.concatenate([[0], np.cumsum(LENGTHS)])
+    return knots, values, offsets
+
+
+def reference(kind, x, y):
+    if kind == "cubic":
+        return CubicSpline(x, y)
+    if kind == "akima" and len(x) > 2:
+        return Akima1DInterpolator(x, y)
+    return lambda t: np.column_stack([np.interp(t, x, y[:, d]) for d in range(y.shape[1])])
+
+
+@pytest.mark.parametrize("kind", ["cubic", "akima", "linear"])
+def test_matches_scipy(fleet, kind):
+    knots, values, offsets = fleet
+    splines = BatchSpline.fit(np.concatenate(knots), np.concatenate(values), offsets, kind=kind)
+    track, times, expected = [], [], []
+    for i, (x, y) in enumerate(zip(knots, values)):
+        t = np.linspace(x[0], x[-1], 97)
+        track.append(np.full(len(t), i))
+        times.append(t)
+        expected.append(reference(kind, x, y)(t))
+    out = splines.evaluate(np.concatenate(track), np.concatenate(times))
+    np.testing.assert_allclose(out, np.concatenate(expected), rtol=0, atol=1e-9)
+
+
+def test_track_ppoly_matches_batched_evaluation(fleet):
+    knots, values, offsets = fleet
+    splines = BatchSpline.fit(np.concatenate(knots), np.concatenate(values), offsets)
+    t = np.linspace(knots[-1][0], knots[-1][-1], 50)
+    lat_spline, lon_spline = splines.track_splines(len(LENGTHS) - 1)
+    np.testing.assert_allclose(np.column_stack([lat_spline(t), lon_spline(t)]),
+                               splines.evaluate(len(LENGTHS) - 1, t), rtol=0, atol=1e-12)
+
+
+def test_from_store_drops_duplicate_times(tracks):
+    tracks = tracks.copy()
+    tracks.loc[1, "Timestamp"] = tracks.loc[0, "Timestamp"]
+    store = TrackStore.from_pandas(tracks)
+    splines = BatchSpline.from_store(store)
+    first = tracks[tracks["TrackID"] == "T0"].drop(index=1)
+    x = first["Timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64) / 1e9
+    expected = CubicSpline(x, first[["Latitude", "Longitude"]].to_numpy())(x)
+    np.testing.assert_allclose(splines.evaluate(0, x), expected, rtol=0, atol=1e-9)
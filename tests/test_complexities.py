@@ -0,0 +1,99 @@
+# test_complexities.py
+
+"""
+Vectorized complexity modules against the per-track groupby implementations they
+replaced (kept here as references).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from elintgen.complexities import ScaleErrorEllipses, ShadowTrack, TimestampQuantization
+from elintgen.track_store import TrackStore
+
+
+def shadow_reference(tracks_df, lag_seconds, track_ids=None):
+    subset = tracks_df if track_ids is None else tracks_df[tracks_df["TrackID"].isin(track_ids)]
+    clones = []
+    for tid, track in subset.groupby("TrackID"):
+        shadow = track.sort_values("Timestamp").copy()
+        shadow["Timestamp"] = shadow["Timestamp"] + pd.to_timedelta(lag_seconds, unit="s")
+        shadow["TrackID"] = f"{tid}_shadow"
+        shadow["ParentTrackID"] = tid
+        shadow["SyntheticType"] = "shadow"
+        shadow["IsSynthetic"] = True
+        clones.append(shadow)
+    return pd.concat(clones, ignore_index=True)
+
+
+def quantization_reference(elint_df, resolution, track_ids):
+    clones = []
+    for tid, group in elint_df[elint_df["TrackID"].isin(track_ids)].groupby("TrackID"):
+        group = group.copy()
+        group["detection_time"] = group["detection_time"].dt.round(resolution)
+        group["WasQuantized"] = True
+        group["TrackID"] = f"{tid}_quantized"
+        group["ParentTrackID"] = tid
+        group["IsSynthetic"] = True
+        group["SyntheticType"] = "quantized"
+        clones.append(group)
+    return pd.concat(clones, ignore_index=True)
+
+
+def scale_reference(elint_df, scale, track_ids):
+    clones = []
+    for tid, group in elint_df[elint_df["TrackID"].isin(track_ids)].groupby("TrackID"):
+        group = group.copy()
+        group["error_major_km"] *= scale
+        group["error_minor_km"] *= scale
+        group["SyntheticType"] = "error_scaled"
+        group["IsSynthetic"] = True
+        group["ParentTrackID"] = tid
+        group["TrackID"] = f"{tid}_error{scale}"
+        clones.append(group)
+    return pd.concat(clones, ignore_index=True)
+
+
+def assert_same_rows(out, expected, time_col):
+    """Same columns and rows, ignoring column order and row order across tracks."""
+    assert sorted(out.columns) == sorted(expected.columns)
+    columns = sorted(expected.columns)
+    out = out[columns].sort_values(["TrackID", time_col], kind="stable").reset_index(drop=True)
+    expected = expected[columns].sort_values(["TrackID", time_col], kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+@pytest.fixture
+def detections(tracks):
+    shuffled = tracks.sample(frac=1, random_state=1).reset_index(drop=True)
+    n = len(shuffled)
+    return pd.DataFrame({
+        "TrackID": shuffled["TrackID"],
+        "detection_time": shuffled["Timestamp"] + pd.to_timedelta(np.arange(n) * 0.37, unit="s"),
+        "detected_lat": shuffled["Latitude"],
+        "error_major_km": np.arange(n) * 1.0,
+        "error_minor_km": 0.5,
+    })
+
+
+@pytest.mark.parametrize("track_ids", [None, ["T0", "T2"]])
+def test_shadow_track_matches_reference(tracks, track_ids):
+    shuffled = tracks.sample(frac=1, random_state=2).reset_index(drop=True)
+    out = ShadowTrack({"lag_seconds": 90, "track_ids": track_ids}).apply(shuffled)
+    assert_same_rows(out, shadow_reference(shuffled, 90, track_ids), "Timestamp")
+
+
+def test_shadow_track_accepts_track_store(tracks):
+    from_frame = ShadowTrack({"lag_seconds": 90}).apply(tracks)
+    from_store = ShadowTrack({"lag_seconds": 90}).apply(TrackStore.from_pandas(tracks))
+    assert_same_rows(from_store[from_frame.columns], from_frame, "Timestamp")
+
+
+def test_timestamp_quantization_matches_reference(detections):
+    out = TimestampQuantization({"resolution": "10s", "track_ids": ["T0", "T2"]}).apply(detections)
+    assert_same_rows(out, quantization_reference(detections, "10s", ["T0", "T2"]), "detection_time")
+
+
+def test_scale_error_ellipses_matches_reference(detections):
+    out = ScaleErrorEllipses({"error_scale": 2.0, "track_ids": ["T0", "T2"]}).apply(detections)
+    assert_same_rows(out, scale_reference(detections, 2.0, ["T0", "T2"]), "detection_time")
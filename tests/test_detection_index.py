@@ -0,0 +1,82 @@
+# test_detection_index.py
+
+"""DetectionIndex queries against a brute-force scan of the same detections."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from elintgen.detection_index import DetectionIndex, read_detections, write_detections
+
+
+@pytest.fixture
+def detections():
+    rng = np.random.default_rng(0)
+    n = 3000
+    lons = np.concatenate([rng.uniform(115, 125, n - 300), rng.uniform(179, 180, 150), rng.uniform(-180, -179, 150)])
+    lons[:4] = [180.0, -180.0, 179.999, -179.999]
+    return pd.DataFrame({
+        "detection_time": pd.Timestamp("2024-05-01") + pd.to_timedelta(rng.uniform(0, 6 * 3600, n), unit="s"),
+        "detected_lat": rng.uniform(20, 27, n),
+        "detected_lon": lons,
+        "sensor_type": rng.choice(["shore", "drone"], n),
+        "emitter_type": rng.choice(["nav_radar_x_band", "fire_control"], n),
+    })
+
+
+def brute_force(df, t0, t1, bbox=None, sensor_type=None):
+    t = df["detection_time"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    keep = (t >= pd.Timestamp(t0).value) & (t <= pd.Timestamp(t1).value)
+    if bbox is not None:
+        lon_min, lat_min, lon_max, lat_max = bbox
+        lat, lon = df["detected_lat"].to_numpy(), df["detected_lon"].to_numpy()
+        keep &= (lat >= lat_min) & (lat <= lat_max)
+        keep &= ((lon >= lon_min) & (lon <= lon_max)) if lon_min <= lon_max else ((lon >= lon_min) | (lon <= lon_max))
+    if sensor_type is not None:
+        keep &= (df["sensor_type"] == sensor_type).to_numpy()
+    return np.flatnonzero(keep)
+
+
+QUERIES = [
+    ("2024-01-01", "2024-12-31", None, None),
+    ("2024-05-01 01:00", "2024-05-01 03:00", (118, 21, 121, 24), None),
+    ("2024-05-01", "2024-05-02", (178, -90, -179.5, 90), None),     # across the antimeridian
+    ("2024-05-01", "2024-05-02", (179.9, -90, 180, 90), None),       # box ending at lon=180
+    ("2024-05-01", "2024-05-02", (-180, -90, -179.9, 90), None),
+    ("2024-05-01 02:00", "2024-05-01 02:30", (-180, -90, 180, 90), "shore"),
+    ("2025-01-01", "2026-01-01", None, None),
+    ("2024-05-01", "2024-05-02", (0, 0, 10, 10), None),
+]
+
+
+@pytest.mark.parametrize("t0, t1, bbox, sensor_type", QUERIES)
+def test_query_matches_brute_force(detections, t0, t1, bbox, sensor_type):
+    index = DetectionIndex(time_bucket_sec=900, cell_deg=0.5).add(detections.iloc[:1000]).add(detections.iloc[1000:])
+    rows = index.query(t0, t1, bbox=bbox, sensor_type=sensor_type)
+    np.testing.assert_array_equal(rows, brute_force(detections, t0, t1, bbox, sensor_type))
+
+
+def test_polygon_query_matches_brute_force(detections):
+    shapely = pytest.importorskip("shapely")
+    from shapely.geometry import Polygon
+
+    polygon = Polygon([(116, 21), (123, 21), (121, 26), (116, 25)])
+    index = DetectionIndex().add(detections)
+    expected = brute_force(detections, "2024-05-01", "2024-05-02", polygon.bounds)
+    expected = expected[shapely.contains_xy(polygon, detections["detected_lon"].to_numpy()[expected],
+                                            detections["detected_lat"].to_numpy()[expected])]
+    np.testing.assert_array_equal(index.query("2024-05-01", "2024-05-02", polygon=polygon), expected)
+
+
+def test_saved_index_returns_frame_rows(detections, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "detections.parquet")
+    write_detections(detections, path, DetectionIndex().add(detections))
+    index = read_detections(path)
+    bbox = (118, 21, 121, 24)
+    out = index.query("2024-05-01 01:00", "2024-05-01 03:00", bbox=bbox)
+    np.testing.assert_array_equal(out.index, brute_force(detections, "2024-05-01 01:00", "2024-05-01 03:00", bbox))
+
+
+def test_rejects_grids_that_overflow_int64_keys():
+    with pytest.raises(ValueError):
+        DetectionIndex(time_bucket_sec=0.001, cell_deg=0.01)
@@ -0,0 +1,53 @@
+# test_regressions.py
+
+"""Regression tests for fixed bugs."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from elintgen.access_windows import compute_access_windows, footprint_from_points, track_access_windows
+from elintgen.elint_generator import generate_elint_for_tracks
+from elintgen.track_store import TrackStore
+
+from conftest import make_tracks
+
+SATELLITE = "satellite_leo_dense"
+
+
+def test_orbital_access_windows_are_per_track(profiles):
+    # A far-away track used to widen one fleet footprint and give every track its passes
+    near = make_tracks(1, 40)
+    far = make_tracks(1, 40, lat0=40.0, lon0=15.0).assign(TrackID="T9")
+    fleet = TrackStore.from_pandas(pd.concat([near, far], ignore_index=True))
+    orbit = profiles[0][SATELLITE]["orbit"]
+
+    windows = track_access_windows(orbit, fleet)
+    t = near["Timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64) / 1e9
+    alone = compute_access_windows(orbit, t[0], t[-1], footprint_from_points(near["Latitude"], near["Longitude"]))
+    np.testing.assert_array_equal(windows[0].starts, alone.starts)
+    np.testing.assert_array_equal(windows[0].ends, alone.ends)
+
+    np.random.seed(0)
+    out = generate_elint_for_tracks(fleet, SATELLITE, *profiles)
+    near_times = out.loc[out["TrackID"] == "T0", "detection_time"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    assert windows[0].contains(near_times / 1e9).all()
+
+
+def test_footprint_across_the_antimeridian():
+    lat, lon, radius = footprint_from_points([0.0, 0.0], [179.5, -179.5])
+    assert abs(abs(lon) - 180.0) < 1e-9
+    assert radius == pytest.approx(55.6, abs=0.5)
+
+
+def test_region_extraction_skips_tracks_with_nan_positions(tracks):
+    pytest.importorskip("shapely")
+    from elintgen.geojson_utils import extract_region_subtracks
+
+    region = {"type": "FeatureCollection", "features": [{"type": "Feature", "properties": {}, "geometry": {
+        "type": "Polygon", "coordinates": [[[-77, 35], [-75, 35], [-75, 37], [-77, 37], [-77, 35]]]}}]}
+    bad = tracks.copy()
+    bad.loc[bad.index[bad["mmsi"] == "1001"][3], "Latitude"] = np.nan
+    out = extract_region_subtracks(bad, region)
+    expected = extract_region_subtracks(tracks[tracks["mmsi"] != "1001"], region)
+    assert "1001" not in set(out["mmsi"])
+    pd.testing.assert_frame_equal(out.reset_index(drop=True), expected.reset_index(drop=True))
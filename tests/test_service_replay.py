@@ -0,0 +1,102 @@
+# test_service_replay.py
+
+"""The HTTP service and the streaming replay against the batch generator."""
+import asyncio
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from elintgen.elint_generator import generate_elint_for_tracks
+from elintgen.replay import QueueSink, ReplayEngine
+
+REGION = {"type": "FeatureCollection", "features": [{"type": "Feature", "properties": {}, "geometry": {
+    "type": "Polygon", "coordinates": [[[-76.5, 35.5], [-75.0, 35.5], [-75.0, 37.0], [-76.5, 37.0], [-76.5, 35.5]]]}}]}
+
+
+@pytest.fixture
+def ais_csv(tracks, tmp_path):
+    path = tmp_path / "ais.csv"
+    tracks.to_csv(path, index=False)
+    return str(path)
+
+
+def batch_reference(ais_csv, profiles, seed=0):
+    from elintgen.geojson_utils import extract_region_subtracks
+    ais = pd.read_csv(ais_csv)
+    ais["Timestamp"] = pd.to_datetime(ais["Timestamp"])
+    np.random.seed(seed)
+    subtracks = extract_region_subtracks(ais, REGION)
+    return generate_elint_for_tracks(subtracks, "shore", *profiles)
+
+
+def test_service_worker_matches_batch_generation(ais_csv, profiles, tmp_path):
+    pytest.importorskip("shapely")
+    pytest.importorskip("pyarrow")
+    from elintgen.service import _generate_to_file, normalize_request
+
+    path = str(tmp_path / "out.parquet")
+    n = _generate_to_file(normalize_request({"ais": ais_csv, "region": REGION, "sensor_type": "shore"}), path)
+    expected = batch_reference(ais_csv, profiles)
+    assert n == len(expected) > 0
+    pd.testing.assert_frame_equal(pd.read_parquet(path), expected, check_dtype=False)
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="needs the fork start method")
+def test_service_caches_identical_requests(ais_csv, profiles, tmp_path):
+    pytest.importorskip("shapely")
+    pytest.importorskip("pyarrow")
+    from elintgen.service import ServiceClient, start_service
+
+    server, url = start_service(str(tmp_path / "cache"), n_workers=1, mp_context="fork")
+    try:
+        client = ServiceClient(url, timeout=60)
+        first = client.generate(ais=ais_csv, region=REGION, sensor_type="shore")
+        assert client.last_status == "miss"
+        second = client.generate(ais=ais_csv, region=REGION, sensor_type="shore")
+        assert client.last_status == "hit"
+        with pytest.raises(ValueError):
+            client.generate(ais=ais_csv, region=REGION, sensor_type="shore", measurement="range")
+    finally:
+        server.shutdown()
+        server.service.close()
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(first, batch_reference(ais_csv, profiles), check_dtype=False)
+
+
+def run_replay(tracks, profiles, **kwargs):
+    async def source():
+        for record in tracks.sort_values("Timestamp").to_dict("records"):
+            yield record
+
+    async def main():
+        sink = QueueSink(maxsize=0)
+        engine = ReplayEngine(["shore", "drone"], *profiles, [sink], speed=None, tick_sec=60, rng=1, **kwargs)
+        await engine.run(source())
+        frames = []
+        while (frame := sink.queue.get_nowait()) is not None:
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    return asyncio.run(main())
+
+
+def test_replay_is_deterministic_and_uses_batch_schema(tracks, profiles):
+    out = run_replay(tracks, profiles)
+    assert len(out) > 0
+    pd.testing.assert_frame_equal(out, run_replay(tracks, profiles))
+    np.random.seed(0)
+    batch = generate_elint_for_tracks(tracks, "shore", *profiles)
+    assert list(out.columns) == list(batch.columns)
+
+
+def test_replay_positions_follow_the_track(tracks, profiles):
+    # Linear interpolation over the replay's trimmed window equals interpolation over the whole track
+    out = run_replay(tracks, profiles, interpolation="linear")
+    for track_id, rows in out.groupby("TrackID"):
+        track = tracks[tracks["TrackID"] == track_id]
+        t = track["Timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64) / 1e9
+        td = rows["detection_time"].to_numpy(dtype="datetime64[ns]").view(np.int64) / 1e9
+        np.testing.assert_allclose(rows["true_lat"], np.interp(td, t, track["Latitude"]), rtol=0, atol=1e-9)
+        np.testing.assert_allclose(rows["true_lon"], np.interp(td, t, track["Longitude"]), rtol=0, atol=1e-9)
@@ -0,0 +1,245 @@
+# track_store.py
+
+"""
+Array-backed columnar storage for many AIS tracks.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+TrackArrays = namedtuple("TrackArrays", ["track_id", "times", "lats", "lons"])
+
+
+def track_offsets(ids):
+    """
+    Compute a stable track ordering and CSR offsets for an array of track IDs.
+
+    Parameters:
+        ids (array-like): Track ID per row.
+
+    Returns:
+        tuple: (order, unique_ids, offsets) where ``order`` sorts rows by track,
+               ``unique_ids`` is the sorted ID table and track ``i`` occupies
+               ``order[offsets[i]:offsets[i + 1]]``.
+    """
+    codes, unique_ids = pd.factorize(np.asarray(ids, dtype=object), sort=True)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]  # drop rows without a track ID
+    counts = np.bincount(codes[order], minlength=len(unique_ids))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return order, np.asarray(unique_ids, dtype=object), offsets
+
+
+def to_datetime_ns(values):
+    """Convert timestamps to an int64 array of nanoseconds since epoch."""
+    return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+class TrackStore:
+    """
+    Compact columnar container for a fleet of tracks.
+
+    Points are held in contiguous NumPy arrays sorted by track and time, with a
+    CSR-style ``offsets`` array so that track ``i`` occupies rows
+    ``offsets[i]:offsets[i + 1]``. Track IDs are stored once in a categorical
+    table (``track_ids``); per-track access is O(1) and returns views, not copies.
+
+    Attributes:
+        track_ids (np.ndarray): Unique track IDs, one per track.
+        offsets (np.ndarray): int64 array of length ``n_tracks + 1``.
+        times (np.ndarray): int64 nanoseconds since epoch, per point.
+        lats, lons (np.ndarray): float64 positions, per point.
+        columns (dict): Any other per-point columns, in the same row order.
+    """
+
+    def __init__(self, track_ids, offsets, times, lats, lons, columns=None,
+                 id_col="TrackID", time_col="Timestamp", lat_col="Latitude", lon_col="Longitude",
+                 column_order=None):
+        self.track_ids = np.asarray(track_ids, dtype=object)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.times = np.asarray(times, dtype=np.int64)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.columns = dict(columns or {})
+        self.id_col = id_col
+        self.time_col = time_col
+        self.lat_col = lat_col
+        self.lon_col = lon_col
+        self.column_order = list(column_order) if column_order is not None else (
+            [id_col, time_col, lat_col, lon_col] + list(self.columns)
+        )
+
+        if len(self.offsets) != len(self.track_ids) + 1:
+            raise ValueError("offsets must have one more entry than track_ids.")
+        n = self.offsets[-1]
+        for name, arr in [("times", self.times), ("lats", self.lats), ("lons", self.lons)] + list(self.columns.items()):
+            if len(arr) != n:
+                raise ValueError(f"Column '{name}' has {len(arr)} rows, expected {n}.")
+        self._id_index = None
+
+    # ------------------------------------------------------------------
+    # Construction / conversion
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_pandas(cls, df, id_col="TrackID", time_col="Timestamp", lat_col="Latitude", lon_col="Longitude"):
+        """
+        Build a TrackStore from a long-format DataFrame.
+
+        Rows are sorted once by (track, time); rows without a track ID are dropped.
+        All columns other than the ID/time/lat/lon columns are kept as per-point arrays.
+        """
+        if isinstance(df, cls):
+            return df
+
+        times = to_datetime_ns(df[time_col])
+        codes, unique_ids = pd.factorize(df[id_col].to_numpy(dtype=object), sort=True)
+        valid = codes >= 0
+        order = np.lexsort((times, codes))
+        order = order[valid[order]]
+        counts = np.bincount(codes[order], minlength=len(unique_ids))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        extra = [c for c in df.columns if c not in (id_col, time_col, lat_col, lon_col)]
+        columns = {c: df[c].to_numpy()[order] for c in extra}
+
+        return cls(
+            track_ids=np.asarray(unique_ids, dtype=object),
+            offsets=offsets,
+            times=times[order],
+            lats=df[lat_col].to_numpy(dtype=np.float64)[order],
+            lons=df[lon_col].to_numpy(dtype=np.float64)[order],
+            columns=columns,
+            id_col=id_col, time_col=time_col, lat_col=lat_col, lon_col=lon_col,
+            column_order=list(df.columns)
+        )
+
+    def to_pandas(self):
+        """Return the store as a long-format DataFrame with the original column names."""
+        data = {
+            self.id_col: self.row_track_ids(),
+            self.time_col: self.times.view("datetime64[ns]"),
+            self.lat_col: self.lats,
+            self.lon_col: self.lons,
+        }
+        data.update(self.columns)
+        order = [c for c in self.column_order if c in data] + [c for c in data if c not in self.column_order]
+        return pd.DataFrame({c: data[c] for c in order})
+
+    def view(self, i):
+        """Return track ``i`` as a one-track TrackStore sharing this store's buffers."""
+        start, stop = self.bounds(i)
+        return TrackStore(
+            self.track_ids[i:i + 1], [0, stop - start],
+            self.times[start:stop], self.lats[start:stop], self.lons[start:stop],
+            {c: v[start:stop] for c, v in self.columns.items()},
+            self.id_col, self.time_col, self.lat_col, self.lon_col, self.column_order
+        )
+
+    def frame(self, i):
+        """Return track ``i`` as a standalone DataFrame."""
+        return self.view(i).to_pandas()
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.track_ids)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.track(i)
+
+    def __contains__(self, track_id):
+        return track_id in self._index()
+
+    def __repr__(self):
+        return f"TrackStore(n_tracks={len(self)}, n_points={self.n_points})"
+
+    @property
+    def n_points(self):
+        return int(self.offsets[-1])
+
+    @property
+    def lengths(self):
+        """Number of points per track."""
+        return np.diff(self.offsets)
+
+    def _index(self):
+        if self._id_index is None:
+            self._id_index = {tid: i for i, tid in enumerate(self.track_ids)}
+        return self._id_index
+
+    def index_of(self, track_id):
+        """Return the integer index of a track ID."""
+        try:
+            return self._index()[track_id]
+        except KeyError:
+            raise KeyError(f"Track '{track_id}' not found in store.") from None
+
+    def bounds(self, i):
+        """Return the (start, stop) row range of track ``i``."""
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def track(self, i):
+        """
+        Return zero-copy views of track ``i``.
+
+        Parameters:
+            i (int): Track index (use ``index_of`` to look up a track ID).
+
+        Returns:
+            TrackArrays: (track_id, times [int64 ns], lats, lons)
+        """
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return TrackArrays(self.track_ids[i], self.times[start:stop], self.lats[start:stop], self.lons[start:stop])
+
+    def column(self, name, i=None):
+        """Return a per-point column, or a zero-copy view of it for track ``i``."""
+        values = self.columns[name]
+        if i is None:
+            return values
+        start, stop = self.bounds(i)
+        return values[start:stop]
+
+    def row_track_index(self):
+        """Integer track index for every point (length ``n_points``)."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def unique_time_mask(self):
+        """Boolean mask keeping the first of any repeated timestamps within a track."""
+        keep = np.ones(self.n_points, dtype=bool)
+        if self.n_points > 1:
+            row_track = self.row_track_index()
+            keep[1:] = ~((np.diff(self.times) == 0) & (row_track[1:] == row_track[:-1]))
+        return keep
+
+    def row_track_ids(self):
+        """Track ID for every point (length ``n_points``)."""
+        return self.track_ids[self.row_track_index()]
+
+    def select(self, track_ids):
+        """
+        Return a new TrackStore containing only the given tracks (in store order).
+        Unknown IDs are ignored.
+        """
+        wanted = set(track_ids)
+        keep = np.array([tid in wanted for tid in self.track_ids], dtype=bool)
+        idx = np.flatnonzero(keep)
+        lengths = self.lengths[idx]
+        starts = self.offsets[idx]
+        rows = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+        return TrackStore(
+            self.track_ids[idx],
+            np.concatenate([[0], np.cumsum(lengths)]),
+            self.times[rows], self.lats[rows], self.lons[rows],
+            {c: v[rows] for c, v in self.columns.items()},
+            self.id_col, self.time_col, self.lat_col, self.lon_col, self.column_order
+        )
+
+
+def as_track_store(tracks, **kwargs):
+    """Return ``tracks`` as a TrackStore, converting from a DataFrame if needed."""
+    if isinstance(tracks, TrackStore):
+        return tracks
+    return TrackStore.from_pandas(tracks, **kwargs)